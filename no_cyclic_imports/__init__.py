@@ -0,0 +1,11 @@
+__all__ = ["Analyzer", "Cycle"]
+
+
+def __getattr__(name: str):
+    # Imported on first use only, so that the command line interface
+    # does not pay for loading the analysis machinery up front
+    if name in __all__:
+        from ._analyzer import Analyzer, Cycle  # noqa: PLC0415
+
+        return {"Analyzer": Analyzer, "Cycle": Cycle}[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")  # noqa: EM102, TRY003
@@ -7,17 +7,200 @@ import os
 import signal
 import sys
 import traceback
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
 
-from ._engine import run
+from ._follow_scope import FOLLOW_SCOPES
+from ._stats import Stats
+from ._stdlib import supported_python_versions
 from .version import VERSION
 
+if TYPE_CHECKING:
+    from ._cache import ImportCache
+
 _logger = logging.getLogger(__name__)
 
+_DEFAULT_MAX_EDGES = 10
 
-def _inner_main(argv: list[str] | None = None):
-    if argv is None:
-        argv = sys.argv
 
+def _non_negative_int(text: str) -> int:
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"{value} is negative")  # noqa: EM102, TRY003
+    return value
+
+
+def _positive_int(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not positive")  # noqa: EM102, TRY003
+    return value
+
+
+def _source_root(text: str) -> tuple[str, str]:
+    directory, separator, package_name = text.rpartition("=")
+    if not separator:
+        directory, package_name = text, ""
+    return os.path.realpath(directory), package_name
+
+
+def _analyze(
+    config: argparse.Namespace,
+    cache: "ImportCache | None",
+    stats: Stats,
+) -> int:
+    # Modules are imported on demand, so that startup only pays
+    # for the mode of operation actually used
+    from ._follow_scope import FollowScope  # noqa: PLC0415
+    from ._source_roots import SourceRoots  # noqa: PLC0415
+    from ._walk import TreeWalker  # noqa: PLC0415
+
+    if config.query:
+        from ._watch import query  # noqa: PLC0415
+
+        exit_code, output = query(config.query)
+        print(output, end="")
+        return exit_code
+
+    source_roots = SourceRoots(dict(config.source_roots))
+    walker = TreeWalker(
+        exclude=config.exclude,
+        respect_gitignore=config.respect_gitignore,
+    )
+    follow_scope = FollowScope(
+        config.follow_scope,
+        allowed_packages=config.follow_packages,
+    )
+
+    if config.changed_only or config.since:
+        from ._changed import changed_files_since, run_changed  # noqa: PLC0415
+
+        project_dir = os.path.realpath(config.project or os.getcwd())
+        changed_paths = list(config.paths)
+        if config.since:
+            changed_paths += changed_files_since(config.since, project_dir)
+        cycles_count = run_changed(
+            project_dir,
+            changed_paths,
+            follow=bool(config.follow),
+            file_=sys.stdout,
+            state_dir=config.cache_dir if config.cache else None,
+            cache=cache,
+            jobs=config.jobs,
+            source_roots=source_roots,
+            python_version=config.python_version,
+            walker=walker,
+            follow_scope=follow_scope,
+            max_cycle_length=config.max_cycle_length,
+            time_budget=config.time_budget,
+        )
+        return 2 if cycles_count else 0
+
+    if config.watch:
+        from ._watch import WatchSession, serve  # noqa: PLC0415
+
+        session = WatchSession(
+            config.paths,
+            follow=bool(config.follow),
+            cache=cache,
+            jobs=config.jobs,
+            source_roots=source_roots,
+            python_version=config.python_version,
+            walker=walker,
+            follow_scope=follow_scope,
+            max_cycle_length=config.max_cycle_length,
+            time_budget=config.time_budget,
+        )
+        serve(
+            session,
+            config.watch,
+            poll_interval=config.poll_interval,
+            file_=sys.stdout,
+        )
+        return 0
+
+    if config.multi_root:
+        from ._multi_root import run_multi_root  # noqa: PLC0415
+
+        projects_with_cycles = run_multi_root(
+            list(config.paths),
+            follow=bool(config.follow),
+            file_=sys.stdout,
+            report_dir=config.report_dir,
+            follow_depth=config.follow_depth,
+            cache=cache,
+            jobs=config.jobs,
+            source_roots=source_roots,
+            python_version=config.python_version,
+            max_cycle_length=config.max_cycle_length,
+            time_budget=config.time_budget,
+            mode=config.mode,
+            stats=stats,
+            walker=walker,
+            follow_scope=follow_scope,
+        )
+        return 2 if projects_with_cycles else 0
+
+    from ._engine import run  # noqa: PLC0415
+
+    cycles_count = run(
+        config.paths,
+        follow=bool(config.follow),
+        file_=sys.stdout,
+        follow_depth=config.follow_depth,
+        cache=cache,
+        jobs=config.jobs,
+        source_roots=source_roots,
+        python_version=config.python_version,
+        walker=walker,
+        stream=config.stream,
+        max_cycles=config.max_cycles,
+        max_cycle_length=config.max_cycle_length,
+        time_budget=config.time_budget,
+        mode=config.mode,
+        stats=stats,
+        save_graph=config.save_graph,
+        load_graph=config.load_graph,
+        granularity=config.granularity,
+        package_depth=config.package_depth,
+        follow_scope=follow_scope,
+        rank_edges=(config.max_edges or _DEFAULT_MAX_EDGES)
+        if config.rank_edges
+        else None,
+    )
+    return 2 if cycles_count else 0
+
+
+def _guarded_analyze(
+    config: argparse.Namespace,
+    cache: "ImportCache | None",
+    stats: Stats,
+) -> int:
+    profiler = None
+    if config.profile:
+        import cProfile  # noqa: PLC0415
+
+        profiler = cProfile.Profile()
+
+    exit_code = 1
+    try:
+        if profiler is not None:
+            profiler.enable()
+        exit_code = _analyze(config, cache, stats)
+    except Exception as e:  # noqa: BLE001
+        if config.debug:
+            traceback.print_exc()
+        else:
+            _logger.error(e)  # noqa: TRY400
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(config.profile)
+
+    return exit_code
+
+
+def _create_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="no-cyclic-imports")
     parser.add_argument("--version", action="version", version=VERSION)
     parser.add_argument(
@@ -28,6 +211,244 @@ def _inner_main(argv: list[str] | None = None):
         help="do not follow discovered import statements"
         " (default: do follow discovered import statements)",
     )
+    parser.add_argument(
+        "--follow-depth",
+        metavar="N",
+        type=_non_negative_int,
+        help="follow discovered import statements at most N levels deep"
+        " (default: no limit)",
+    )
+    parser.add_argument(
+        "--follow-scope",
+        choices=FOLLOW_SCOPES,
+        default="all",
+        help="follow discovered import statements into modules of the top-level"
+        ' packages analyzed (and those given by --follow-package) only ("first-party"),'
+        ' into modules outside of site-packages only ("local"), or into all'
+        ' modules ("all"); imports beyond are recorded without following them'
+        " (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--follow-package",
+        dest="follow_packages",
+        metavar="PACKAGE",
+        action="append",
+        default=[],
+        help="with --follow-scope first-party, also follow discovered import"
+        " statements into top-level package PACKAGE;"
+        " can be passed multiple times",
+    )
+    parser.add_argument(
+        "--python-version",
+        metavar="X.Y",
+        choices=supported_python_versions(),
+        help="consider the standard library of this Python version only"
+        " (default: consider the standard library of all known Python versions)",
+    )
+    parser.add_argument(
+        "--source-root",
+        dest="source_roots",
+        metavar="DIRECTORY[=PACKAGE]",
+        type=_source_root,
+        action="append",
+        default=[],
+        help="treat DIRECTORY as package PACKAGE (or as an import root"
+        " if no package is given) and all directories below it as packages,"
+        " rather than probing for __init__.py files; can be passed multiple times"
+        " (default: probe for __init__.py files)",
+    )
+    parser.add_argument(
+        "--exclude",
+        metavar="GLOB",
+        action="append",
+        default=[],
+        help="skip files and directories whose name or path relative to"
+        " the directory analyzed matches GLOB; can be passed multiple times",
+    )
+    parser.add_argument(
+        "--respect-gitignore",
+        action="store_true",
+        help="skip files and directories ignored by .gitignore files",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        metavar="N",
+        type=_positive_int,
+        default=os.cpu_count() or 1,
+        help="number of processes to parse files with (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["all", "shortest"],
+        default="all",
+        help='report all chordless cycles ("all"), or one shortest cycle'
+        ' per import that is part of any cycle ("shortest", much faster'
+        " on large tangles) (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--granularity",
+        choices=["module", "package", "toplevel"],
+        default="module",
+        help="report cycles between modules, or between packages or top-level"
+        " packages with one import between modules per edge of each cycle"
+        " (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--package-depth",
+        metavar="N",
+        type=_positive_int,
+        help="with --granularity package, collapse modules onto the first N"
+        " parts of their name rather than onto the package containing them",
+    )
+    parser.add_argument(
+        "--rank-edges",
+        action="store_true",
+        help="rather than cycles, report per strongly connected component"
+        " the imports most worth breaking: those of an approximate minimum"
+        " feedback arc set first, then by an estimate of the number of"
+        " cycles through each import, without enumerating all cycles"
+        " (default: report cycles)",
+    )
+    parser.add_argument(
+        "--max-edges",
+        metavar="K",
+        type=_positive_int,
+        help="with --rank-edges, report at most K imports"
+        f" per strongly connected component (default: {_DEFAULT_MAX_EDGES})",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="print each cycle as soon as it is found"
+        " (default: print all cycles sorted, at the end)",
+    )
+    parser.add_argument(
+        "--max-cycles",
+        metavar="N",
+        type=_positive_int,
+        help="stop after finding N cycles (default: no limit)",
+    )
+    parser.add_argument(
+        "--max-cycle-length",
+        metavar="K",
+        type=_positive_int,
+        help="only look for cycles of at most K modules (default: no limit)",
+    )
+    parser.add_argument(
+        "--time-budget",
+        metavar="SECONDS",
+        type=float,
+        help="stop looking for cycles after SECONDS seconds"
+        " and report a partial result (default: no limit)",
+    )
+    parser.add_argument(
+        "--multi-root",
+        action="store_true",
+        help="treat each FILE|DIRECTORY as a separate project:"
+        " analyze all of them together into a single import graph,"
+        " and report on each project's cycles separately"
+        " (default: report on all of them together)",
+    )
+    parser.add_argument(
+        "--report-dir",
+        metavar="DIRECTORY",
+        help="with --multi-root, write one report per project to DIRECTORY,"
+        " along with a summary.json of per-project exit codes"
+        " (default: write all reports to stdout)",
+    )
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="treat the given files as the changed files of the project"
+        " (see --project), analyze only these against the stored import graph"
+        " of the project and report only cycles involving them"
+        " (default: analyze all given files and report all cycles)",
+    )
+    parser.add_argument(
+        "--since",
+        metavar="REVISION",
+        help="like --changed-only, with all Python files of the project changed"
+        " since Git revision REVISION (including untracked files),"
+        " or in Git revision range REVISION (e.g. A..B), as the changed files",
+    )
+    parser.add_argument(
+        "--project",
+        metavar="DIRECTORY",
+        help="project directory for --changed-only and --since"
+        " (default: current directory)",
+    )
+    parser.add_argument(
+        "--watch",
+        metavar="SOCKET",
+        help="keep running, re-analyze changed files incrementally"
+        " and answer queries on Unix socket SOCKET (default: analyze once)",
+    )
+    parser.add_argument(
+        "--query",
+        metavar="SOCKET",
+        help="print the latest report of a watching instance"
+        " listening on Unix socket SOCKET, rather than analyzing",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        metavar="SECONDS",
+        type=float,
+        default=1.0,
+        help="check for changed files every SECONDS seconds"
+        " when watching (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="DIRECTORY",
+        help="directory to cache extracted imports in"
+        " (default: $XDG_CACHE_HOME/no-cyclic-imports or ~/.cache/no-cyclic-imports)",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        metavar="MIB",
+        type=_non_negative_int,
+        default=256,
+        help="evict least recently used cache entries beyond this size"
+        " in mebibytes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--dependency-index",
+        metavar="DIRECTORY",
+        help="directory to keep indexes of the imports of installed distributions"
+        " in, which can be shared among projects, used when following imports"
+        " into installed distributions (default: CACHE_DIR/distributions)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        default=True,
+        action="store_false",
+        help="do not read or write the import cache, dependency index"
+        " and stored import graphs"
+        " (default: use the import cache, dependency index and stored import graphs)",
+    )
+    parser.add_argument(
+        "--save-graph",
+        metavar="FILE",
+        help="save a binary snapshot of the import graph to FILE",
+    )
+    parser.add_argument(
+        "--load-graph",
+        metavar="FILE",
+        help="report on the import graph snapshot in FILE"
+        " rather than analyzing files (FILE|DIRECTORY arguments are ignored)",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="print time spent per phase and other statistics to stderr",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="write a cProfile dump of the run to FILE",
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -44,9 +465,134 @@ def _inner_main(argv: list[str] | None = None):
         metavar="FILE|DIRECTORY",
         help="file(s) to analyze",
     )
+    return parser
+
+
+def _check_not_allowed_with(
+    parser: argparse.ArgumentParser,
+    option: str,
+    options_used: Iterable[tuple[str, bool]],
+):
+    unsupported_options = [other for other, used in options_used if used]
+    if unsupported_options:
+        parser.error(
+            f"argument {option}: not allowed with {', '.join(unsupported_options)}",
+        )
+
+
+def _check_multi_root_options(
+    parser: argparse.ArgumentParser,
+    config: argparse.Namespace,
+):
+    _check_not_allowed_with(
+        parser,
+        "--multi-root",
+        [
+            ("--stream", config.stream),
+            ("--max-cycles", config.max_cycles is not None),
+            ("--granularity", config.granularity != "module"),
+            ("--package-depth", config.package_depth is not None),
+            ("--rank-edges", config.rank_edges),
+            ("--save-graph", config.save_graph is not None),
+            ("--load-graph", config.load_graph is not None),
+        ],
+    )
+
+
+def _check_watch_options(
+    parser: argparse.ArgumentParser,
+    config: argparse.Namespace,
+):
+    _check_not_allowed_with(
+        parser,
+        "--watch",
+        [
+            ("--multi-root", config.multi_root),
+            ("--mode", config.mode != "all"),
+            ("--follow-depth", config.follow_depth is not None),
+            ("--stream", config.stream),
+            ("--max-cycles", config.max_cycles is not None),
+            ("--granularity", config.granularity != "module"),
+            ("--package-depth", config.package_depth is not None),
+            ("--rank-edges", config.rank_edges),
+            ("--save-graph", config.save_graph is not None),
+            ("--load-graph", config.load_graph is not None),
+            ("--stats", config.stats),
+        ],
+    )
+
+
+def _check_dependent_options(
+    parser: argparse.ArgumentParser,
+    config: argparse.Namespace,
+):
+    for option, used, required_option, required in (
+        (
+            "--package-depth",
+            config.package_depth is not None,
+            "--granularity package",
+            config.granularity == "package",
+        ),
+        (
+            "--follow-package",
+            bool(config.follow_packages),
+            "--follow-scope first-party",
+            config.follow_scope == "first-party",
+        ),
+        (
+            "--max-edges",
+            config.max_edges is not None,
+            "--rank-edges",
+            config.rank_edges,
+        ),
+    ):
+        if used and not required:
+            parser.error(f"argument {option}: only allowed with {required_option}")
+
+
+def _check_changed_only_options(
+    parser: argparse.ArgumentParser,
+    config: argparse.Namespace,
+):
+    _check_not_allowed_with(
+        parser,
+        "--since" if config.since else "--changed-only",
+        [
+            ("--multi-root", config.multi_root),
+            ("--watch", config.watch is not None),
+            ("--mode", config.mode != "all"),
+            ("--follow-depth", config.follow_depth is not None),
+            ("--stream", config.stream),
+            ("--max-cycles", config.max_cycles is not None),
+            ("--granularity", config.granularity != "module"),
+            ("--package-depth", config.package_depth is not None),
+            ("--rank-edges", config.rank_edges),
+            ("--save-graph", config.save_graph is not None),
+            ("--load-graph", config.load_graph is not None),
+            ("--stats", config.stats),
+        ],
+    )
+
 
+def _check_options(parser: argparse.ArgumentParser, config: argparse.Namespace):
+    if config.changed_only or config.since:
+        _check_changed_only_options(parser, config)
+    if config.watch:
+        _check_watch_options(parser, config)
+    if config.multi_root:
+        _check_multi_root_options(parser, config)
+    _check_dependent_options(parser, config)
+
+
+def _inner_main(argv: list[str] | None = None):
+    if argv is None:
+        argv = sys.argv
+
+    parser = _create_parser()
     config = parser.parse_args(argv[1:])
 
+    _check_options(parser, config)
+
     if not config.paths:
         config.paths = [os.getcwd()]
 
@@ -65,16 +611,30 @@ def _inner_main(argv: list[str] | None = None):
         force=True,
     )
 
-    exit_code = 1
-    try:
-        cycles_count = run(config.paths, follow=bool(config.follow), file_=sys.stdout)
-    except Exception as e:  # noqa: BLE001
-        if config.debug:
-            traceback.print_exc()
-        else:
-            _logger.error(e)  # noqa: TRY400
-    else:
-        exit_code = 2 if cycles_count else 0
+    cache = None
+    if config.cache:
+        from ._cache import (  # noqa: PLC0415
+            DistributionIndex,
+            ImportCache,
+            default_cache_dir,
+        )
+
+        if config.cache_dir is None:
+            config.cache_dir = default_cache_dir()
+        cache = ImportCache(
+            config.cache_dir,
+            max_bytes=config.cache_max_size * 1024 * 1024,
+            distributions=DistributionIndex(
+                config.dependency_index
+                or os.path.join(config.cache_dir, "distributions"),
+            ),
+        )
+
+    stats = Stats()
+    exit_code = _guarded_analyze(config, cache, stats)
+
+    if config.stats:
+        print(stats.render(), end="", file=sys.stderr)
 
     sys.exit(exit_code)
 
@@ -0,0 +1,147 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+"""
+Embeddable API for analyzing many codebases in a single process.
+
+>>> analyzer = Analyzer()
+>>> for cycle in analyzer.iterate_cycles(["path/to/project"], follow=False):
+...     print(cycle)
+"""
+
+import dataclasses
+import os
+from collections.abc import Iterable, Iterator
+
+from ._cache import DEFAULT_MEMORY_MAX_BYTES, ImportCache, MemoryImportCache
+from ._engine import ToplevelCollector, _collect_py_files
+from ._graph import SearchBudget
+from ._imports import ImportGraph
+from ._normalization import shortest_first_rotated
+from ._resolution import ModuleResolver
+from ._source_roots import SourceRoots
+from ._stdlib import stdlib_module_names
+from ._walk import TreeWalker
+
+
+@dataclasses.dataclass(frozen=True)
+class Cycle:
+    """
+    A cycle of imports, starting with its shortest module name.
+
+    The last module imports the first one.
+    """
+
+    modules: tuple[str, ...]
+
+    def __str__(self):
+        return " -> ".join((*self.modules, self.modules[0]))
+
+
+class Analyzer:
+    """
+    Analyzes one codebase after another, keeping caches warm in between.
+
+    Kept across calls are the standard library index, resolution
+    of module names to files (for follow mode), and the imports parsed
+    from each file, the latter held in memory up to ``max_memory_bytes``
+    and optionally backed by an on-disk ``cache``.
+    Parsed files are validated by modification time and size on reuse;
+    for all other changes to the file system in between calls,
+    call ``clear``.
+
+    Components whose search for cycles was cut short by the time budget
+    or the cycle length limit of the latest call are listed
+    in ``truncated_components``, as sorted lists of module names.
+    """
+
+    def __init__(
+        self,
+        *,
+        python_version: str | None = None,
+        cache: ImportCache | None = None,
+        max_memory_bytes: int = DEFAULT_MEMORY_MAX_BYTES,
+        jobs: int = 1,
+        walker: TreeWalker | None = None,
+    ):
+        self._python_version = python_version
+        self._jobs = jobs
+        self._walker = walker
+        self._parsed_files = MemoryImportCache(
+            max_bytes=max_memory_bytes,
+            backing_cache=cache,
+        )
+        self._resolver = ModuleResolver()
+        self.truncated_components = []
+        stdlib_module_names(python_version)  # i.e. warm up
+
+    def clear(self):
+        """Forget all cached parsing and resolution results."""
+        self._parsed_files.clear()
+        self._resolver.clear()
+
+    def iterate_cycles(  # noqa: PLR0913
+        self,
+        paths: Iterable[str],
+        *,
+        follow: bool = True,
+        source_roots: dict[str, str] | None = None,
+        mode: str = "all",
+        max_cycle_length: int | None = None,
+        time_budget: float | None = None,
+    ) -> Iterator[Cycle]:
+        """
+        Yield each import cycle among the files and directories given once.
+
+        With ``mode="shortest"``, only one shortest cycle is reported
+        per offending import rather than all cycles.
+        """
+        source_roots = SourceRoots(
+            {
+                os.path.realpath(directory): package_name
+                for directory, package_name in (source_roots or {}).items()
+            },
+        )
+        imports = ImportGraph(
+            cache=self._parsed_files,
+            jobs=self._jobs,
+            resolver=self._resolver,
+            source_roots=source_roots,
+            python_version=self._python_version,
+        )
+        toplevel_packages = ToplevelCollector(source_roots)
+        imports.add_files(
+            _collect_py_files(
+                [os.path.realpath(path) for path in paths],
+                toplevel_packages,
+                self._walker,
+            ),
+            follow=follow,
+        )
+        self._parsed_files.prune()
+
+        budget = SearchBudget(time_budget)
+        self.truncated_components = budget.truncated_components
+        if mode == "shortest":
+            cycles = imports.iterate_shortest_cycles(toplevel_packages)
+        else:
+            cycles = imports.iterate_cycles(
+                toplevel_packages,
+                max_cycle_length,
+                budget,
+            )
+
+        seen_cycles = set()
+        for cycle in cycles:
+            structured_cycle = Cycle(tuple(shortest_first_rotated(cycle)))
+            if structured_cycle in seen_cycles:
+                continue
+            seen_cycles.add(structured_cycle)
+            yield structured_cycle
+
+    def analyze(self, paths: Iterable[str], **kwargs) -> list[Cycle]:
+        """Return all import cycles, sorted, see ``iterate_cycles``."""
+        return sorted(
+            self.iterate_cycles(paths, **kwargs),
+            key=lambda cycle: str(cycle).lower(),
+        )
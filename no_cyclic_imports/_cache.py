@@ -0,0 +1,489 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import contextlib
+import csv
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+from collections import OrderedDict
+
+from .version import VERSION
+
+_logger = logging.getLogger(__name__)
+
+ImportTuple = tuple[str | None, str, str | None, int | None]
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MEMORY_MAX_BYTES = 64 * 1024 * 1024
+
+
+def default_cache_dir() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"),
+        ".cache",
+    )
+    return os.path.join(cache_home, "no-cyclic-imports")
+
+
+def _sha256_of_file(abs_path: str) -> str:
+    with open(abs_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _fingerprint_of(abs_path: str) -> dict:
+    # Stat'ing before reading errs on the side of a miss, should the file
+    # change in between: a newer modification time will fail validation
+    stat_result = os.stat(abs_path)
+    return {
+        "mtime_ns": stat_result.st_mtime_ns,
+        "size": stat_result.st_size,
+        "sha256": _sha256_of_file(abs_path),
+    }
+
+
+def _read_json(path: str) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    return data
+
+
+def _write_json_atomically(path: str, data: dict) -> bool:
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except OSError as e:
+        _logger.warning(f"Could not write cache entry {path!r}: {e}")
+        return False
+    return True
+
+
+class DistributionIndex:
+    """
+    Shareable on-disk index of the imports of installed distributions.
+
+    Files installed to directories on ``sys.path`` are attributed to their
+    distribution by the ``RECORD`` file of its ``.dist-info`` directory.
+    The imports of all files of a distribution are stored together,
+    in a single file keyed by distribution name, version and hash
+    of the ``RECORD`` file, i.e. of the hashes of all files installed.
+    As installed files do not change without their ``RECORD`` changing,
+    entries are validated by file size only, and the index directory
+    can be shared among projects and machines.  Writes are deferred
+    until ``flush``, and merged with concurrent writes from other processes.
+    """
+
+    def __init__(self, directory: str, *, search_path: list[str] | None = None):
+        self._directory = directory
+        self._search_path = [
+            os.path.normpath(path)
+            for path in dict.fromkeys(sys.path if search_path is None else search_path)
+            if path
+        ]
+        self._scanned_dirs = set()
+        self._record_of_file = {}
+        self._location_of = {}
+        self._imports_of_key = {}
+        self._dirty_keys = set()
+        self.hits = 0
+        self.misses = 0
+        self.stat_calls = 0
+
+    def _scan_site_dir(self, site_dir: str):
+        try:
+            with os.scandir(site_dir) as entries:
+                dist_info_dirs = sorted(
+                    entry.path
+                    for entry in entries
+                    if entry.name.endswith(".dist-info") and entry.is_dir()
+                )
+        except OSError:
+            return
+
+        for dist_info_dir in dist_info_dirs:
+            try:
+                with open(os.path.join(dist_info_dir, "RECORD"), "rb") as f:
+                    record = f.read()
+            except OSError:
+                continue
+            stem = os.path.basename(dist_info_dir).removesuffix(".dist-info")
+            name, _, version = stem.rpartition("-")
+            record_hash = hashlib.sha256(record).hexdigest()
+            key = f"{name.lower()}-{version}-{record_hash[:16]}"
+            lines = record.decode("utf-8", "surrogateescape").splitlines()
+            for row in csv.reader(lines):
+                if len(row) != 3 or not row[0].endswith(".py"):  # noqa: PLR2004
+                    continue
+                relative_path, _hash, size = row
+                abs_path = os.path.normpath(os.path.join(site_dir, relative_path))
+                self._record_of_file[abs_path] = (
+                    key,
+                    relative_path,
+                    int(size) if size.isdigit() else None,
+                )
+
+    def _locate(self, abs_path: str) -> tuple[str, str] | None:
+        """Return index key and relative path of an installed file, if any."""
+        if abs_path in self._location_of:
+            return self._location_of[abs_path]
+
+        normalized_path = os.path.normpath(abs_path)
+        for site_dir in self._search_path:
+            if site_dir not in self._scanned_dirs and normalized_path.startswith(
+                site_dir + os.sep,
+            ):
+                self._scanned_dirs.add(site_dir)
+                self._scan_site_dir(site_dir)
+
+        location = None
+        record = self._record_of_file.get(normalized_path)
+        if record is not None:
+            key, relative_path, size = record
+            unmodified = True
+            if size is not None:
+                self.stat_calls += 1
+                try:
+                    unmodified = os.stat(abs_path).st_size == size
+                except OSError:
+                    unmodified = False
+            if unmodified:
+                location = key, relative_path
+
+        self._location_of[abs_path] = location
+        return location
+
+    def _index_path_for(self, key: str) -> str:
+        return os.path.join(self._directory, key + ".json")
+
+    def _read_index(self, key: str) -> dict[str, list]:
+        index = _read_json(self._index_path_for(key))
+        if (
+            index is None
+            or index.get("version") != VERSION
+            or index.get("key") != key
+            or not isinstance(index.get("files"), dict)
+        ):
+            return {}
+        return index["files"]
+
+    def _imports_of(self, key: str) -> dict[str, list]:
+        imports_of_file = self._imports_of_key.get(key)
+        if imports_of_file is None:
+            imports_of_file = self._read_index(key)
+            self._imports_of_key[key] = imports_of_file
+        return imports_of_file
+
+    def indexes(self, abs_path: str) -> bool:
+        """Return whether a file is an unmodified file of an installed distribution."""
+        return self._locate(abs_path) is not None
+
+    def get(self, abs_path: str) -> list[ImportTuple] | None:
+        """Return the indexed imports of an installed file, or ``None`` on a miss."""
+        location = self._locate(abs_path)
+        imports = None
+        if location is not None:
+            key, relative_path = location
+            imports = self._imports_of(key).get(relative_path)
+        if imports is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [tuple(import_) for import_ in imports]
+
+    def put(self, abs_path: str, imports: list[ImportTuple]) -> bool:
+        """Index the imports of an installed file, return whether it is one."""
+        location = self._locate(abs_path)
+        if location is None:
+            return False
+        key, relative_path = location
+        self._imports_of(key)[relative_path] = list(imports)
+        self._dirty_keys.add(key)
+        return True
+
+    def flush(self):
+        """Write all indexes with new entries, merged with what is on disk."""
+        for key in sorted(self._dirty_keys):
+            imports_of_file = {**self._read_index(key), **self._imports_of_key[key]}
+            self._imports_of_key[key] = imports_of_file
+            _write_json_atomically(
+                self._index_path_for(key),
+                {"version": VERSION, "key": key, "files": imports_of_file},
+            )
+        self._dirty_keys.clear()
+
+
+class ImportCache:
+    """
+    On-disk cache of the imports extracted from each Python source file.
+
+    Entries are keyed by absolute path and validated against
+    modification time, size, content hash and tool version.
+    Writes are atomic (rename into place) so that concurrent
+    processes sharing the same directory never see partial entries.
+    Once the cache grows beyond ``max_bytes``, the least recently
+    used entries are evicted.  Files are fingerprinted on a miss,
+    i.e. before they get parsed, so that an edit racing the parsing
+    cannot get the imports of the old content stored as valid
+    for the new content.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        distributions: DistributionIndex | None = None,
+    ):
+        self._directory = os.path.join(directory, "imports")
+        self._max_bytes = max_bytes
+        self._distributions = distributions
+        self._wrote_entries = False
+        self._fingerprint_of_miss = {}
+        self._stat_calls = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def stat_calls(self) -> int:
+        """Return the number of files stat'ed to validate or store entries."""
+        stat_calls = self._stat_calls
+        if self._distributions is not None:
+            stat_calls += self._distributions.stat_calls
+        return stat_calls
+
+    def _entry_path_for(self, abs_path: str) -> str:
+        key = hashlib.sha256(abs_path.encode("utf-8", "surrogateescape")).hexdigest()
+        return os.path.join(self._directory, key[:2], key + ".json")
+
+    def _write_entry(self, entry_path: str, entry: dict):
+        if _write_json_atomically(entry_path, entry):
+            self._wrote_entries = True
+
+    @staticmethod
+    def _mark_used(entry_path: str):
+        with contextlib.suppress(OSError):
+            os.utime(entry_path)
+
+    def get(self, abs_path: str) -> list[ImportTuple] | None:
+        """Return the cached imports of a file, or ``None`` on a cache miss."""
+        if self._distributions is not None and self._distributions.indexes(abs_path):
+            imports = self._distributions.get(abs_path)
+            if imports is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return imports
+
+        entry_path = self._entry_path_for(abs_path)
+        entry = _read_json(entry_path)
+        fingerprint = None
+
+        if (
+            entry is not None
+            and entry.get("version") == VERSION
+            and entry.get("path") == abs_path
+        ):
+            self._stat_calls += 1
+            stat_result = os.stat(abs_path)
+            if (
+                entry.get("mtime_ns") == stat_result.st_mtime_ns
+                and entry.get("size") == stat_result.st_size
+            ):
+                self.hits += 1
+                self._mark_used(entry_path)
+                return [tuple(import_) for import_ in entry["imports"]]
+
+            # Modification time is unreliable (e.g. after a fresh clone in CI)
+            # so let's see whether the content is still the same
+            self._stat_calls += 1
+            fingerprint = _fingerprint_of(abs_path)
+            if entry.get("sha256") == fingerprint["sha256"]:
+                self.hits += 1
+                entry.update(fingerprint)
+                self._write_entry(entry_path, entry)
+                return [tuple(import_) for import_ in entry["imports"]]
+
+        self.misses += 1
+        if _logger.isEnabledFor(logging.DEBUG):
+            _logger.debug(f"Cache miss for file {abs_path!r}.")
+        if fingerprint is None:
+            self._stat_calls += 1
+            fingerprint = _fingerprint_of(abs_path)
+        self._fingerprint_of_miss[abs_path] = fingerprint
+        return None
+
+    def put(self, abs_path: str, imports: list[ImportTuple]):
+        """Store the imports of a file, ideally parsed after a miss for it."""
+        fingerprint = self._fingerprint_of_miss.pop(abs_path, None)
+        if self._distributions is not None and self._distributions.put(
+            abs_path,
+            imports,
+        ):
+            return
+
+        if fingerprint is None:
+            self._stat_calls += 1
+            fingerprint = _fingerprint_of(abs_path)
+        self._write_entry(
+            self._entry_path_for(abs_path),
+            {
+                "version": VERSION,
+                "path": abs_path,
+                **fingerprint,
+                "imports": imports,
+            },
+        )
+
+    def _iterate_entries(self):
+        try:
+            shard_entries = list(os.scandir(self._directory))
+        except OSError:
+            return
+        for shard_entry in shard_entries:
+            if not shard_entry.is_dir():
+                continue
+            try:
+                entries = list(os.scandir(shard_entry.path))
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat_result = entry.stat()
+                except OSError:
+                    continue
+                yield stat_result.st_mtime_ns, stat_result.st_size, entry.path
+
+    def prune(self):
+        """
+        Evict least recently used entries until within the size limit.
+
+        Also writes pending changes to the index of installed distributions,
+        which is not subject to the size limit.
+        """
+        if self._distributions is not None:
+            self._distributions.flush()
+
+        if not self._wrote_entries:
+            return
+
+        entries = sorted(self._iterate_entries())
+        total_bytes = sum(size for _mtime_ns, size, _path in entries)
+        for _mtime_ns, size, entry_path in entries:
+            if total_bytes <= self._max_bytes:
+                break
+            try:
+                os.unlink(entry_path)
+            except FileNotFoundError:
+                pass  # evicted by a concurrent process already
+            except OSError as e:
+                _logger.warning(f"Could not evict cache entry {entry_path!r}: {e}")
+                continue
+            total_bytes -= size
+
+        self._wrote_entries = False
+
+
+def _estimated_bytes_of(abs_path: str, imports: list[ImportTuple]) -> int:
+    return sys.getsizeof(abs_path) + sum(
+        sys.getsizeof(import_) + sum(sys.getsizeof(part) for part in import_)
+        for import_ in imports
+    )
+
+
+class MemoryImportCache:
+    """
+    In-memory cache of the imports extracted from each Python source file.
+
+    Entries are validated against modification time and size.
+    Misses are passed on to an optional on-disk ``ImportCache``.
+    Once the estimated size of all entries grows beyond ``max_bytes``,
+    the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = DEFAULT_MEMORY_MAX_BYTES,
+        backing_cache: ImportCache | None = None,
+    ):
+        self._entries = OrderedDict()
+        self._max_bytes = max_bytes
+        self._backing_cache = backing_cache
+        self.estimated_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remember(self, abs_path: str, stat_result, imports: list[ImportTuple]):
+        self._forget(abs_path)
+        estimated_bytes = _estimated_bytes_of(abs_path, imports)
+        self._entries[abs_path] = (
+            stat_result.st_mtime_ns,
+            stat_result.st_size,
+            imports,
+            estimated_bytes,
+        )
+        self.estimated_bytes += estimated_bytes
+        while self.estimated_bytes > self._max_bytes and self._entries:
+            *_, evicted_bytes = self._entries.popitem(last=False)[1]
+            self.estimated_bytes -= evicted_bytes
+
+    def _forget(self, abs_path: str):
+        entry = self._entries.pop(abs_path, None)
+        if entry is not None:
+            self.estimated_bytes -= entry[-1]
+
+    def get(self, abs_path: str) -> list[ImportTuple] | None:
+        """Return the cached imports of a file, or ``None`` on a cache miss."""
+        stat_result = os.stat(abs_path)
+        entry = self._entries.get(abs_path)
+        if entry is not None and entry[:2] == (
+            stat_result.st_mtime_ns,
+            stat_result.st_size,
+        ):
+            self.hits += 1
+            self._entries.move_to_end(abs_path)
+            return list(entry[2])
+
+        if self._backing_cache is not None:
+            imports = self._backing_cache.get(abs_path)
+            if imports is not None:
+                self.hits += 1
+                self._remember(abs_path, stat_result, imports)
+                return list(imports)
+
+        self.misses += 1
+        return None
+
+    def put(self, abs_path: str, imports: list[ImportTuple]):
+        self._remember(abs_path, os.stat(abs_path), list(imports))
+        if self._backing_cache is not None:
+            self._backing_cache.put(abs_path, imports)
+
+    def prune(self):
+        if self._backing_cache is not None:
+            self._backing_cache.prune()
+
+    def clear(self):
+        self._entries.clear()
+        self.estimated_bytes = 0
@@ -0,0 +1,334 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+"""
+Analysis of changed files only, on top of a stored import graph.
+
+The import graph of the whole project is stored per file (with modification
+time and size) after each run.  Subsequent runs re-analyze only the files
+that were reported as changed or whose fingerprint no longer matches,
+and report only cycles that involve modules of changed files.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import tempfile
+from typing import IO, TYPE_CHECKING
+
+from ._engine import (
+    ToplevelCollector,
+    _collect_py_files,
+    _format_cycle,
+    _render_report,
+    _render_truncation,
+)
+from ._follow_scope import FollowScope
+from ._graph import SearchBudget
+from ._imports import (
+    ImportGraph,
+    determine_source_module_name,
+    toplevel_package_of,
+    without_dot_init,
+)
+from ._source_roots import SourceRoots
+from ._walk import TreeWalker
+from .version import VERSION
+
+if TYPE_CHECKING:
+    from ._cache import ImportCache
+
+_logger = logging.getLogger(__name__)
+
+
+def changed_files_since(revision: str, directory: str) -> list[str]:
+    """
+    Return the Python files below a directory changed since a Git revision.
+
+    Paths are returned as absolute paths.  For a single revision, changes
+    to tracked files (committed or not) and untracked files that are
+    not ignored count as changes.  For a range of revisions (``A..B``
+    or ``A...B``), only the changes committed in that range count.
+    """
+
+    def git(*args: str, cwd: str) -> str:
+        return subprocess.run(  # noqa: S603
+            ["git", *args],  # noqa: S607
+            cwd=cwd,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+    toplevel_dir = git("rev-parse", "--show-toplevel", cwd=directory).strip()
+    relative_paths = git(
+        "diff",
+        "--name-only",
+        "--no-renames",
+        "-z",
+        revision,
+        "--",
+        cwd=toplevel_dir,
+    ).split("\0")
+    # Names of revisions cannot contain "..", so this is a range
+    if ".." not in revision:
+        relative_paths += git(
+            "ls-files",
+            "--others",
+            "--exclude-standard",
+            "-z",
+            cwd=toplevel_dir,
+        ).split("\0")
+
+    abs_dir = os.path.realpath(directory)
+    abs_paths = {
+        os.path.realpath(os.path.join(toplevel_dir, relative_path))
+        for relative_path in relative_paths
+        if relative_path.endswith(".py")
+    }
+    return sorted(
+        abs_path
+        for abs_path in abs_paths
+        if abs_path.startswith(os.path.join(abs_dir, ""))
+    )
+
+
+def _state_path_for(  # noqa: PLR0913
+    state_dir: str,
+    project_dir: str,
+    *,
+    follow: bool,
+    source_roots: SourceRoots,
+    python_version: str | None,
+    follow_scope: FollowScope,
+    walker: TreeWalker,
+) -> str:
+    key = json.dumps(
+        [
+            project_dir,
+            follow,
+            sorted(source_roots.explicit_roots.items()),
+            python_version,
+            follow_scope.name,
+            sorted(follow_scope.allowed_packages),
+            sorted(walker.exclude),
+            walker.respect_gitignore,
+        ],
+    )
+    return os.path.join(
+        state_dir,
+        "graphs",
+        hashlib.sha256(key.encode("utf-8", "surrogateescape")).hexdigest() + ".json",
+    )
+
+
+def _load_state(state_path: str) -> dict | None:
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get("version") != VERSION:
+        return None
+    return state
+
+
+def _save_state(state_path: str, state: dict):
+    state_dir = os.path.dirname(state_path)
+    try:
+        os.makedirs(state_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=state_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f, separators=(",", ":"))
+            os.replace(temp_path, state_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except OSError as e:
+        _logger.warning(f"Could not store import graph {state_path!r}: {e}")
+
+
+def _fingerprint_of(abs_path: str) -> tuple[int, int] | None:
+    try:
+        stat_result = os.stat(abs_path)
+    except FileNotFoundError:
+        return None
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
+def _restore(
+    imports: ImportGraph,
+    state: dict,
+    changed_paths: set[str],
+    *,
+    follow: bool,
+) -> dict[str, tuple[int, int]]:
+    """
+    Restore a stored import graph, and re-analyze changed files on top.
+
+    Files whose fingerprint no longer matches are added to ``changed_paths``.
+    """
+    fingerprints = {}
+    records = []
+    for abs_path, (mtime_ns, size, source_module, target_modules) in state[
+        "files"
+    ].items():
+        if abs_path in changed_paths:
+            continue
+        fingerprint = _fingerprint_of(abs_path)
+        if fingerprint is None:
+            continue
+        if fingerprint != (mtime_ns, size):
+            changed_paths.add(abs_path)
+            continue
+        fingerprints[abs_path] = fingerprint
+        records.append((abs_path, source_module, target_modules))
+    imports.add_file_records(records)
+
+    _logger.info(f"Re-analyzing {len(changed_paths)} changed file(s)...")
+    for abs_path in sorted(changed_paths):
+        if os.path.exists(abs_path):
+            imports.update_file(abs_path, follow=follow)
+        else:
+            imports.remove_file(abs_path)
+
+    return fingerprints
+
+
+def _store(
+    imports: ImportGraph,
+    state_path: str,
+    toplevel_packages: set[str],
+    fingerprints: dict[str, tuple[int, int]],
+):
+    files = {}
+    for abs_path, source_module, target_modules in imports.file_records():
+        fingerprint = fingerprints.get(abs_path) or _fingerprint_of(abs_path)
+        if fingerprint is not None:
+            files[abs_path] = [*fingerprint, source_module, target_modules]
+    _save_state(
+        state_path,
+        {
+            "version": VERSION,
+            "toplevel_packages": sorted(toplevel_packages),
+            "files": files,
+        },
+    )
+
+
+def _cycles_involving(
+    imports: ImportGraph,
+    module_names: set[str],
+    toplevel_packages: set[str],
+    *,
+    max_cycle_length: int | None = None,
+    budget: SearchBudget | None = None,
+) -> list[str]:
+    lines = []
+    for component in imports.cyclic_components(toplevel_packages):
+        if module_names.isdisjoint(map(imports.name_of, component)):
+            continue
+        lines += [
+            _format_cycle(cycle)
+            for cycle in imports.cycles_in(
+                component,
+                toplevel_packages,
+                max_cycle_length,
+                budget,
+            )
+            if not module_names.isdisjoint(cycle)
+        ]
+    return lines
+
+
+def run_changed(  # noqa: PLR0913
+    project_dir: str,
+    changed_paths: list[str],
+    *,
+    follow: bool,
+    file_: IO,
+    state_dir: str | None = None,
+    cache: "ImportCache | None" = None,
+    jobs: int = 1,
+    source_roots: SourceRoots | None = None,
+    python_version: str | None = None,
+    walker: TreeWalker | None = None,
+    follow_scope: FollowScope | None = None,
+    max_cycle_length: int | None = None,
+    time_budget: float | None = None,
+) -> int:
+    if source_roots is None:
+        source_roots = SourceRoots()
+    if follow_scope is None:
+        follow_scope = FollowScope()
+    walker = TreeWalker() if walker is None else walker
+    imports = ImportGraph(
+        cache=cache,
+        jobs=jobs,
+        source_roots=source_roots,
+        python_version=python_version,
+        follow_scope=follow_scope,
+    )
+    changed_paths = {path for path in changed_paths if path.endswith(".py")}
+
+    state_path = None
+    state = None
+    if state_dir is not None:
+        state_path = _state_path_for(
+            state_dir,
+            project_dir,
+            follow=follow,
+            source_roots=source_roots,
+            python_version=python_version,
+            follow_scope=follow_scope,
+            walker=walker,
+        )
+        state = _load_state(state_path)
+
+    if state is None:
+        _logger.info(f"No stored import graph, analyzing {project_dir!r} fully...")
+        toplevel_collector = ToplevelCollector(source_roots)
+        imports.add_files(
+            _collect_py_files([project_dir], toplevel_collector, walker),
+            follow=follow,
+        )
+        toplevel_packages = set(toplevel_collector)
+        fingerprints = {}
+    else:
+        toplevel_packages = set(state["toplevel_packages"])
+        imports.first_party_packages.update(toplevel_packages)
+        fingerprints = _restore(imports, state, changed_paths, follow=follow)
+
+    changed_modules = set()
+    for abs_path in changed_paths:
+        if os.path.exists(abs_path):
+            module_name = without_dot_init(
+                determine_source_module_name(abs_path, source_roots),
+            )
+            changed_modules.add(module_name)
+            toplevel_packages.add(toplevel_package_of(module_name))
+
+    budget = SearchBudget(time_budget)
+    lines = _cycles_involving(
+        imports,
+        changed_modules,
+        toplevel_packages,
+        max_cycle_length=max_cycle_length,
+        budget=budget,
+    )
+
+    if state_path is not None:
+        _store(imports, state_path, toplevel_packages, fingerprints)
+
+    if cache is not None:
+        cache.prune()
+
+    print(_render_report(lines), end="", file=file_)
+    if budget.truncated_components:
+        print(_render_truncation(budget.truncated_components), end="", file=file_)
+
+    # Truncated components contain cycles, even if none were found in time
+    return len(lines) or len(budget.truncated_components)
@@ -1,69 +1,221 @@
 # Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
 # Licensed under Affero GPL v3 or later
 
+import itertools
 import logging
 import os
-from typing import IO
+from collections.abc import Iterable, Iterator
+from typing import IO, TYPE_CHECKING
 
+from ._follow_scope import FollowScope
+from ._graph import ModuleGraph, SearchBudget
 from ._imports import (
     ImportGraph,
     determine_source_module_name,
     toplevel_package_of,
 )
 from ._normalization import shortest_first_rotated
+from ._source_roots import SourceRoots
+from ._stats import Stats
+from ._stdlib import stdlib_module_names
+from ._walk import TreeWalker
+
+if TYPE_CHECKING:
+    from ._cache import ImportCache
 
 _logger = logging.getLogger(__name__)
 
 
 class ToplevelCollector:
-    def __init__(self):
+    def __init__(self, source_roots: SourceRoots | None = None):
         self._toplevel_packages = set()
+        self._source_roots = SourceRoots() if source_roots is None else source_roots
 
     def add_file(self, abs_path: str):
-        module_name = determine_source_module_name(abs_path)
+        module_name = determine_source_module_name(abs_path, self._source_roots)
         toplevel_package = toplevel_package_of(module_name)
         self._toplevel_packages.add(toplevel_package)
 
     def __iter__(self):
-        return sorted(self._toplevel_packages)
+        return iter(sorted(self._toplevel_packages))
 
-    def touched_by(self, module_names: list[str]) -> bool:
-        return any(
-            (toplevel_package_of(module_name) in self._toplevel_packages)
-            for module_name in module_names
-        )
+    def __contains__(self, toplevel_package: str) -> bool:
+        return toplevel_package in self._toplevel_packages
 
+    def __len__(self) -> int:
+        return len(self._toplevel_packages)
 
-def _format_cycle(cycle: list[str]) -> str:
+
+def _format_cycle(
+    cycle: list[str],
+    witnesses: dict[tuple[str, str], tuple[str, str]] | None = None,
+) -> str:
     normalized_cycle = shortest_first_rotated(cycle)
     normalized_cycle.append(normalized_cycle[0])
-    return " -> ".join(normalized_cycle)
+    text = " -> ".join(normalized_cycle)
+    if witnesses is not None:
+        # Drill down to one import between modules per edge of the cycle
+        text += "".join(
+            "\n  {} -> {}".format(*witnesses[edge])
+            for edge in itertools.pairwise(normalized_cycle)
+        )
+    return text
+
+
+def _render_report(lines: list[str]) -> str:
+    text = ""
+    if lines:
+        text = "\n".join(sorted(lines, key=lambda line: line.lower())) + "\n\n"
+    return text + f"{len(lines)} cycle(s).\n"
+
+
+def _unique_lines(
+    cycles: Iterable[list[str]],
+    max_cycles: int | None = None,
+    witnesses: dict[tuple[str, str], tuple[str, str]] | None = None,
+) -> Iterator[str]:
+    seen_lines = set()
+    for cycle in cycles:
+        line = _format_cycle(cycle, witnesses)
+        if line in seen_lines:
+            continue
+        seen_lines.add(line)
+        yield line
+        # Not pulling another cycle, as finding it could take long
+        if max_cycles is not None and len(seen_lines) >= max_cycles:
+            _logger.warning(
+                f"Stopped after {max_cycles} cycle(s), there may be more.",
+            )
+            return
+
+
+def _render_truncation(
+    truncated_components: list[list[str]],
+    max_names: int = 5,
+) -> str:
+    header = (
+        "Partial result, cycle search was cut short"
+        f" in {len(truncated_components)} strongly connected component(s):"
+    )
+    lines = [header]
+    for module_names in truncated_components:
+        line = "  " + ", ".join(module_names[:max_names])
+        if len(module_names) > max_names:
+            line += f", ... ({len(module_names)} module(s) in total)"
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def _report_cycles(  # noqa: PLR0913
+    imports: ImportGraph | ModuleGraph,
+    toplevel_packages: ToplevelCollector,
+    file_: IO,
+    *,
+    stream: bool = False,
+    max_cycles: int | None = None,
+    max_cycle_length: int | None = None,
+    time_budget: float | None = None,
+    mode: str = "all",
+    witnesses: dict[tuple[str, str], tuple[str, str]] | None = None,
+) -> int:
+    budget = SearchBudget(time_budget)
+    if mode == "shortest":
+        cycles = imports.iterate_shortest_cycles(toplevel_packages)
+    else:
+        cycles = imports.iterate_cycles(toplevel_packages, max_cycle_length, budget)
+    lines = _unique_lines(cycles, max_cycles, witnesses)
+
+    if stream:
+        count_cycles = 0
+        for line in lines:
+            print(line, file=file_, flush=True)
+            count_cycles += 1
+        if count_cycles:
+            print(file=file_)
+        print(f"{count_cycles} cycle(s).", file=file_)
+    else:
+        lines = list(lines)
+        count_cycles = len(lines)
+        print(_render_report(lines), end="", file=file_)
+
+    if budget.truncated_components:
+        print(_render_truncation(budget.truncated_components), end="", file=file_)
+
+    # Truncated components contain cycles, even if none were found in time
+    return count_cycles or len(budget.truncated_components)
 
 
-def _report_cycles(
+def _format_ranked_edge(
+    imports: ImportGraph,
+    ranked_edge: tuple[str, str, bool, float],
+    witnesses: dict[tuple[str, str], tuple[str, str]] | None,
+) -> str:
+    source, target, in_feedback_arc_set, score = ranked_edge
+    text = f"{source} -> {target}"
+    module_edge = (source, target)
+    if witnesses is not None:
+        module_edge = witnesses[source, target]
+        text += " (via {} -> {})".format(*module_edge)
+    text += f"  [score {score:.1f}"
+    if in_feedback_arc_set:
+        text += ", feedback arc"
+    text += "]"
+    abs_path = imports.file_of_import(*module_edge)
+    if abs_path is not None:
+        text += f"  {abs_path}"
+    return text
+
+
+def _report_edge_ranking(  # noqa: PLR0913
+    graph: ImportGraph | ModuleGraph,
     imports: ImportGraph,
     toplevel_packages: ToplevelCollector,
     file_: IO,
+    *,
+    max_edges: int,
+    time_budget: float | None = None,
+    witnesses: dict[tuple[str, str], tuple[str, str]] | None = None,
 ) -> int:
-    lines = []
-    for cycle in imports.iterate_cycles():
-        if not toplevel_packages.touched_by(cycle):
-            continue
-        lines.append(_format_cycle(cycle))
-    count_cycles = len(lines)
+    """
+    Print the imports most worth breaking per strongly connected component.
 
-    if lines:
-        print("\n".join(sorted(lines, key=lambda line: line.lower())), file=file_)
+    Returns the number of strongly connected components with cycles.
+    """
+    budget = SearchBudget(time_budget)
+    components = sorted(
+        graph.cyclic_components(toplevel_packages),
+        key=lambda component: (-len(component), min(component)),
+    )
+    for component in components:
+        ranked_edges = graph.rank_edges_in(component, budget=budget)
+        count_feedback_arcs = sum(1 for edge in ranked_edges if edge[2])
+        print(
+            f"[{len(component)} module(s), {len(ranked_edges)} import(s),"
+            f" {count_feedback_arcs} in feedback arc set]",
+            file=file_,
+        )
+        for ranked_edge in ranked_edges[:max_edges]:
+            print(_format_ranked_edge(imports, ranked_edge, witnesses), file=file_)
+        if len(ranked_edges) > max_edges:
+            print(f"... ({len(ranked_edges) - max_edges} more)", file=file_)
         print(file=file_)
 
-    print(f"{count_cycles} cycle(s).")
+    print(f"{len(components)} cyclic component(s).", file=file_)
+    return len(components)
 
-    return count_cycles
 
+def _collect_py_files(
+    abs_paths: Iterable[str],
+    toplevel_packages: ToplevelCollector,
+    walker: TreeWalker | None = None,
+) -> Iterator[str]:
+    """
+    Yield the Python files to analyze, as they are found.
 
-def run(abs_paths: list[str], *, follow: bool, file_: IO) -> int:
-    imports = ImportGraph()
-    toplevel_packages = ToplevelCollector()
+    Top-level packages are collected along the way.
+    """
+    if walker is None:
+        walker = TreeWalker()
 
     for abs_path in abs_paths:
         if not os.path.exists(abs_path):
@@ -76,22 +228,189 @@ def run(abs_paths: list[str], *, follow: bool, file_: IO) -> int:
             _logger.info(
                 f"Scanning directory {abs_path!r} for Python files recursively...",
             )
-            for root, folders, files in os.walk(abs_path):
-                folders[:] = sorted(folders)  # for alphabetical ascend
+            previous_folder = None
+            for py_file in walker.iterate_py_files(abs_path):
+                folder = os.path.dirname(py_file)
+                if folder != previous_folder:
+                    toplevel_packages.add_file(py_file)  # any of the folder would do
+                    previous_folder = folder
+                yield py_file
+        else:
+            toplevel_packages.add_file(abs_path)
 
-                py_files = sorted(
-                    os.path.join(root, f) for f in files if f.endswith(".py")
-                )
-                if not py_files:
-                    continue
+            yield abs_path
 
-                toplevel_packages.add_file(py_files[0])  # any of them would do
 
-                for py_file in py_files:
-                    imports.add_file(py_file, follow=follow)
-        else:
-            toplevel_packages.add_file(abs_path)
+def _build(  # noqa: PLR0913
+    imports: ImportGraph,
+    abs_paths: list[str],
+    *,
+    follow: bool,
+    follow_depth: int | None,
+    source_roots: SourceRoots,
+    walker: TreeWalker | None,
+) -> ToplevelCollector:
+    toplevel_packages = ToplevelCollector(source_roots)
+    # Parsing starts while the walk is still going on
+    imports.add_files(
+        _collect_py_files(abs_paths, toplevel_packages, walker),
+        follow=follow,
+        follow_depth=follow_depth,
+    )
+
+    if follow:
+        resolver = imports._resolver
+        _logger.info(
+            f"Module resolution took {resolver.scandir_calls} directory listing(s)"
+            f" and saved {resolver.filesystem_calls_saved} filesystem call(s).",
+        )
+
+    return toplevel_packages
+
+
+def run(  # noqa: PLR0913
+    abs_paths: list[str],
+    *,
+    follow: bool,
+    file_: IO,
+    follow_depth: int | None = None,
+    cache: "ImportCache | None" = None,
+    jobs: int = 1,
+    source_roots: SourceRoots | None = None,
+    python_version: str | None = None,
+    stream: bool = False,
+    max_cycles: int | None = None,
+    max_cycle_length: int | None = None,
+    time_budget: float | None = None,
+    mode: str = "all",
+    stats: Stats | None = None,
+    save_graph: str | None = None,
+    load_graph: str | None = None,
+    walker: TreeWalker | None = None,
+    granularity: str = "module",
+    package_depth: int | None = None,
+    follow_scope: FollowScope | None = None,
+    rank_edges: int | None = None,
+) -> int:
+    """
+    Analyze files and directories, report cycles, return the number found.
+
+    With ``rank_edges`` given, rather than cycles, up to that many
+    imports per strongly connected component are reported, ranked by
+    how critical they are for keeping the component strongly connected,
+    and the number of strongly connected components with cycles is returned.
+    """
+    if source_roots is None:
+        source_roots = SourceRoots()
+    if stats is None:
+        stats = Stats()
+    imports = ImportGraph(
+        cache=cache,
+        jobs=jobs,
+        source_roots=source_roots,
+        python_version=python_version,
+        stats=stats,
+        follow_scope=follow_scope,
+        record_fingerprints=save_graph is not None,
+    )
+
+    with stats.phase("stdlib index"):
+        stdlib_module_names(python_version)
 
-            imports.add_file(abs_path, follow=follow)
+    if load_graph is not None or save_graph is not None:
+        from ._snapshot import load_snapshot, save_snapshot, stale_files  # noqa: PLC0415
+
+    if load_graph is not None:
+        with stats.phase("load graph"):
+            toplevel_packages, fingerprints = load_snapshot(load_graph, imports)
+        count_stale_files = len(stale_files(fingerprints))
+        if count_stale_files:
+            _logger.warning(
+                f"{count_stale_files} file(s) changed since saving {load_graph!r}.",
+            )
+    else:
+        toplevel_packages = _build(
+            imports,
+            abs_paths,
+            follow=follow,
+            follow_depth=follow_depth,
+            source_roots=source_roots,
+            walker=walker,
+        )
+
+    if save_graph is not None:
+        with stats.phase("save graph"):
+            save_snapshot(save_graph, imports, toplevel_packages)
+
+    if cache is not None:
+        cache.prune()
+
+    graph = imports
+    witnesses = None
+    if granularity != "module":
+        with stats.phase("condense"):
+            graph, witnesses = imports.condensed(granularity, package_depth)
+
+    if rank_edges is not None:
+        with stats.phase("rank edges"):
+            count_found = _report_edge_ranking(
+                graph,
+                imports,
+                toplevel_packages,
+                file_,
+                max_edges=rank_edges,
+                time_budget=time_budget,
+                witnesses=witnesses,
+            )
+        count_cycles = None
+    else:
+        with stats.phase("cycles"):
+            count_found = count_cycles = _report_cycles(
+                graph,
+                toplevel_packages,
+                file_,
+                stream=stream,
+                max_cycles=max_cycles,
+                max_cycle_length=max_cycle_length,
+                time_budget=time_budget,
+                mode=mode,
+                witnesses=witnesses,
+            )
+
+    _record_counters(
+        stats,
+        imports,
+        graph,
+        source_roots=source_roots,
+        cache=cache,
+        count_cycles=count_cycles,
+    )
+
+    return count_found
+
+
+def _record_counters(  # noqa: PLR0913
+    stats: Stats,
+    imports: ImportGraph,
+    graph: ImportGraph | ModuleGraph,
+    *,
+    source_roots: SourceRoots,
+    cache: "ImportCache | None",
+    count_cycles: int | None,
+):
+    """Record the counters of a run, once cycles (if any) were looked for."""
+    module_graph = imports.module_graph()
+    stat_calls = source_roots.probes + imports.stat_calls
+    if cache is not None:
+        stat_calls += cache.stat_calls
+    if isinstance(graph, ImportGraph):
+        graph = graph.module_graph()
 
-    return _report_cycles(imports, toplevel_packages, file_)
+    stats.count("package probes", source_roots.probes)
+    stats.count("stat calls", stat_calls)
+    stats.count("directory listings", imports._resolver.scandir_calls)
+    stats.count("nodes", len(module_graph))
+    stats.count("edges", module_graph.edge_count())
+    stats.count("cyclic components", graph.cyclic_components_found)
+    if count_cycles is not None:
+        stats.count("cycles", count_cycles)
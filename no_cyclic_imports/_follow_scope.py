@@ -0,0 +1,55 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+"""
+Limits to which imported modules are followed into, in follow mode.
+
+Imports beyond the scope are still recorded as edges of the import graph,
+only their target modules are not parsed, and so not followed any further.
+"""
+
+import os
+from collections.abc import Collection, Iterable
+
+FOLLOW_SCOPES = ["first-party", "local", "all"]
+
+_INSTALLATION_DIRNAMES = frozenset(["site-packages", "dist-packages"])
+
+
+def is_installed(abs_path: str) -> bool:
+    """Return whether a file is part of an installed distribution."""
+    return not _INSTALLATION_DIRNAMES.isdisjoint(abs_path.split(os.sep))
+
+
+class FollowScope:
+    """
+    Decides which imported modules to follow into.
+
+    With ``"first-party"``, only modules of top-level packages analyzed
+    or given in ``allowed_packages`` are followed, and other modules
+    are not even resolved.  With ``"local"``, only modules that do not
+    resolve to files in site-packages are followed.  With ``"all"``,
+    all modules that can be resolved are followed.
+    """
+
+    def __init__(self, name: str = "all", *, allowed_packages: Iterable[str] = ()):
+        if name not in FOLLOW_SCOPES:
+            raise ValueError(f"Unknown follow scope {name!r}.")  # noqa: EM102, TRY003
+        self.name = name
+        self.allowed_packages = frozenset(allowed_packages)
+
+    def allows_module(
+        self,
+        toplevel_package: str,
+        first_party_packages: Collection[str],
+    ) -> bool:
+        """Return whether to resolve a module of the given top-level package."""
+        return (
+            self.name != "first-party"
+            or toplevel_package in first_party_packages
+            or toplevel_package in self.allowed_packages
+        )
+
+    def allows_file(self, abs_path: str) -> bool:
+        """Return whether to parse a file that a module was resolved to."""
+        return self.name != "local" or not is_installed(abs_path)
@@ -0,0 +1,837 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import heapq
+import logging
+import random
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict, deque
+from collections.abc import Callable, Collection, Iterable, Iterator
+from itertools import product
+
+_logger = logging.getLogger(__name__)
+
+_STEPS_PER_BUDGET_CHECK = 1024
+
+
+class _BudgetExceededError(Exception):
+    pass
+
+
+class SearchBudget:
+    """
+    Time budget for cycle enumeration, shared by all components searched.
+
+    Components whose search was cut short are collected
+    in ``truncated_components``, as sorted lists of module names.
+    """
+
+    def __init__(self, seconds: float | None = None):
+        self._deadline = None if seconds is None else time.monotonic() + seconds
+        self._steps = 0
+        self.truncated_components = []
+
+    @property
+    def exceeded(self) -> bool:
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    def check(self):
+        if self.exceeded:
+            raise _BudgetExceededError
+
+    def tick(self):
+        """Call ``check`` every so many calls only, as it takes a system call."""
+        self._steps += 1
+        if not self._steps % _STEPS_PER_BUDGET_CHECK:
+            self.check()
+
+
+def _strongly_connected_components(  # noqa: C901
+    nodes: Iterable[int],
+    successors_of: Callable[[int], Iterable[int]],
+) -> Iterator[set[int]]:
+    """
+    Yield the strongly connected components reachable from ``nodes``.
+
+    This is Tarjan's linear-time algorithm, without recursion.
+    Function ``successors_of`` is expected to only return nodes
+    of the (sub)graph of interest.
+    """
+    index_of = {}
+    lowlink_of = {}
+    stack = []
+    on_stack = set()
+
+    for root in nodes:
+        if root in index_of:
+            continue
+
+        index_of[root] = lowlink_of[root] = len(index_of)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors_of(root)))]
+
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in index_of:
+                    index_of[successor] = lowlink_of[successor] = len(index_of)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(successors_of(successor))))
+                    break
+                if successor in on_stack:
+                    lowlink_of[node] = min(lowlink_of[node], index_of[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink_of[parent] = min(lowlink_of[parent], lowlink_of[node])
+
+                if lowlink_of[node] == index_of[node]:
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+                        if member == node:
+                            break
+                    yield component
+
+
+class _RestrictedNeighbors(dict):
+    """Lazily computed neighborhoods with regard to a subset of nodes."""
+
+    def __init__(self, adjacency: dict[int, set[int]], nodes: set[int]):
+        super().__init__()
+        self._adjacency = adjacency
+        self._nodes = nodes
+
+    def __missing__(self, node: int) -> set[int]:
+        neighbors = self._adjacency.get(node, set()) & self._nodes
+        self[node] = neighbors
+        return neighbors
+
+
+def _chordless_cycle_search(
+    forward: _RestrictedNeighbors,
+    blocking: _RestrictedNeighbors,
+    path: list[int],
+    length_bound: int | None,
+    budget: SearchBudget,
+) -> Iterator[list[int]]:
+    """
+    Extend chordless path ``path`` to chordless cycles, in all possible ways.
+
+    This follows the algorithm of Dias et al. (https://arxiv.org/abs/1309.1051)
+    as adapted to directed graphs by networkx: cycles are extended along
+    ``forward`` edges while nodes adjacent via ``blocking`` edges
+    (i.e. edges in either direction) are blocked.
+    """
+    blocked = defaultdict(int)
+    target = path[0]
+    blocked[path[1]] = 1
+    for node in path[1:]:
+        for neighbor in blocking[node]:
+            blocked[neighbor] += 1
+
+    stack = [iter(forward[path[2]])]
+    while stack:
+        budget.tick()
+        successors = stack[-1]
+        for node in successors:
+            if blocked[node] == 1 and (
+                length_bound is None or len(path) < length_bound
+            ):
+                node_successors = forward[node]
+                if target in node_successors:
+                    yield [*path, node]
+                else:
+                    node_neighbors = blocking[node]
+                    if target in node_neighbors:
+                        continue
+                    for neighbor in node_neighbors:
+                        blocked[neighbor] += 1
+                    path.append(node)
+                    stack.append(iter(node_successors))
+                    break
+        else:
+            stack.pop()
+            for neighbor in blocking[path.pop()]:
+                blocked[neighbor] -= 1
+
+
+def _nontrivial_components(
+    nodes: set[int],
+    forward: dict[int, set[int]],
+) -> list[set[int]]:
+    """Return the strongly connected components of more than two nodes."""
+    return [
+        component
+        for component in _strongly_connected_components(
+            nodes,
+            lambda node: forward.get(node, set()) & nodes,
+        )
+        if len(component) > 2  # noqa: PLR2004
+    ]
+
+
+def _remove_digons(
+    forward: dict[int, set[int]],
+    backward: dict[int, set[int]],
+) -> Iterator[list[int]]:
+    for node, successors in forward.items():
+        partners = [
+            successor for successor in successors if node in forward.get(successor, ())
+        ]
+        for partner in partners:
+            yield [node, partner]
+            successors.discard(partner)
+            forward[partner].discard(node)
+            backward[node].discard(partner)
+            backward[partner].discard(node)
+
+
+def _feedback_arc_set_order(  # noqa: C901
+    nodes: set[int],
+    forward: dict[int, set[int]],
+    backward: dict[int, set[int]],
+) -> list[int]:
+    """
+    Order nodes so that few edges point backwards, after Eades, Lin and Smyth.
+
+    Sinks are moved to the back and sources to the front, repeatedly;
+    while there are neither, the node with the largest surplus
+    of outgoing over incoming edges is moved to the front.
+    The edges pointing backwards then form a feedback arc set.
+    This takes linear time, give or take the heap operations.
+    """
+    out_degree = {node: len(forward.get(node, ())) for node in nodes}
+    in_degree = {node: len(backward.get(node, ())) for node in nodes}
+    remaining = set(nodes)
+    sinks = deque(sorted(node for node in nodes if not out_degree[node]))
+    sources = deque(sorted(node for node in nodes if not in_degree[node]))
+    heap = [(in_degree[node] - out_degree[node], node) for node in nodes]
+    heapq.heapify(heap)
+    front = []
+    back = []
+
+    def remove(node: int):
+        remaining.discard(node)
+        for successor in forward.get(node, ()):
+            if successor in remaining:
+                in_degree[successor] -= 1
+                if not in_degree[successor]:
+                    sources.append(successor)
+                key = in_degree[successor] - out_degree[successor]
+                heapq.heappush(heap, (key, successor))
+        for predecessor in backward.get(node, ()):
+            if predecessor in remaining:
+                out_degree[predecessor] -= 1
+                if not out_degree[predecessor]:
+                    sinks.append(predecessor)
+                key = in_degree[predecessor] - out_degree[predecessor]
+                heapq.heappush(heap, (key, predecessor))
+
+    while remaining:
+        if sinks:
+            node = sinks.popleft()
+            if node in remaining:
+                back.append(node)
+                remove(node)
+            continue
+        if sources:
+            node = sources.popleft()
+            if node in remaining:
+                front.append(node)
+                remove(node)
+            continue
+        key, node = heapq.heappop(heap)
+        if node in remaining and key == in_degree[node] - out_degree[node]:
+            front.append(node)
+            remove(node)
+
+    back.reverse()
+    return front + back
+
+
+def _shortest_path_counts(
+    start: int,
+    adjacency: dict[int, set[int]],
+) -> tuple[dict[int, int], dict[int, int]]:
+    """Return distance and number of shortest paths from ``start``, per node."""
+    distance_of = {start: 0}
+    count_of = {start: 1}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for neighbor in adjacency.get(node, ()):
+            if neighbor not in distance_of:
+                distance_of[neighbor] = distance_of[node] + 1
+                count_of[neighbor] = 0
+                queue.append(neighbor)
+            if distance_of[neighbor] == distance_of[node] + 1:
+                count_of[neighbor] += count_of[node]
+    return distance_of, count_of
+
+
+class ModuleGraph:
+    """
+    Directed graph of modules with module names interned to integer IDs.
+
+    While edges are being added, successors are kept in one set per node.
+    Before running any graph algorithms, the adjacency is compacted into
+    CSR form (an array of offsets into an array of sorted targets)
+    and the sets are released.  Adding more edges later converts back.
+    The top-level package of each node is interned and stored per node, too.
+    """
+
+    __slots__ = (
+        "_id_of",
+        "_is_source",
+        "_names",
+        "_offsets",
+        "_successors",
+        "_targets",
+        "_toplevel_id_of",
+        "_toplevel_of",
+        "cyclic_components_found",
+    )
+
+    def __init__(self):
+        self._id_of = {}
+        self._names = []
+        self._toplevel_id_of = {}
+        self._toplevel_of = array("I")
+        self._is_source = bytearray()
+        self._successors = []
+        self._offsets = None
+        self._targets = None
+        self.cyclic_components_found = 0
+
+    @classmethod
+    def from_dict(cls, imports_from: dict[str, Iterable[str]]) -> "ModuleGraph":
+        graph = cls()
+        for source, targets in imports_from.items():
+            source_id = graph.add_source(source)
+            for target in targets:
+                graph.add_edge(source_id, graph.intern(target))
+        return graph
+
+    @classmethod
+    def from_arrays(
+        cls,
+        names: list[str],
+        is_source: bytes,
+        offsets: array,
+        targets: array,
+    ) -> "ModuleGraph":
+        """Create a graph from the output of ``to_arrays``."""
+        graph = cls()
+        for name in names:
+            graph.intern(name)
+        graph._is_source[:] = is_source
+        graph._offsets, graph._targets = offsets, targets
+        graph._successors = None
+        return graph
+
+    def to_arrays(self) -> tuple[list[str], bytearray, array, array]:
+        """Return module names, source flags, and adjacency in CSR form."""
+        self._freeze()
+        return self._names, self._is_source, self._offsets, self._targets
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def intern(self, module_name: str) -> int:
+        module_id = self._id_of.get(module_name)
+        if module_id is None:
+            module_id = len(self._names)
+            self._id_of[module_name] = module_id
+            self._names.append(module_name)
+
+            toplevel_package = module_name.split(".", maxsplit=1)[0]
+            toplevel_id = self._toplevel_id_of.setdefault(
+                toplevel_package,
+                len(self._toplevel_id_of),
+            )
+            self._toplevel_of.append(toplevel_id)
+            self._is_source.append(False)
+            if self._successors is not None:
+                self._successors.append(None)
+            else:
+                self._offsets.append(self._offsets[-1])
+        return module_id
+
+    def name_of(self, module_id: int) -> str:
+        return self._names[module_id]
+
+    def id_of(self, module_name: str) -> int | None:
+        return self._id_of.get(module_name)
+
+    def add_source(self, module_name: str) -> int:
+        module_id = self.intern(module_name)
+        self._is_source[module_id] = True
+        return module_id
+
+    def _thaw(self):
+        if self._successors is not None:
+            return
+        offsets, targets = self._offsets, self._targets
+        self._successors = [
+            set(targets[offsets[node] : offsets[node + 1]])
+            if offsets[node] != offsets[node + 1]
+            else None
+            for node in range(len(self._names))
+        ]
+        self._offsets = self._targets = None
+
+    def _freeze(self):
+        if self._successors is None:
+            return
+        offsets = array("I", [0])
+        targets = array("I")
+        for successors in self._successors:
+            if successors:
+                targets.extend(sorted(successors))
+            offsets.append(len(targets))
+        self._offsets, self._targets = offsets, targets
+        self._successors = None
+
+    def add_edge(self, source_id: int, target_id: int) -> bool:
+        """Add an edge, and return whether it was new."""
+        self._thaw()
+        successors = self._successors[source_id]
+        if successors is None:
+            successors = self._successors[source_id] = set()
+        elif target_id in successors:
+            return False
+        successors.add(target_id)
+        return True
+
+    def replace_successors(self, source_id: int, target_ids: Iterable[int]):
+        self._thaw()
+        self._successors[source_id] = set(target_ids) or None
+
+    def remove_source(self, module_id: int):
+        self._thaw()
+        self._successors[module_id] = None
+        self._is_source[module_id] = False
+
+    def _successors_of(self, node: int) -> array:
+        return self._targets[self._offsets[node] : self._offsets[node + 1]]
+
+    def _has_edge(self, source: int, target: int) -> bool:
+        start, stop = self._offsets[source], self._offsets[source + 1]
+        index = bisect_left(self._targets, target, start, stop)
+        return index < stop and self._targets[index] == target
+
+    def edge_count(self) -> int:
+        if self._successors is None:
+            return len(self._targets)
+        return sum(len(successors or ()) for successors in self._successors)
+
+    def to_dict(self) -> dict[str, set[str]]:
+        self._freeze()
+        return {
+            self._names[node]: {
+                self._names[target] for target in self._successors_of(node)
+            }
+            for node in range(len(self._names))
+            if self._is_source[node]
+        }
+
+    def quotient(
+        self,
+        group_of: Callable[[str], str],
+    ) -> tuple["ModuleGraph", dict[tuple[str, str], tuple[str, str]]]:
+        """
+        Collapse modules onto groups, e.g. onto their packages.
+
+        Returns the graph of groups, without edges within a group,
+        and for each of its edges one witness edge between modules.
+        """
+        self._freeze()
+        quotient = ModuleGraph()
+        group_ids = array("I")
+        for node, name in enumerate(self._names):
+            group_id = quotient.intern(group_of(name))
+            group_ids.append(group_id)
+            if self._is_source[node]:
+                quotient._is_source[group_id] = True
+
+        witnesses = {}
+        for node in range(len(self._names)):
+            source_group_id = group_ids[node]
+            for target in self._successors_of(node):
+                target_group_id = group_ids[target]
+                if target_group_id == source_group_id:
+                    continue
+                if quotient.add_edge(source_group_id, target_group_id):
+                    witnesses[
+                        quotient._names[source_group_id],
+                        quotient._names[target_group_id],
+                    ] = (self._names[node], self._names[target])
+        return quotient, witnesses
+
+    def _forward_and_backward(
+        self,
+        nodes: set[int],
+    ) -> tuple[dict[int, set[int]], dict[int, set[int]]]:
+        forward = {}
+        backward = defaultdict(set)
+        for node in nodes:
+            successors = {
+                successor
+                for successor in self._successors_of(node)
+                if successor in nodes
+            }
+            if successors:
+                forward[node] = successors
+                for successor in successors:
+                    backward[successor].add(node)
+        return forward, backward
+
+    def _cycles_through_pivot(  # noqa: PLR0913
+        self,
+        pivot: int,
+        subcomponent: set[int],
+        *,
+        forward: dict[int, set[int]],
+        backward: dict[int, set[int]],
+        blocking: dict[int, set[int]],
+        length_bound: int | None,
+        budget: SearchBudget,
+    ) -> Iterator[list[int]]:
+        forward_cache = blocking_cache = None
+        predecessors = backward.get(pivot, set()) & subcomponent
+        successors = forward.get(pivot, set()) & subcomponent
+        for predecessor, successor in product(predecessors, successors):
+            if self._has_edge(predecessor, successor):
+                continue  # stem with an acyclic chord
+
+            stem = [predecessor, pivot, successor]
+            if predecessor in forward.get(successor, ()):
+                yield stem
+                continue
+
+            if forward_cache is None:
+                forward_cache = _RestrictedNeighbors(forward, subcomponent)
+                blocking_cache = _RestrictedNeighbors(blocking, subcomponent)
+            yield from _chordless_cycle_search(
+                forward_cache,
+                blocking_cache,
+                stem,
+                length_bound,
+                budget,
+            )
+
+    def _chordless_cycles(
+        self,
+        component: set[int],
+        length_bound: int | None,
+        budget: SearchBudget,
+    ) -> Iterator[list[int]]:
+        """
+        Yield all chordless cycles within a strongly connected component.
+
+        This is a port of networkx.chordless_cycles to this representation.
+        """
+        if length_bound is not None and length_bound < 1:
+            return
+
+        loops = {node for node in component if self._has_edge(node, node)}
+        yield from ([node] for node in loops)
+
+        if length_bound is not None and length_bound <= 1:
+            return
+
+        # Nodes with loops cannot belong to longer cycles
+        forward, backward = self._forward_and_backward(component - loops)
+        nodes = forward.keys() | backward.keys()
+        blocking = {
+            node: forward.get(node, set()) | backward.get(node, set()) for node in nodes
+        }
+
+        # Digons are chordless, but must not be extended any further
+        yield from _remove_digons(forward, backward)
+
+        if length_bound is not None and length_bound <= 2:  # noqa: PLR2004
+            return
+
+        subcomponents = _nontrivial_components(nodes, forward)
+        while subcomponents:
+            budget.check()
+            subcomponent = subcomponents.pop()
+            pivot = next(iter(subcomponent))
+            yield from self._cycles_through_pivot(
+                pivot,
+                subcomponent,
+                forward=forward,
+                backward=backward,
+                blocking=blocking,
+                length_bound=length_bound,
+                budget=budget,
+            )
+            subcomponents += _nontrivial_components(subcomponent - {pivot}, forward)
+
+    def _toplevel_ids(
+        self,
+        toplevel_packages: Collection[str] | None,
+    ) -> set[int] | None:
+        if toplevel_packages is None:
+            return None
+        return {
+            self._toplevel_id_of[toplevel_package]
+            for toplevel_package in toplevel_packages
+            if toplevel_package in self._toplevel_id_of
+        }
+
+    def _touches(self, nodes: Iterable[int], toplevel_ids: set[int] | None) -> bool:
+        return toplevel_ids is None or any(
+            self._toplevel_of[node] in toplevel_ids for node in nodes
+        )
+
+    def cyclic_components(
+        self,
+        toplevel_packages: Collection[str] | None = None,
+    ) -> Iterator[frozenset[int]]:
+        """
+        Yield all strongly connected components that contain cycles.
+
+        If ``toplevel_packages`` is given, components that do not touch
+        any of these top-level packages are skipped.
+        """
+        self._freeze()
+        toplevel_ids = self._toplevel_ids(toplevel_packages)
+
+        for component in _strongly_connected_components(
+            range(len(self._names)),
+            self._successors_of,
+        ):
+            if len(component) == 1:
+                (node,) = component
+                if not self._has_edge(node, node):
+                    continue
+
+            if not self._touches(component, toplevel_ids):
+                _logger.debug(
+                    f"Skipping strongly connected component of {len(component)}"
+                    " module(s) not touching any of the packages of interest...",
+                )
+                continue
+
+            self.cyclic_components_found += 1
+            yield frozenset(component)
+
+    def cycles_in(
+        self,
+        component: Collection[int],
+        toplevel_packages: Collection[str] | None = None,
+        length_bound: int | None = None,
+        budget: SearchBudget | None = None,
+    ) -> Iterator[list[str]]:
+        """
+        Yield the chordless cycles of a single strongly connected component.
+
+        If a ``budget`` is given, components whose search runs out of time
+        or that have no cycles within ``length_bound`` are recorded
+        as truncated with it.
+        """
+        self._freeze()
+        toplevel_ids = self._toplevel_ids(toplevel_packages)
+
+        _logger.info(
+            "Enumerating cycles in strongly connected component"
+            f" of {len(component)} module(s)...",
+        )
+        found_cycles = False
+        try:
+            search_budget = SearchBudget() if budget is None else budget
+            search_budget.check()
+            for cycle in self._chordless_cycles(
+                set(component),
+                length_bound,
+                search_budget,
+            ):
+                found_cycles = True
+                if self._touches(cycle, toplevel_ids):
+                    yield [self._names[node] for node in cycle]
+        except _BudgetExceededError:
+            _logger.warning(
+                "Time budget exceeded, skipping (the rest of) strongly connected"
+                f" component of {len(component)} module(s)...",
+            )
+        else:
+            if found_cycles or budget is None:
+                return
+        budget.truncated_components.append(
+            sorted(self._names[node] for node in component),
+        )
+
+    def shortest_cycles_in(
+        self,
+        component: Collection[int],
+        toplevel_packages: Collection[str] | None = None,
+    ) -> Iterator[list[str]]:
+        """
+        Yield one shortest cycle through each edge of a strongly connected component.
+
+        This takes one breadth-first search per node, restricted to the
+        component, rather than enumerating all cycles.  Cycles through
+        multiple edges are yielded only once.
+        """
+        self._freeze()
+        toplevel_ids = self._toplevel_ids(toplevel_packages)
+        nodes = set(component)
+        forward, backward = self._forward_and_backward(nodes)
+
+        _logger.info(
+            "Searching shortest cycles in strongly connected component"
+            f" of {len(component)} module(s)...",
+        )
+        seen_cycles = set()
+        for start in sorted(nodes):
+            parent_of = {start: None}
+            queue = deque([start])
+            while queue:
+                node = queue.popleft()
+                for successor in forward.get(node, ()):
+                    if successor not in parent_of:
+                        parent_of[successor] = node
+                        queue.append(successor)
+
+            for end in sorted(backward.get(start, ())):
+                # Edge "end -> start" closes the path "start -> ... -> end"
+                cycle = []
+                node = end
+                while node is not None:
+                    cycle.append(node)
+                    node = parent_of[node]
+                cycle.reverse()
+
+                smallest_index = cycle.index(min(cycle))
+                canonical_cycle = tuple(
+                    cycle[smallest_index:] + cycle[:smallest_index],
+                )
+                if canonical_cycle in seen_cycles:
+                    continue
+                seen_cycles.add(canonical_cycle)
+
+                if self._touches(cycle, toplevel_ids):
+                    yield [self._names[node] for node in cycle]
+
+    def rank_edges_in(
+        self,
+        component: Collection[int],
+        *,
+        samples: int = 256,
+        seed: int = 0,
+        budget: SearchBudget | None = None,
+    ) -> list[tuple[str, str, bool, float]]:
+        """
+        Rank the edges of a strongly connected component by how many cycles they keep.
+
+        Returns source and target name of each edge, whether the edge
+        is part of an approximate minimum feedback arc set (after Eades,
+        Lin and Smyth), and a score, most critical edges first.
+        Feedback arc set edges come first, as removing all of them
+        breaks all cycles.  The score estimates how many of the shortest
+        cycles closed by each edge of the component pass through the edge.
+
+        Scores are estimated rather than enumerating cycles:
+        for each of up to ``samples`` edges "u -> v" drawn at random,
+        all shortest paths from v back to u are counted by breadth-first
+        search (forwards from v and backwards from u), and each edge
+        on them is credited with the fraction of those paths through it.
+        Credits are then scaled up to all edges of the component.
+        If the ``budget`` runs out, fewer edges are sampled.
+        """
+        self._freeze()
+        nodes = set(component)
+        forward, backward = self._forward_and_backward(nodes)
+        edges = sorted(
+            (source, target)
+            for source, targets in forward.items()
+            for target in targets
+        )
+
+        _logger.info(
+            f"Ranking {len(edges)} import(s) in strongly connected component"
+            f" of {len(component)} module(s)...",
+        )
+        position_of = {
+            node: position
+            for position, node in enumerate(
+                _feedback_arc_set_order(nodes, forward, backward),
+            )
+        }
+
+        sampled_edges = edges
+        if len(edges) > samples:
+            sampled_edges = random.Random(seed).sample(edges, samples)  # noqa: S311
+        credit_of = dict.fromkeys(edges, 0.0)
+        samples_taken = 0
+        for closing_source, closing_target in sampled_edges:
+            if samples_taken and budget is not None and budget.exceeded:
+                break
+            samples_taken += 1
+            credit_of[closing_source, closing_target] += 1.0
+            # Shortest paths "closing_target -> ... -> closing_source"
+            distance_from, count_from = _shortest_path_counts(closing_target, forward)
+            distance_to, count_to = _shortest_path_counts(closing_source, backward)
+            length = distance_from[closing_source]
+            paths = count_from[closing_source]
+            for node, distance in distance_from.items():
+                if distance >= length:
+                    continue
+                for successor in forward.get(node, ()):
+                    if distance + 1 + distance_to.get(successor, length) == length:
+                        credit_of[node, successor] += (
+                            count_from[node] * count_to[successor] / paths
+                        )
+
+        scale = len(edges) / samples_taken if samples_taken else 0.0
+        ranked_edges = [
+            (
+                self._names[source],
+                self._names[target],
+                position_of[source] >= position_of[target],
+                credit * scale,
+            )
+            for (source, target), credit in credit_of.items()
+        ]
+        ranked_edges.sort(key=lambda edge: (not edge[2], -edge[3], edge[:2]))
+        return ranked_edges
+
+    def iterate_shortest_cycles(
+        self,
+        toplevel_packages: Collection[str] | None = None,
+    ) -> Iterator[list[str]]:
+        """Yield one shortest cycle through each edge that is part of any cycle."""
+        for component in self.cyclic_components(toplevel_packages):
+            yield from self.shortest_cycles_in(component, toplevel_packages)
+
+    def iterate_cycles(
+        self,
+        toplevel_packages: Collection[str] | None = None,
+        length_bound: int | None = None,
+        budget: SearchBudget | None = None,
+    ) -> Iterator[list[str]]:
+        """
+        Yield all chordless cycles of the graph, as lists of module names.
+
+        Cycles are searched for within each strongly connected component
+        separately.  If ``toplevel_packages`` is given, only cycles touching
+        any of these top-level packages are yielded, and components
+        that do not touch any of them are skipped entirely.
+        """
+        for component in self.cyclic_components(toplevel_packages):
+            yield from self.cycles_in(
+                component,
+                toplevel_packages,
+                length_bound,
+                budget,
+            )
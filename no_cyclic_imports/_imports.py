@@ -1,107 +1,50 @@
 # Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
 # Licensed under Affero GPL v3 or later
 
+import contextlib
+import itertools
 import logging
 import os.path
-import sys
+from array import array
+from collections.abc import Collection, Iterable, Iterator
+from typing import TYPE_CHECKING
 
-from import_deps import ast_imports
-from networkx import DiGraph, chordless_cycles
+from ._follow_scope import FollowScope
+from ._graph import ModuleGraph, SearchBudget
+from ._resolution import ModuleResolver, PythonSourceNotFoundError
+from ._scanner import scan_file
+from ._source_roots import SourceRoots
+from ._stats import Stats
+from ._stdlib import in_standard_library
 
-_logger = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    from ._cache import ImportCache, MemoryImportCache
 
-_stdlib_module_names = set()  # initialized via _initialize_stdlib_module_names() below
+_logger = logging.getLogger(__name__)
 
 
 def toplevel_package_of(module_name: str) -> str:
     return module_name.split(".", maxsplit=1)[0]
 
 
-def _initialize_stdlib_module_names():
-    from stdlib_list.base import long_versions, stdlib_list  # noqa: PLC0415
-
-    for long_version in long_versions:
-        _stdlib_module_names.update(stdlib_list(long_version))
-
-
-def in_standard_library(candidate_module_name: str) -> bool:
-    if not _stdlib_module_names:
-        _initialize_stdlib_module_names()
-        assert _stdlib_module_names
-
-    return toplevel_package_of(candidate_module_name) in _stdlib_module_names
-
-
-class PythonSourceNotFoundError(Exception):
-    def __init__(self, module_names: list[str]):
-        self.module_names = module_names
-
-    @property
-    def most_generic_module_name(self):
-        return self.module_names[-1]
-
-    def __str__(self):
-        return (
-            f"Import {self.most_generic_module_name!r} could not be resolved"
-            " to a Python source file with regard to PYTHONPATH."
-        )
-
-
-def determine_path_of(module_name: str, _breadcrumbs: list[str] | None = None) -> str:
-    if _breadcrumbs is None:
-        _breadcrumbs = []
-    _breadcrumbs.append(module_name)
-
-    module_name_split = module_name.split(".")
-
-    for path in sys.path:
-        module_candidate_path = os.path.join(
-            path,
-            *(module_name_split[:-1]),
-            module_name_split[-1] + ".py",
-        )
-        if os.path.exists(module_candidate_path):
-            return module_candidate_path
-
-        package_candidate_path = os.path.join(
-            path,
-            *(*module_name_split, "__init__.py"),
-        )
-        if os.path.exists(package_candidate_path):
-            return package_candidate_path
-
-    # Let's try to make the error about top-level packages
-    if len(module_name_split) > 1:
-        parent_module_name = ".".join(module_name_split[:-1])
-
-        # Let's see if this raises ModuleNotFoundError:
-        determine_path_of(parent_module_name, _breadcrumbs)
-
-    raise PythonSourceNotFoundError(_breadcrumbs)
-
-
-def determine_source_module_name(abs_path: str) -> str:
-    abs_path_backup = abs_path
-
+def determine_source_module_name(
+    abs_path: str,
+    source_roots: SourceRoots | None = None,
+) -> str:
     if not abs_path.endswith(".py"):
         raise ValueError(f"Path {abs_path!r} does not end in '.py'.")  # noqa: EM102, TRY003
-    abs_path = abs_path[: -len(".py")]
 
-    parts = []
-    while True:
-        package_path = os.path.dirname(abs_path)
-        module_name = os.path.basename(abs_path)
-        init_py_path = os.path.join(package_path, "__init__.py")
+    if source_roots is None:
+        source_roots = SourceRoots()
 
-        parts.append(module_name)
-        abs_path = package_path
+    package_path, module_basename = os.path.split(abs_path[: -len(".py")])
+    module_name = ".".join(
+        (*source_roots.package_parts_of(package_path), module_basename),
+    )
 
-        if not os.path.exists(init_py_path):
-            module_name = ".".join(reversed(parts))
-            _logger.debug(
-                f"File {abs_path_backup!r} found to be module {module_name!r}.",
-            )
-            return module_name
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug(f"File {abs_path!r} found to be module {module_name!r}.")
+    return module_name
 
 
 def without_dot_init(module_name):
@@ -135,92 +78,596 @@ def determine_target_module_name(
             ]
         target_module = ".".join(target_module_path)
 
-    _logger.debug(
-        f"Import {(module_name_or_none, object_name, as_name, depth_or_none)}"
-        f" from module {source_module!r} found to target module {target_module!r}.",
-    )
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug(
+            f"Import {(module_name_or_none, object_name, as_name, depth_or_none)}"
+            f" from module {source_module!r} found to target module"
+            f" {target_module!r}.",
+        )
 
     return target_module
 
 
-def _wrapped_ast_imports(abs_path):
+def _wrapped_scan_file(abs_path: str) -> list[tuple] | None:
+    """Return the raw imports of a file, or ``None`` if it no longer exists."""
     try:
-        yield from ast_imports(abs_path)
-    except UnicodeDecodeError as e:
+        return scan_file(abs_path)
+    except FileNotFoundError:
+        return None
+    except (LookupError, UnicodeDecodeError) as e:
         _logger.warning(f"Parse error for file {abs_path!r}: {e}")
+        return []
+
+
+def _analyze_file(
+    abs_path: str,
+    source_module: str,
+    python_version: str | None = None,
+    imports=None,
+) -> tuple[list, list[str]] | None:
+    """
+    Determine raw imports and non-stdlib target modules of a file.
+
+    Returns ``None`` for a file removed since it was found.
+    Being a top-level function, this can be run by pool worker processes.
+    """
+    if imports is None:
+        imports = _wrapped_scan_file(abs_path)
+        if imports is None:
+            return None
+
+    target_modules = []
+    for (
+        module_name_or_none,
+        object_name,
+        as_name,
+        depth_or_none,
+    ) in imports:
+        target_module = determine_target_module_name(
+            source_module,
+            module_name_or_none,
+            object_name,
+            as_name,
+            depth_or_none,
+        )
+        target_module = without_dot_init(target_module)
+
+        if in_standard_library(target_module, python_version):
+            continue
+
+        target_modules.append(target_module)
+
+    return imports, target_modules
+
+
+def _create_process_pool(max_workers: int):
+    # Loads multiprocessing, so only when there is parsing to do
+    import multiprocessing  # noqa: PLC0415
+    from concurrent.futures import ProcessPoolExecutor  # noqa: PLC0415
+
+    # Forking is unsafe while threads (e.g. of a directory walk
+    # still going on) are running, so let's fork from a clean server
+    # process instead, where available
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # Workers are forked with this module imported already
+        context.set_forkserver_preload([__name__])
+    else:
+        context = multiprocessing.get_context()
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+
+
+_MIN_FILES_FOR_PROCESS_POOL = 64
+_MAX_FILES_PER_CHUNK = 64
+_FILES_PER_BATCH = 1024
 
 
 class ImportGraph:
-    def __init__(self):
-        self._imports_from = {}
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        cache: "ImportCache | MemoryImportCache | None" = None,
+        jobs: int = 1,
+        resolver: ModuleResolver | None = None,
+        source_roots: SourceRoots | None = None,
+        python_version: str | None = None,
+        stats: Stats | None = None,
+        follow_scope: FollowScope | None = None,
+        record_fingerprints: bool = False,
+    ):
+        self._graph = ModuleGraph()
+        self._targets_of_file = {}
+        self._fingerprints = {} if record_fingerprints else None
+        self._files_of_module = {}
+        self._changed_modules = set()
         self._seen_files = set()
         self._tried_to_follow = set()
-
-    def _add_module(self, module_name: str, *, follow: bool):
-        if module_name in self._tried_to_follow:
-            _logger.debug(f"Skipping module {module_name!r} as tried before...")
+        self._cache = cache
+        self._resolver = ModuleResolver() if resolver is None else resolver
+        self._source_roots = SourceRoots() if source_roots is None else source_roots
+        self._python_version = python_version
+        self._jobs = jobs
+        self._executor = None
+        self._follow_scope = FollowScope() if follow_scope is None else follow_scope
+        self.first_party_packages = set()
+        self.stat_calls = 0
+        self.stats = Stats() if stats is None else stats
+
+    def _take_fingerprints(self, abs_paths: Iterable[str]):
+        # Stat'ing before reading errs on the side of a stale fingerprint,
+        # should the file change in between
+        if self._fingerprints is None:
             return
+        for abs_path in abs_paths:
+            self.stat_calls += 1
+            try:
+                stat_result = os.stat(abs_path)
+            except FileNotFoundError:
+                self._fingerprints.pop(abs_path, None)
+                continue
+            self._fingerprints[abs_path] = stat_result.st_mtime_ns, stat_result.st_size
+
+    def _cached_imports_of(self, abs_path: str) -> list[tuple] | None:
+        if self._cache is None:
+            return None
+        try:
+            return self._cache.get(abs_path)
+        except FileNotFoundError:
+            return None  # i.e. let parsing find out that the file is gone
+
+    def _cache_imports_of(self, abs_path: str, imports: list[tuple]):
+        if self._cache is None:
+            return
+        with contextlib.suppress(FileNotFoundError):
+            self._cache.put(abs_path, imports)
+
+    def _analyze(self, abs_path: str) -> tuple[str, list[str]] | None:
+        """
+        Return module name and target modules of a file.
+
+        Returns ``None`` for a file removed since it was found.
+        """
+        source_module = determine_source_module_name(abs_path, self._source_roots)
+        cached_imports = self._cached_imports_of(abs_path)
+        analyzed = _analyze_file(
+            abs_path,
+            source_module,
+            self._python_version,
+            cached_imports,
+        )
+        if analyzed is None:
+            return None
+        imports, target_modules = analyzed
+        if cached_imports is None:
+            self.stats.count("files parsed")
+            self._cache_imports_of(abs_path, imports)
+        else:
+            self.stats.count("files from cache")
+        return source_module, target_modules
+
+    def _analyze_many(
+        self,
+        abs_paths: list[str],
+    ) -> list[tuple[str, list[str]] | None]:
+        if self._jobs <= 1 or len(abs_paths) < _MIN_FILES_FOR_PROCESS_POOL:
+            return [self._analyze(abs_path) for abs_path in abs_paths]
+
+        results = {}
+        misses = []
+        for abs_path in abs_paths:
+            source_module = determine_source_module_name(abs_path, self._source_roots)
+            cached_imports = self._cached_imports_of(abs_path)
+            if cached_imports is None:
+                misses.append((abs_path, source_module))
+            else:
+                self.stats.count("files from cache")
+                _, target_modules = _analyze_file(
+                    abs_path,
+                    source_module,
+                    self._python_version,
+                    cached_imports,
+                )
+                results[abs_path] = source_module, target_modules
+
+        if misses:
+            if self._executor is None:
+                self._executor = _create_process_pool(self._jobs)
+            chunksize = max(
+                1,
+                min(_MAX_FILES_PER_CHUNK, len(misses) // (self._jobs * 4)),
+            )
+            _logger.info(
+                f"Parsing {len(misses)} file(s) using {self._jobs} processes...",
+            )
+            self.stats.count("files parsed", len(misses))
+            missed_abs_paths, missed_source_modules = zip(*misses, strict=True)
+            for abs_path, source_module, analyzed in zip(
+                missed_abs_paths,
+                missed_source_modules,
+                self._executor.map(
+                    _analyze_file,
+                    missed_abs_paths,
+                    missed_source_modules,
+                    itertools.repeat(self._python_version),
+                    chunksize=chunksize,
+                ),
+                strict=True,
+            ):
+                if analyzed is None:
+                    results[abs_path] = None
+                    continue
+                imports, target_modules = analyzed
+                self._cache_imports_of(abs_path, imports)
+                results[abs_path] = source_module, target_modules
+
+        return [results[abs_path] for abs_path in abs_paths]
+
+    def _record(
+        self,
+        abs_path: str,
+        source_module: str,
+        found_target_modules: list[str],
+    ) -> list[str]:
+        source_id = self._graph.add_source(without_dot_init(source_module))
+        target_modules = list(dict.fromkeys(found_target_modules))
+        target_ids = array("I")
+        log_edges = _logger.isEnabledFor(logging.INFO)
+
+        for target_module in target_modules:
+            target_id = self._graph.intern(target_module)
+            target_ids.append(target_id)
+            if self._graph.add_edge(source_id, target_id):
+                self._changed_modules.add(source_id)
+                if log_edges:
+                    _logger.info(
+                        f"Recording import from {source_module!r}"
+                        f" to {target_module!r}...",
+                    )
+
+        self._targets_of_file[abs_path] = source_id, target_ids
+        self._files_of_module.setdefault(source_id, []).append(abs_path)
+
+        return target_modules
+
+    def _forget(self, abs_path: str):
+        source_id, _ = self._targets_of_file.pop(abs_path)
+        files = self._files_of_module[source_id]
+        files.remove(abs_path)
+
+        if files:
+            self._graph.replace_successors(
+                source_id,
+                set().union(*(self._targets_of_file[file][1] for file in files)),
+            )
+        else:
+            del self._files_of_module[source_id]
+            self._graph.remove_source(source_id)
+        self._changed_modules.add(source_id)
+
+    def _drop_vanished(self, abs_path: str):
+        _logger.info(f"Skipping file {abs_path!r} as removed meanwhile...")
+        self._seen_files.discard(abs_path)
+        if self._fingerprints is not None:
+            self._fingerprints.pop(abs_path, None)
+
+    def pop_changed_modules(self) -> set[int]:
+        """Return (and reset) the IDs of all modules with changed imports."""
+        changed_modules = self._changed_modules
+        self._changed_modules = set()
+        return changed_modules
+
+    def _resolve_for_following(self, module_name: str) -> str | None:
+        if module_name in self._tried_to_follow:
+            if _logger.isEnabledFor(logging.DEBUG):
+                _logger.debug(f"Skipping module {module_name!r} as tried before...")
+            return None
 
         self._tried_to_follow.add(module_name)
 
-        module_filename = determine_path_of(module_name)
-
-        self.add_file(module_filename, follow=follow)
+        if not self._follow_scope.allows_module(
+            toplevel_package_of(module_name),
+            self.first_party_packages,
+        ):
+            self.stats.count("modules out of follow scope")
+            return None
+
+        try:
+            abs_path = self._resolver.determine_path_of(module_name)
+        except PythonSourceNotFoundError as e:
+            self.stats.count("resolution misses")
+            if e.most_generic_module_name not in self._tried_to_follow:
+                _logger.warning(e)
+            self._tried_to_follow.update(e.module_names)
+            return None
+
+        if not self._follow_scope.allows_file(abs_path):
+            self.stats.count("modules out of follow scope")
+            return None
+        return abs_path
+
+    def _resolve_many(self, module_names: Iterable[str]) -> list[str]:
+        abs_paths = {}
+        for module_name in module_names:
+            abs_path = self._resolve_for_following(module_name)
+            if abs_path is not None and abs_path not in self._seen_files:
+                abs_paths[abs_path] = None
+        return list(abs_paths)
 
     def add_file(self, abs_path: str, *, follow: bool):
         if abs_path in self._seen_files:
-            _logger.debug(f"Skipping file {abs_path!r} as seen before...")
+            self.stats.count("files skipped")
+            if _logger.isEnabledFor(logging.DEBUG):
+                _logger.debug(f"Skipping file {abs_path!r} as seen before...")
             return
 
-        _logger.info(f"Adding file {abs_path!r}...")
+        self.add_files([abs_path], follow=follow)
+
+    def _add_batch(
+        self,
+        abs_paths: list[str],
+        *,
+        first_party: bool,
+    ) -> dict[str, None]:
+        """Parse and record files not seen before, return modules discovered."""
+        pending = [
+            abs_path
+            for abs_path in dict.fromkeys(abs_paths)
+            if abs_path not in self._seen_files
+        ]
+        self.stats.count("files skipped", len(abs_paths) - len(pending))
+        self._seen_files.update(pending)
+        if _logger.isEnabledFor(logging.INFO):
+            for abs_path in pending:
+                _logger.info(f"Adding file {abs_path!r}...")
+
+        with self.stats.phase("parse"):
+            self._take_fingerprints(pending)
+            analyzed = self._analyze_many(pending)
+
+        discovered = {}
+        with self.stats.phase("record"):
+            for abs_path, analyzed_file in zip(pending, analyzed, strict=True):
+                if analyzed_file is None:
+                    self._drop_vanished(abs_path)
+                    continue
+                source_module, found_target_modules = analyzed_file
+                target_modules = self._record(
+                    abs_path,
+                    source_module,
+                    found_target_modules,
+                )
+                discovered.update(dict.fromkeys(target_modules))
+                if first_party:
+                    self.first_party_packages.add(toplevel_package_of(source_module))
+        return discovered
+
+    def add_files(
+        self,
+        abs_paths: Iterable[str],
+        *,
+        follow: bool,
+        follow_depth: int | None = None,
+    ):
+        """
+        Add files, and in follow mode the files they import, breadth-first.
+
+        Files are taken from ``abs_paths`` in batches as they come in,
+        so that parsing starts before e.g. a directory walk is complete.
+        Following is driven by an explicit work queue rather than recursion:
+        each round parses a batch of files, and then resolves all modules
+        newly discovered by that batch together to form the next batch.
+        With ``follow_depth`` given, at most that many rounds of following
+        are done.  The top-level packages of the files given (rather than
+        followed into) are collected in ``first_party_packages``.
+        """
+        abs_paths = iter(abs_paths)
+        discovered = {}
+        try:
+            while True:
+                with self.stats.phase("walk"):
+                    batch = list(itertools.islice(abs_paths, _FILES_PER_BATCH))
+                if not batch:
+                    break
+                discovered.update(self._add_batch(batch, first_party=True))
+
+            if follow:
+                self._follow(discovered, follow_depth)
+        finally:
+            self._shutdown_executor()
+
+    def _follow(self, discovered: Iterable[str], follow_depth: int | None = None):
+        depth = 0
+        while follow_depth is None or depth < follow_depth:
+            depth += 1
+            with self.stats.phase("resolve"):
+                pending = self._resolve_many(discovered)
+            if not pending:
+                break
+            discovered = self._add_batch(pending, first_party=False)
+
+    def update_file(self, abs_path: str, *, follow: bool):
+        """
+        Add a new file, or replace the imports of a file added before.
+
+        A file removed in the meantime is dropped rather than updated.
+        """
+        if abs_path in self._targets_of_file:
+            _logger.info(f"Updating file {abs_path!r}...")
+            self._forget(abs_path)
+            self._take_fingerprints([abs_path])
+            analyzed = self._analyze(abs_path)
+            if analyzed is None:
+                self._drop_vanished(abs_path)
+                return
+            source_module, found_target_modules = analyzed
+            target_modules = self._record(abs_path, source_module, found_target_modules)
+            if follow:
+                try:
+                    self._follow(target_modules)
+                finally:
+                    self._shutdown_executor()
+        else:
+            self.add_files([abs_path], follow=follow)
+
+    def remove_file(self, abs_path: str):
+        """Remove the imports of a file added before."""
+        if abs_path not in self._targets_of_file:
+            return
+        _logger.info(f"Removing file {abs_path!r}...")
+        self._forget(abs_path)
+        self._seen_files.discard(abs_path)
+        if self._fingerprints is not None:
+            self._fingerprints.pop(abs_path, None)
+
+    def restore(
+        self,
+        graph: ModuleGraph,
+        targets_of_file: dict[str, tuple],
+        fingerprints: dict[str, tuple[int, int]] | None = None,
+    ):
+        """Take over a module graph and the import records of its files."""
+        self._graph = graph
+        self._targets_of_file = targets_of_file
+        if self._fingerprints is not None:
+            self._fingerprints = dict(fingerprints or {})
+        self._files_of_module = {}
+        for abs_path, (source_id, _) in targets_of_file.items():
+            self._files_of_module.setdefault(source_id, []).append(abs_path)
+        self._seen_files = set(targets_of_file)
+
+    def targets_of_file(self) -> dict[str, tuple[int, array]]:
+        """Return the module ID and imported module IDs of each file added."""
+        return self._targets_of_file
+
+    def fingerprints(self) -> dict[str, tuple[int, int]]:
+        """
+        Return modification time in nanoseconds and size of each file added.
+
+        Fingerprints are taken before parsing each file (or restored
+        from a snapshot), and only with ``record_fingerprints`` set.
+        """
+        if self._fingerprints is None:
+            raise ValueError("Fingerprints are not recorded.")  # noqa: EM101, TRY003
+        return self._fingerprints
+
+    def module_graph(self) -> ModuleGraph:
+        return self._graph
+
+    def add_file_records(self, records: Iterable[tuple[str, str, list[str]]]):
+        """Add files with known imports, rather than analyzing them (again)."""
+        for abs_path, source_module, target_modules in records:
+            self._seen_files.add(abs_path)
+            self._record(abs_path, source_module, target_modules)
+
+    def file_records(self) -> Iterator[tuple[str, str, list[str]]]:
+        """Yield path, module name and imported module names of all files added."""
+        for abs_path, (source_id, target_ids) in self._targets_of_file.items():
+            yield (
+                abs_path,
+                self._graph.name_of(source_id),
+                [self._graph.name_of(target_id) for target_id in target_ids],
+            )
 
-        self._seen_files.add(abs_path)
+    def name_of(self, module_id: int) -> str:
+        return self._graph.name_of(module_id)
+
+    def file_of_import(self, source_module: str, target_module: str) -> str | None:
+        """Return the first file of module ``source_module`` importing another."""
+        source_id = self._graph.id_of(source_module)
+        target_id = self._graph.id_of(target_module)
+        for abs_path in self._files_of_module.get(source_id, ()):
+            if target_id in self._targets_of_file[abs_path][1]:
+                return abs_path
+        return None
+
+    def condensed(
+        self,
+        granularity: str,
+        depth: int | None = None,
+    ) -> tuple[ModuleGraph, dict[tuple[str, str], tuple[str, str]]]:
+        """
+        Collapse modules onto their packages or top-level packages.
+
+        With granularity ``"package"``, modules are collapsed onto
+        the package containing them -- or with ``depth`` given, onto
+        the first ``depth`` parts of their name.  For each edge of the
+        resulting graph, one witness edge between modules is returned.
+        """
+        if granularity == "toplevel":
+            return self._graph.quotient(toplevel_package_of)
+
+        if depth is not None:
+            return self._graph.quotient(
+                lambda module_name: ".".join(module_name.split(".", depth)[:depth]),
+            )
 
-        source_module = determine_source_module_name(abs_path)
-        target_modules = self._imports_from.setdefault(
-            without_dot_init(source_module),
-            set(),
+        packages = {
+            self._graph.name_of(source_id)
+            for abs_path, (source_id, _) in self._targets_of_file.items()
+            if os.path.basename(abs_path) == "__init__.py"
+        }
+        return self._graph.quotient(
+            lambda module_name: (
+                module_name
+                if module_name in packages
+                else module_name.rpartition(".")[0] or module_name
+            ),
         )
 
-        for (
-            module_name_or_none,
-            object_name,
-            as_name,
-            depth_or_none,
-        ) in _wrapped_ast_imports(
-            abs_path,
-        ):
-            target_module = determine_target_module_name(
-                source_module,
-                module_name_or_none,
-                object_name,
-                as_name,
-                depth_or_none,
+    def forget_resolutions(self):
+        """Resolve discovered imports anew, e.g. after files were added or removed."""
+        self._tried_to_follow.clear()
+        self._resolver.clear()
+
+    def _shutdown_executor(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def iterate_cycles(
+        self,
+        toplevel_packages: Collection[str] | None = None,
+        length_bound: int | None = None,
+        budget: SearchBudget | None = None,
+    ) -> Iterator[list[str]]:
+        for component in self._graph.cyclic_components(toplevel_packages):
+            yield from self._graph.cycles_in(
+                component,
+                toplevel_packages,
+                length_bound,
+                budget,
             )
-            target_module = without_dot_init(target_module)
 
-            if in_standard_library(target_module):
-                continue
-
-            if target_module not in target_modules:
-                _logger.info(
-                    f"Recording import from {source_module!r} to {target_module!r}...",
-                )
-            target_modules.add(target_module)
+    def iterate_shortest_cycles(
+        self,
+        toplevel_packages: Collection[str] | None = None,
+    ) -> Iterator[list[str]]:
+        for component in self._graph.cyclic_components(toplevel_packages):
+            yield from self._graph.shortest_cycles_in(component, toplevel_packages)
+
+    def cyclic_components(
+        self,
+        toplevel_packages: Collection[str] | None = None,
+    ) -> Iterator[frozenset[int]]:
+        return self._graph.cyclic_components(toplevel_packages)
+
+    def cycles_in(
+        self,
+        component: Collection[int],
+        toplevel_packages: Collection[str] | None = None,
+        length_bound: int | None = None,
+        budget: SearchBudget | None = None,
+    ) -> Iterator[list[str]]:
+        return self._graph.cycles_in(
+            component,
+            toplevel_packages,
+            length_bound,
+            budget,
+        )
 
-        if follow and target_modules:
-            for module_name in target_modules:
-                try:
-                    self._add_module(module_name, follow=True)
-                except PythonSourceNotFoundError as e:  # noqa: PERF203
-                    if e.most_generic_module_name not in self._tried_to_follow:
-                        _logger.warning(e)
-                    self._tried_to_follow.update(e.module_names)
-
-    def iterate_cycles(self):
-        edges = []
-        for source, targets in self._imports_from.items():
-            for target in targets:
-                edges.append((source, target))  # noqa: PERF401
-        graph = DiGraph(edges)
-        yield from chordless_cycles(graph)
+    def rank_edges_in(
+        self,
+        component: Collection[int],
+        **kwargs,
+    ) -> list[tuple[str, str, bool, float]]:
+        return self._graph.rank_edges_in(component, **kwargs)
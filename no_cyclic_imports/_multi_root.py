@@ -0,0 +1,235 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+"""
+Analysis of many sibling projects with a single shared import graph.
+
+All projects are parsed into one import graph sharing one resolution
+cache, cycles are enumerated once per strongly connected component
+of that union graph, and each cycle is then reported to every project
+whose top-level packages it touches.
+"""
+
+import itertools
+import json
+import os
+from typing import IO, TYPE_CHECKING
+
+from ._engine import (
+    ToplevelCollector,
+    _collect_py_files,
+    _format_cycle,
+    _record_counters,
+    _render_report,
+    _render_truncation,
+)
+from ._follow_scope import FollowScope
+from ._graph import SearchBudget
+from ._imports import ImportGraph, toplevel_package_of
+from ._source_roots import SourceRoots
+from ._stats import Stats
+from ._walk import TreeWalker
+
+if TYPE_CHECKING:
+    from ._cache import ImportCache
+
+
+def _project_names(abs_paths: list[str]) -> list[str]:
+    """Name projects by their path relative to their common parent directory."""
+    if len(abs_paths) == 1:
+        return [os.path.basename(abs_paths[0])]
+    common_path = os.path.commonpath(abs_paths)
+    return [
+        os.path.relpath(abs_path, common_path).replace(os.sep, "-")
+        for abs_path in abs_paths
+    ]
+
+
+def _projects_touched(
+    module_names: list[str],
+    projects_of_toplevel_package: dict[str, list[int]],
+) -> set[int]:
+    projects = set()
+    for module_name in module_names:
+        projects.update(
+            projects_of_toplevel_package.get(toplevel_package_of(module_name), ()),
+        )
+    return projects
+
+
+def _cycles_per_project(  # noqa: PLR0913
+    imports: ImportGraph,
+    projects_of_toplevel_package: dict[str, list[int]],
+    project_count: int,
+    *,
+    max_cycle_length: int | None,
+    time_budget: float | None,
+    mode: str,
+) -> tuple[list[list[str]], list[list[list[str]]]]:
+    """Return report lines and truncated components, per project."""
+    budget = SearchBudget(time_budget)
+    toplevel_packages = set(projects_of_toplevel_package)
+    if mode == "shortest":
+        cycles = imports.iterate_shortest_cycles(toplevel_packages)
+    else:
+        cycles = imports.iterate_cycles(toplevel_packages, max_cycle_length, budget)
+
+    lines_of_project = [[] for _ in range(project_count)]
+    seen_lines = set()
+    for cycle in cycles:
+        line = _format_cycle(cycle)
+        if line in seen_lines:
+            continue
+        seen_lines.add(line)
+        for project_index in _projects_touched(cycle, projects_of_toplevel_package):
+            lines_of_project[project_index].append(line)
+
+    truncated_of_project = [[] for _ in range(project_count)]
+    for module_names in budget.truncated_components:
+        for project_index in _projects_touched(
+            module_names,
+            projects_of_toplevel_package,
+        ):
+            truncated_of_project[project_index].append(module_names)
+
+    return lines_of_project, truncated_of_project
+
+
+def _render_reports(
+    lines_of_project: list[list[str]],
+    truncated_of_project: list[list[list[str]]],
+) -> tuple[list[str], list[int]]:
+    reports = []
+    exit_codes = []
+    for lines, truncated_components in zip(
+        lines_of_project,
+        truncated_of_project,
+        strict=True,
+    ):
+        report = _render_report(lines)
+        if truncated_components:
+            report += _render_truncation(truncated_components)
+        reports.append(report)
+        exit_codes.append(2 if lines or truncated_components else 0)
+    return reports, exit_codes
+
+
+def _write_reports(
+    report_dir: str,
+    project_names: list[str],
+    abs_paths: list[str],
+    reports: list[str],
+    exit_codes: list[int],
+):
+    os.makedirs(report_dir, exist_ok=True)
+    summary = []
+    for project_name, abs_path, report, exit_code in zip(
+        project_names,
+        abs_paths,
+        reports,
+        exit_codes,
+        strict=True,
+    ):
+        report_filename = f"{project_name}.txt"
+        with open(os.path.join(report_dir, report_filename), "w") as f:
+            f.write(report)
+        summary.append(
+            {
+                "name": project_name,
+                "path": abs_path,
+                "report": report_filename,
+                "exit_code": exit_code,
+            },
+        )
+    with open(os.path.join(report_dir, "summary.json"), "w") as f:
+        json.dump({"projects": summary}, f, indent=2)
+        f.write("\n")
+
+
+def run_multi_root(  # noqa: PLR0913
+    abs_paths: list[str],
+    *,
+    follow: bool,
+    file_: IO,
+    report_dir: str | None = None,
+    follow_depth: int | None = None,
+    cache: "ImportCache | None" = None,
+    jobs: int = 1,
+    source_roots: SourceRoots | None = None,
+    python_version: str | None = None,
+    max_cycle_length: int | None = None,
+    time_budget: float | None = None,
+    mode: str = "all",
+    stats: Stats | None = None,
+    walker: TreeWalker | None = None,
+    follow_scope: FollowScope | None = None,
+) -> int:
+    """
+    Report on each project separately, return the number of projects with cycles.
+
+    With ``report_dir`` given, reports go to one file per project there,
+    along with a ``summary.json`` holding the exit code of each project.
+    """
+    if source_roots is None:
+        source_roots = SourceRoots()
+    if stats is None:
+        stats = Stats()
+    imports = ImportGraph(
+        cache=cache,
+        jobs=jobs,
+        source_roots=source_roots,
+        python_version=python_version,
+        stats=stats,
+        follow_scope=follow_scope,
+    )
+
+    collectors = [ToplevelCollector(source_roots) for _ in abs_paths]
+    imports.add_files(
+        itertools.chain.from_iterable(
+            _collect_py_files([abs_path], collector, walker)
+            for abs_path, collector in zip(abs_paths, collectors, strict=True)
+        ),
+        follow=follow,
+        follow_depth=follow_depth,
+    )
+    if cache is not None:
+        cache.prune()
+
+    projects_of_toplevel_package = {}
+    for project_index, collector in enumerate(collectors):
+        for toplevel_package in collector:
+            projects_of_toplevel_package.setdefault(toplevel_package, []).append(
+                project_index,
+            )
+
+    with stats.phase("cycles"):
+        lines_of_project, truncated_of_project = _cycles_per_project(
+            imports,
+            projects_of_toplevel_package,
+            len(abs_paths),
+            max_cycle_length=max_cycle_length,
+            time_budget=time_budget,
+            mode=mode,
+        )
+
+    _record_counters(
+        stats,
+        imports,
+        imports,
+        source_roots=source_roots,
+        cache=cache,
+        count_cycles=len(set().union(*lines_of_project)),
+    )
+
+    project_names = _project_names(abs_paths)
+    reports, exit_codes = _render_reports(lines_of_project, truncated_of_project)
+
+    if report_dir is None:
+        for project_name, report in zip(project_names, reports, strict=True):
+            print(f"[{project_name}]\n{report}", file=file_)
+    else:
+        _write_reports(report_dir, project_names, abs_paths, reports, exit_codes)
+        for project_name, lines in zip(project_names, lines_of_project, strict=True):
+            print(f"{project_name}: {len(lines)} cycle(s).", file=file_)
+
+    return sum(1 for exit_code in exit_codes if exit_code)
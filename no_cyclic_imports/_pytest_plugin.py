@@ -0,0 +1,27 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+"""
+Pytest plugin sharing one warm analyzer across a whole test session.
+
+For example:
+
+    def test_no_cyclic_imports(no_cyclic_imports_analyzer):
+        assert no_cyclic_imports_analyzer.analyze(["src/"], follow=False) == []
+"""
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from ._analyzer import Analyzer
+
+
+@pytest.fixture(scope="session")
+def no_cyclic_imports_analyzer() -> "Analyzer":
+    # Imported on first use only, as the plugin is loaded into every
+    # pytest session of environments that the package is installed to
+    from ._analyzer import Analyzer  # noqa: PLC0415
+
+    return Analyzer()
@@ -0,0 +1,114 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import logging
+import os
+import sys
+
+_logger = logging.getLogger(__name__)
+
+_NOT_FOUND = object()
+
+
+class PythonSourceNotFoundError(Exception):
+    def __init__(self, module_names: list[str]):
+        self.module_names = module_names
+
+    @property
+    def most_generic_module_name(self):
+        return self.module_names[-1]
+
+    def __str__(self):
+        return (
+            f"Import {self.most_generic_module_name!r} could not be resolved"
+            " to a Python source file with regard to PYTHONPATH."
+        )
+
+
+class ModuleResolver:
+    """
+    Resolves module names to Python source files with regard to ``sys.path``.
+
+    Rather than probing candidate files with one stat call each,
+    every directory involved is listed once (using ``os.scandir``, lazily)
+    and all further lookups are answered from memory.
+    Both successful and failed lookups are remembered.
+    """
+
+    def __init__(self, search_path: list[str] | None = None):
+        self._search_path = list(sys.path if search_path is None else search_path)
+        self._listings = {}
+        self._path_of = {}
+        self.scandir_calls = 0
+        self.probes = 0
+
+    @property
+    def filesystem_calls_saved(self) -> int:
+        return self.probes - self.scandir_calls
+
+    def clear(self):
+        """Forget all directory listings and lookup results."""
+        self._listings.clear()
+        self._path_of.clear()
+
+    def _listing_of(self, directory: str) -> frozenset[str]:
+        names = self._listings.get(directory)
+        if names is None:
+            self.scandir_calls += 1
+            try:
+                with os.scandir(directory or os.curdir) as entries:
+                    names = frozenset(entry.name for entry in entries)
+            except OSError:
+                names = frozenset()
+            self._listings[directory] = names
+        return names
+
+    def _exists(self, base_path: str, path_parts: list[str]) -> bool:
+        self.probes += 1
+        directory = base_path
+        for path_part in path_parts[:-1]:
+            if path_part not in self._listing_of(directory):
+                return False
+            directory = os.path.join(directory, path_part)
+        return path_parts[-1] in self._listing_of(directory)
+
+    def _search(self, module_name: str) -> str | None:
+        path = self._path_of.get(module_name)
+        if path is _NOT_FOUND:
+            return None
+        if path is not None:
+            return path
+
+        module_name_split = module_name.split(".")
+        module_candidate_parts = [
+            *module_name_split[:-1],
+            module_name_split[-1] + ".py",
+        ]
+        package_candidate_parts = [*module_name_split, "__init__.py"]
+
+        for base_path in self._search_path:
+            if self._exists(base_path, module_candidate_parts):
+                path = os.path.join(base_path, *module_candidate_parts)
+                break
+            if self._exists(base_path, package_candidate_parts):
+                path = os.path.join(base_path, *package_candidate_parts)
+                break
+
+        self._path_of[module_name] = _NOT_FOUND if path is None else path
+        return path
+
+    def determine_path_of(self, module_name: str) -> str:
+        path = self._search(module_name)
+        if path is not None:
+            return path
+
+        # Let's try to make the error about top-level packages
+        breadcrumbs = [module_name]
+        module_name_split = module_name.split(".")
+        for parent_length in range(len(module_name_split) - 1, 0, -1):
+            parent_module_name = ".".join(module_name_split[:parent_length])
+            breadcrumbs.append(parent_module_name)
+            if self._search(parent_module_name) is not None:
+                break
+
+        raise PythonSourceNotFoundError(breadcrumbs)
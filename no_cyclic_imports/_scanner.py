@@ -0,0 +1,180 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+"""
+Extraction of import statements from Python source code.
+
+Rather than parsing a whole file into an abstract syntax tree,
+the source bytes are searched for the next string literal, comment or
+``import``/``from`` keyword, so that everything in between -- including
+large literals -- is skipped by the regular expression engine.
+Only the import statements found get decoded.
+
+The result matches what visiting ``ast.Import`` and ``ast.ImportFrom``
+nodes would produce: one ``(module, name, as_name, level)`` tuple
+per imported name, in source order, with ``module`` and ``level``
+being ``None`` for plain ``import`` statements.
+"""
+
+import codecs
+import re
+from collections.abc import Iterator
+
+_UTF8_BOM = codecs.BOM_UTF8
+
+# https://peps.python.org/pep-0263/#defining-the-encoding
+_CODING_PATTERN = re.compile(rb"[ \t\f]*#.*?coding[:=][ \t]*([-\w.]+)")
+_BLANK_OR_COMMENT_PATTERN = re.compile(rb"[ \t\f]*(?:[#\r\n]|$)")
+
+_PARTS = {
+    b"name": rb"[\w\x80-\xff]",
+    b"space": rb"(?:[ \t\f]|\\\r?\n)",  # incl. line continuations
+}
+_PARTS[b"names"] = rb"(?P<names>(?:%(space)s|%(name)s|[.,*])*)" % _PARTS
+
+_TOKEN_PATTERN = re.compile(
+    rb"(?P<quote>'''|\"\"\"|'|\")"
+    rb"|(?P<comment>#)"
+    rb"|(?<!\.)(?<!%(name)s)(?P<keyword>import|from)(?!%(name)s)" % _PARTS,
+)
+
+_STRING_END_PATTERN_OF = {
+    b"'''": re.compile(rb"[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*'''", re.DOTALL),
+    b'"""': re.compile(rb'[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*"""', re.DOTALL),
+    b"'": re.compile(rb"[^'\\\n]*(?:\\.[^'\\\n]*)*'", re.DOTALL),
+    b'"': re.compile(rb'[^"\\\n]*(?:\\.[^"\\\n]*)*"', re.DOTALL),
+}
+
+_IMPORT_PATTERN = re.compile(rb"import%(names)s" % _PARTS)
+
+_FROM_PATTERN = re.compile(
+    rb"from(?P<source>(?:%(space)s|%(name)s|\.)*?)"
+    rb"(?<!%(name)s)import(?!%(name)s)%(space)s*"
+    rb"(?:\((?P<parenthesized>(?:[^)#]|#[^\n]*)*)\)|%(names)s)" % _PARTS,
+)
+
+_NOISE_PATTERN = re.compile(rb"#[^\n]*|\\\r?\n")
+_DOTTED_NAME_PATTERN = re.compile(r"\w+(?:\.\w+)*")
+
+
+def _declared_encoding(source: bytes) -> str | None:
+    lines = source.split(b"\n", 2)[:2]
+    for index, line in enumerate(lines):
+        match = _CODING_PATTERN.match(line)
+        if match is not None:
+            return match.group(1).decode("ascii")
+        if index == 0 and not _BLANK_OR_COMMENT_PATTERN.match(line):
+            break
+    return None
+
+
+def _as_utf8(source: bytes) -> bytes:
+    """
+    Return source encoded in UTF-8.
+
+    Only sources with an encoding declaration other than UTF-8 are decoded,
+    and these exactly once.
+    """
+    if source.startswith(_UTF8_BOM):
+        return source[len(_UTF8_BOM) :]
+
+    encoding = _declared_encoding(source)
+    if encoding is None or codecs.lookup(encoding).name == "utf-8":
+        return source
+
+    return source.decode(encoding).encode("utf-8")
+
+
+def _at_statement_start(source: bytes, index: int) -> bool:
+    index -= 1
+    while index >= 0 and source[index] in b" \t\f":
+        index -= 1
+    return index < 0 or source[index] in b"\r\n;:"
+
+
+def _skip_string(source: bytes, quote: bytes, start: int) -> int:
+    string_end = _STRING_END_PATTERN_OF[quote].match(source, start)
+    if string_end is not None:
+        return string_end.end()
+    if len(quote) == 1:  # unterminated, so skip the rest of the line
+        return start
+    return len(source)  # unterminated, so there is no more code
+
+
+def _aliases(names: bytes) -> Iterator[tuple[str, str | None]]:
+    for entry in _NOISE_PATTERN.sub(b" ", names).decode("utf-8").split(","):
+        words = entry.split()
+        if len(words) >= 3 and words[-2] == "as":  # noqa: PLR2004
+            yield "".join(words[:-2]), words[-1]
+        elif words:
+            yield "".join(words), None
+
+
+def _scan_import(source: bytes, start: int, imports: list) -> int:
+    match = _IMPORT_PATTERN.match(source, start)
+    for name, as_name in _aliases(match.group("names")):
+        if _DOTTED_NAME_PATTERN.fullmatch(name):
+            imports.append((None, name, as_name, None))
+    return match.end()
+
+
+def _scan_from(source: bytes, start: int, imports: list) -> int:
+    match = _FROM_PATTERN.match(source, start)
+    if match is None:  # e.g. "yield from" continued on the next line
+        return start + len(b"from")
+
+    module = "".join(
+        _NOISE_PATTERN.sub(b" ", match.group("source")).decode("utf-8").split(),
+    )
+    level = len(module) - len(module.lstrip("."))
+    module = module[level:] or None
+    if module is not None and not _DOTTED_NAME_PATTERN.fullmatch(module):
+        return match.end()
+
+    names = match.group("parenthesized")
+    if names is None:
+        names = match.group("names")
+    for name, as_name in _aliases(names):
+        if name == "*" or name.isidentifier():
+            imports.append((module, name, as_name, level))
+    return match.end()
+
+
+def scan_imports(source: bytes) -> list[tuple[str | None, str, str | None, int | None]]:
+    """
+    Extract all import statements from Python source code.
+
+    Raises ``LookupError`` for unknown source encodings
+    and ``UnicodeDecodeError`` for source that does not match its encoding.
+    """
+    if b"import" not in source:
+        return []
+
+    source = _as_utf8(source)
+    imports = []
+    position = 0
+    while True:
+        match = _TOKEN_PATTERN.search(source, position)
+        if match is None:
+            break
+
+        quote = match.group("quote")
+        if quote is not None:
+            position = _skip_string(source, quote, match.end())
+        elif match.group("comment") is not None:
+            position = source.find(b"\n", match.end())
+            if position == -1:
+                break
+        elif not _at_statement_start(source, match.start()):
+            position = match.end()
+        elif match.group("keyword") == b"import":
+            position = _scan_import(source, match.start(), imports)
+        else:
+            position = _scan_from(source, match.start(), imports)
+
+    return imports
+
+
+def scan_file(abs_path: str) -> list[tuple[str | None, str, str | None, int | None]]:
+    with open(abs_path, "rb") as f:
+        return scan_imports(f.read())
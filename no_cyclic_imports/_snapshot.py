@@ -0,0 +1,276 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+"""
+Compact binary snapshots of import graphs.
+
+A snapshot starts with a magic number, a format version and the length
+of each of the following sections, all little-endian:
+
+1. module names, separated by NUL bytes
+2. one byte per module, set for modules that were analyzed
+3. CSR offsets of the module adjacency (uint32, one per module plus one)
+4. CSR targets of the module adjacency (uint32)
+5. top-level packages of interest, separated by NUL bytes
+6. file paths, separated by NUL bytes
+7. module ID per file (uint32)
+8. modification time in nanoseconds and size per file (int64 pairs)
+9. CSR offsets of the imported module IDs per file (uint32)
+10. CSR targets of the imported module IDs per file (uint32)
+
+Snapshots are read in one go, and arrays are taken over as a whole
+rather than element by element.  All IDs and offsets are checked
+against the number of modules and files, and the section lengths,
+before use.
+"""
+
+import itertools
+import logging
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Collection
+
+from ._graph import ModuleGraph
+from ._imports import ImportGraph
+
+_logger = logging.getLogger(__name__)
+
+_MAGIC = b"NCIGRAPH"
+_FORMAT_VERSION = 1
+_SECTION_COUNT = 10
+_HEADER = struct.Struct(f"<8sI{_SECTION_COUNT}Q")
+
+
+class SnapshotError(Exception):
+    def __init__(self, path: str, reason: str):
+        self.path = path
+        self.reason = reason
+
+    def __str__(self):
+        return (
+            f"File {self.path!r} is not a usable import graph snapshot: {self.reason}"
+        )
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _array_from(path: str, typecode: str, data: memoryview) -> array:
+    values = array(typecode)
+    if len(data) % values.itemsize:
+        raise SnapshotError(path, "section length mismatch")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _check_csr(
+    path: str,
+    offsets: array,
+    targets: array,
+    *,
+    source_count: int,
+    target_count: int,
+):
+    if (
+        len(offsets) != source_count + 1
+        or offsets[0] != 0
+        or offsets[-1] != len(targets)
+        or any(start > end for start, end in itertools.pairwise(offsets))
+    ):
+        raise SnapshotError(path, "offsets mismatch")
+    _check_ids(path, targets, target_count)
+
+
+def _check_ids(path: str, ids: array, count: int):
+    if ids and max(ids) >= count:
+        raise SnapshotError(path, "ID out of range")
+
+
+def _joined(strings: Collection[str]) -> bytes:
+    return "\0".join(strings).encode("utf-8", "surrogateescape")
+
+
+def _split(data: memoryview) -> list[str]:
+    if not data:
+        return []
+    return bytes(data).decode("utf-8", "surrogateescape").split("\0")
+
+
+def save_snapshot(
+    path: str,
+    imports: ImportGraph,
+    toplevel_packages: Collection[str],
+):
+    """
+    Save an import graph that records fingerprints to a snapshot.
+
+    Files vanished before getting parsed are left out.
+    """
+    fingerprints = imports.fingerprints()
+    names, is_source, offsets, targets = imports.module_graph().to_arrays()
+
+    file_paths = []
+    file_module_ids = array("I")
+    file_fingerprints = array("q")
+    file_offsets = array("I", [0])
+    file_targets = array("I")
+    for abs_path, (source_id, target_ids) in imports.targets_of_file().items():
+        fingerprint = fingerprints.get(abs_path)
+        if fingerprint is None:
+            continue
+        file_paths.append(abs_path)
+        file_module_ids.append(source_id)
+        file_fingerprints.extend(fingerprint)
+        file_targets.extend(target_ids)
+        file_offsets.append(len(file_targets))
+
+    sections = [
+        _joined(names),
+        bytes(is_source),
+        _little_endian(offsets),
+        _little_endian(targets),
+        _joined(sorted(toplevel_packages)),
+        _joined(file_paths),
+        _little_endian(file_module_ids),
+        _little_endian(file_fingerprints),
+        _little_endian(file_offsets),
+        _little_endian(file_targets),
+    ]
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(
+                _HEADER.pack(
+                    _MAGIC,
+                    _FORMAT_VERSION,
+                    *(len(section) for section in sections),
+                ),
+            )
+            for section in sections:
+                f.write(section)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    _logger.info(
+        f"Saved import graph of {len(names)} module(s)"
+        f" and {len(file_paths)} file(s) to {path!r}.",
+    )
+
+
+def _read_sections(path: str, data: memoryview) -> list[memoryview]:
+    if len(data) < _HEADER.size:
+        raise SnapshotError(path, "file is too short")
+    magic, format_version, *section_lengths = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise SnapshotError(path, "magic number mismatch")
+    if format_version != _FORMAT_VERSION:
+        raise SnapshotError(path, f"unsupported format version {format_version}")
+    if _HEADER.size + sum(section_lengths) != len(data):
+        raise SnapshotError(path, "file size mismatch")
+
+    sections = []
+    offset = _HEADER.size
+    for section_length in section_lengths:
+        sections.append(data[offset : offset + section_length])
+        offset += section_length
+    return sections
+
+
+def load_snapshot(
+    path: str,
+    imports: ImportGraph,
+) -> tuple[list[str], dict[str, tuple[int, int]]]:
+    """
+    Restore a snapshot into an empty import graph.
+
+    Returns the top-level packages of interest and the file fingerprints.
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    if not content:
+        raise SnapshotError(path, "file is empty")
+
+    sections = _read_sections(path, memoryview(content))
+    names = _split(sections[0])
+    is_source = bytes(sections[1])
+    offsets = _array_from(path, "I", sections[2])
+    targets = _array_from(path, "I", sections[3])
+    toplevel_packages = _split(sections[4])
+    file_paths = _split(sections[5])
+    file_module_ids = _array_from(path, "I", sections[6])
+    file_fingerprints = _array_from(path, "q", sections[7])
+    file_offsets = _array_from(path, "I", sections[8])
+    file_targets = _array_from(path, "I", sections[9])
+
+    if len(set(names)) != len(names) or len(is_source) != len(names):
+        raise SnapshotError(path, "module count mismatch")
+    file_count = len(file_paths)
+    if (
+        len(set(file_paths)) != file_count
+        or len(file_module_ids) != file_count
+        or len(file_fingerprints) != 2 * file_count
+    ):
+        raise SnapshotError(path, "file count mismatch")
+    _check_csr(
+        path,
+        offsets,
+        targets,
+        source_count=len(names),
+        target_count=len(names),
+    )
+    _check_ids(path, file_module_ids, len(names))
+    _check_csr(
+        path,
+        file_offsets,
+        file_targets,
+        source_count=file_count,
+        target_count=len(names),
+    )
+    graph = ModuleGraph.from_arrays(names, is_source, offsets, targets)
+
+    targets_of_file = {}
+    fingerprints = {}
+    for index, abs_path in enumerate(file_paths):
+        targets_of_file[abs_path] = (
+            file_module_ids[index],
+            file_targets[file_offsets[index] : file_offsets[index + 1]],
+        )
+        fingerprints[abs_path] = (
+            file_fingerprints[2 * index],
+            file_fingerprints[2 * index + 1],
+        )
+
+    imports.restore(graph, targets_of_file, fingerprints)
+
+    _logger.info(
+        f"Loaded import graph of {len(graph)} module(s)"
+        f" and {len(file_paths)} file(s) from {path!r}.",
+    )
+    return toplevel_packages, fingerprints
+
+
+def stale_files(fingerprints: dict[str, tuple[int, int]]) -> list[str]:
+    """Return the files that were modified or removed since taking a snapshot."""
+    stale = []
+    for abs_path, fingerprint in fingerprints.items():
+        try:
+            stat_result = os.stat(abs_path)
+        except FileNotFoundError:
+            stale.append(abs_path)
+            continue
+        if (stat_result.st_mtime_ns, stat_result.st_size) != fingerprint:
+            stale.append(abs_path)
+    return stale
@@ -0,0 +1,64 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import os
+
+
+class SourceRoots:
+    """
+    Maps directories to the dotted package names they represent.
+
+    Results are cached per directory so that each ``__init__.py``
+    is probed at most once.  Directories configured as explicit roots
+    (mapped to a package name, or to ``""`` for a plain import root)
+    and all directories below them are never probed at all.
+    """
+
+    def __init__(self, explicit_roots: dict[str, str] | None = None):
+        self._explicit_roots = {
+            os.path.normpath(directory): tuple(package_name.split("."))
+            if package_name
+            else ()
+            for directory, package_name in (explicit_roots or {}).items()
+        }
+        self._package_parts_of = {}
+        self.probes = 0
+
+    @property
+    def explicit_roots(self) -> dict[str, tuple[str, ...]]:
+        return dict(self._explicit_roots)
+
+    def clear(self):
+        """Forget all cached results, e.g. after packages were added or removed."""
+        self._package_parts_of.clear()
+
+    def _is_below_explicit_root(self, directory: str) -> bool:
+        return any(
+            directory.startswith(os.path.join(root, ""))
+            for root in self._explicit_roots
+        )
+
+    def _is_package(self, directory: str) -> bool:
+        if self._is_below_explicit_root(directory):
+            return True
+        self.probes += 1
+        return os.path.exists(os.path.join(directory, "__init__.py"))
+
+    def package_parts_of(self, directory: str) -> tuple[str, ...]:
+        parts = self._package_parts_of.get(directory)
+        if parts is not None:
+            return parts
+
+        parts = self._explicit_roots.get(directory)
+        if parts is None:
+            parent_directory = os.path.dirname(directory)
+            if parent_directory != directory and self._is_package(directory):
+                parts = (
+                    *self.package_parts_of(parent_directory),
+                    os.path.basename(directory),
+                )
+            else:
+                parts = ()
+
+        self._package_parts_of[directory] = parts
+        return parts
@@ -0,0 +1,57 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import contextlib
+import sys
+import time
+from collections.abc import Iterator
+
+
+def _peak_memory_bytes() -> int | None:
+    try:
+        import resource  # noqa: PLC0415
+    except ImportError:  # e.g. on Windows
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class Stats:
+    """
+    Wall and CPU time per phase, and counters, of a single run.
+
+    Time spent in a phase accumulates over all times it is entered.
+    CPU time does not include worker processes.
+    """
+
+    def __init__(self):
+        self._seconds_of = {}
+        self.counters = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            seconds = self._seconds_of.setdefault(name, [0.0, 0.0])
+            seconds[0] += time.perf_counter() - wall_start
+            seconds[1] += time.process_time() - cpu_start
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def render(self) -> str:
+        lines = ["Phase                      Wall time    CPU time"]
+        lines += [
+            f"{name:<24} {wall_seconds:10.3f}s {cpu_seconds:10.3f}s"
+            for name, (wall_seconds, cpu_seconds) in self._seconds_of.items()
+        ]
+        lines.append("")
+        lines += [f"{name:<24} {value:11}" for name, value in self.counters.items()]
+
+        peak_memory_bytes = _peak_memory_bytes()
+        if peak_memory_bytes is not None:
+            lines.append(f"{'peak memory (MiB)':<24} {peak_memory_bytes / 2**20:11.1f}")
+
+        return "\n".join(lines) + "\n"
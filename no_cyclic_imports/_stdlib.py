@@ -0,0 +1,111 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+"""
+Top-level module names of the Python standard library.
+
+The index in ``_stdlib_index.py`` is generated from the stdlib-list package
+and stores only the changes from one Python version to the next.
+To regenerate it, run:
+
+    python3 -m no_cyclic_imports._stdlib > no_cyclic_imports/_stdlib_index.py
+"""
+
+import functools
+import sys
+import textwrap
+
+from ._stdlib_index import CHANGES_BY_VERSION
+
+
+def supported_python_versions() -> list[str]:
+    versions = [version for version, _added, _removed in CHANGES_BY_VERSION]
+    running_version = f"{sys.version_info.major}.{sys.version_info.minor}"
+    if running_version not in versions:
+        versions.append(running_version)
+    return versions
+
+
+@functools.cache
+def stdlib_module_names(python_version: str | None = None) -> frozenset[str]:
+    """
+    Return the top-level standard library module names of a Python version.
+
+    Without a version, the names of all known versions are returned.
+    """
+    names = set()
+    for version, added, removed in CHANGES_BY_VERSION:
+        names.update(added.split())
+        if python_version is None:
+            continue
+        names.difference_update(removed.split())
+        if version == python_version:
+            return frozenset(names)
+
+    if python_version is None:
+        return frozenset(names)
+
+    if python_version == f"{sys.version_info.major}.{sys.version_info.minor}":
+        return frozenset(sys.stdlib_module_names)
+
+    raise ValueError(  # noqa: TRY003
+        f"Python version {python_version!r} is not supported,"  # noqa: EM102
+        f" supported are: {', '.join(supported_python_versions())}.",
+    )
+
+
+def in_standard_library(
+    candidate_module_name: str,
+    python_version: str | None = None,
+) -> bool:
+    toplevel_package = candidate_module_name.split(".", maxsplit=1)[0]
+    return toplevel_package in stdlib_module_names(python_version)
+
+
+def _render_names(names: set[str]) -> list[str]:
+    text = " ".join(sorted(names))
+    if len(f'        "{text}",') <= 88:  # noqa: PLR2004
+        return [f'        "{text}",']
+    chunks = textwrap.wrap(text, width=70)
+    return [
+        "        (",
+        *(f'            "{chunk} "' for chunk in chunks[:-1]),
+        f'            "{chunks[-1]}"',
+        "        ),",
+    ]
+
+
+def render_index_module() -> str:
+    from stdlib_list.base import long_versions, stdlib_list  # noqa: PLC0415
+
+    lines = [
+        "# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>",
+        "# Licensed under Affero GPL v3 or later",
+        "",
+        "# Generated by no_cyclic_imports._stdlib, do not edit.",
+        "",
+        "CHANGES_BY_VERSION = (",
+    ]
+
+    previous_names = set()
+    for long_version in long_versions:
+        names = {
+            module_name.split(".", maxsplit=1)[0]
+            for module_name in stdlib_list(long_version)
+        }
+        short_version = ".".join(long_version.split(".")[:2])
+        lines += [
+            "    (",
+            f'        "{short_version}",',
+            *_render_names(names - previous_names),
+            *_render_names(previous_names - names),
+            "    ),",
+        ]
+        previous_names = names
+
+    lines.append(")")
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    print(render_index_module(), end="")
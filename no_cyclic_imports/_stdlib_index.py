@@ -0,0 +1,222 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+# Generated by no_cyclic_imports._stdlib, do not edit.
+
+CHANGES_BY_VERSION = (
+    (
+        "2.6",
+        (
+            "AL BaseHTTPServer Bastion CGIHTTPServer Carbon ColorPicker "
+            "ConfigParser Cookie DEVICE DocXMLRPCServer EasyDialogs FL FrameWork GL "
+            "HTMLParser MacOS MimeWriter MiniAEFrame Nav PixMapWrapper Queue "
+            "SUNAUDIODEV ScrolledText SimpleHTTPServer SimpleXMLRPCServer "
+            "SocketServer StringIO Tix Tkinter UserDict UserList UserString W "
+            "__builtin__ __future__ __main__ _winreg abc aepack aetools aetypes "
+            "aifc al anydbm applesingle array ast asynchat asyncore atexit audioop "
+            "autoGIL base64 bdb binascii binhex bisect bsddb buildtools bz2 cPickle "
+            "cProfile cStringIO calendar cd cfmfile cgi cgitb chunk cmath cmd code "
+            "codecs codeop collections colorsys commands compileall compiler "
+            "contextlib cookielib copy copy_reg crypt csv ctypes curses datetime "
+            "dbhash dbm decimal difflib dircache dis distutils dl doctest dumbdbm "
+            "dummy_thread dummy_threading email encodings errno exceptions fcntl "
+            "filecmp fileinput findertools fl flp fm fnmatch formatter fpectl "
+            "fpformat fractions ftplib functools future_builtins gc gdbm "
+            "gensuitemodule getopt getpass gettext gl glob grp gzip hashlib heapq "
+            "hmac hotshot htmlentitydefs htmllib httplib ic icopen imageop imaplib "
+            "imgfile imghdr imp imputil inspect io itertools jpeg json keyword "
+            "lib2to3 linecache locale logging macerrors macostools macpath "
+            "macresource mailbox mailcap marshal math md5 mhlib mimetools mimetypes "
+            "mimify mmap modulefinder msilib msvcrt multifile multiprocessing mutex "
+            "netrc new nis nntplib numbers operator optparse os ossaudiodev parser "
+            "pdb pickle pickletools pipes pkgutil platform plistlib popen2 poplib "
+            "posix posixfile pprint profile pstats pty pwd py_compile pyclbr pydoc "
+            "quopri random re readline repr resource rexec rfc822 rlcompleter "
+            "robotparser runpy sched select sets sgmllib sha shelve shlex shutil "
+            "signal site smtpd smtplib sndhdr socket spwd sqlite3 ssl stat statvfs "
+            "string stringprep struct subprocess sunau sunaudiodev symbol symtable "
+            "sys syslog tabnanny tarfile telnetlib tempfile termios test textwrap "
+            "thread threading time timeit token tokenize trace traceback tty turtle "
+            "types unicodedata unittest urllib urllib2 urlparse user uu uuid "
+            "videoreader warnings wave weakref webbrowser whichdb winsound wsgiref "
+            "xdrlib xml xmlrpclib zipfile zipimport zlib"
+        ),
+        "",
+    ),
+    (
+        "2.7",
+        (
+            "Canvas Dialog FileDialog FixTk SimpleDialog Tkconstants Tkdnd "
+            "_LWPCookieJar _MozillaCookieJar _abcoll _ast _bisect _bsddb _codecs "
+            "_codecs_cn _codecs_hk _codecs_iso2022 _codecs_jp _codecs_kr _codecs_tw "
+            "_collections _csv _ctypes _ctypes_test _curses _curses_panel "
+            "_elementtree _functools _hashlib _heapq _hotshot _io _json _locale "
+            "_lsprof _md5 _multibytecodec _multiprocessing _osx_support _pyio "
+            "_random _sha _sha256 _sha512 _socket _sqlite3 _sre _ssl _strptime "
+            "_struct _symtable _sysconfigdata _testcapi _threading_local _tkinter "
+            "_warnings _weakref _weakrefset antigravity argparse audiodev ensurepip "
+            "genericpath idlelib ihooks importlib linuxaudiodev macurl2path "
+            "markupbase ntpath nturl2path opcode os2emxpath posixpath pydoc_data "
+            "pyexpat sre sre_compile sre_constants sre_parse stringold strop "
+            "sunaudio sysconfig this tkColorChooser tkCommonDialog tkFileDialog "
+            "tkFont tkMessageBox tkSimpleDialog toaiff ttk xmllib xxsubtype"
+        ),
+        "",
+    ),
+    (
+        "3.2",
+        (
+            "_dummy_thread _thread builtins concurrent configparser copyreg html "
+            "http queue reprlib socketserver tkinter winreg xmlrpc"
+        ),
+        (
+            "AL BaseHTTPServer Bastion CGIHTTPServer Canvas Carbon ColorPicker "
+            "ConfigParser Cookie DEVICE Dialog DocXMLRPCServer EasyDialogs FL "
+            "FileDialog FixTk FrameWork GL HTMLParser MacOS MimeWriter MiniAEFrame "
+            "Nav PixMapWrapper Queue SUNAUDIODEV ScrolledText SimpleDialog "
+            "SimpleHTTPServer SimpleXMLRPCServer SocketServer StringIO Tix "
+            "Tkconstants Tkdnd Tkinter UserDict UserList UserString W _LWPCookieJar "
+            "_MozillaCookieJar __builtin__ _abcoll _ast _bisect _bsddb _codecs "
+            "_codecs_cn _codecs_hk _codecs_iso2022 _codecs_jp _codecs_kr _codecs_tw "
+            "_collections _csv _ctypes _ctypes_test _curses _curses_panel "
+            "_elementtree _functools _hashlib _heapq _hotshot _io _json _locale "
+            "_lsprof _md5 _multibytecodec _multiprocessing _osx_support _pyio "
+            "_random _sha _sha256 _sha512 _socket _sqlite3 _sre _ssl _strptime "
+            "_symtable _sysconfigdata _testcapi _threading_local _tkinter _warnings "
+            "_weakref _weakrefset _winreg aepack aetools aetypes al antigravity "
+            "anydbm applesingle audiodev autoGIL bsddb buildtools cPickle cStringIO "
+            "cd cfmfile commands compiler cookielib copy_reg dbhash dircache dl "
+            "dumbdbm dummy_thread ensurepip exceptions findertools fl flp fm "
+            "fpformat future_builtins gdbm genericpath gensuitemodule gl hotshot "
+            "htmlentitydefs htmllib httplib ic icopen idlelib ihooks imageop "
+            "imgfile imputil jpeg linuxaudiodev macerrors macostools macresource "
+            "macurl2path markupbase md5 mhlib mimetools mimify multifile mutex new "
+            "ntpath nturl2path opcode os2emxpath popen2 posixfile pydoc_data "
+            "pyexpat repr rexec rfc822 robotparser sets sgmllib sha sre sre_compile "
+            "sre_constants sre_parse statvfs stringold strop sunaudio sunaudiodev "
+            "this thread tkColorChooser tkCommonDialog tkFileDialog tkFont "
+            "tkMessageBox tkSimpleDialog toaiff ttk urllib2 urlparse user "
+            "videoreader whichdb xmllib xmlrpclib xxsubtype"
+        ),
+    ),
+    (
+        "3.3",
+        "faulthandler ipaddress lzma venv",
+        "",
+    ),
+    (
+        "3.4",
+        (
+            "_ast _bisect _bootlocale _bz2 _codecs _codecs_cn _codecs_hk "
+            "_codecs_iso2022 _codecs_jp _codecs_kr _codecs_tw _collections "
+            "_collections_abc _compat_pickle _crypt _csv _ctypes _ctypes_test "
+            "_curses _curses_panel _datetime _dbm _decimal _elementtree "
+            "_frozen_importlib _functools _gdbm _hashlib _heapq _imp _io _json "
+            "_locale _lsprof _lzma _markupbase _md5 _multibytecodec "
+            "_multiprocessing _opcode _operator _osx_support _pickle "
+            "_posixsubprocess _pyio _random _sha1 _sha256 _sha512 _sitebuiltins "
+            "_socket _sqlite3 _sre _ssl _stat _string _strptime _symtable "
+            "_sysconfigdata _testbuffer _testcapi _testimportmultiple "
+            "_threading_local _tkinter _tracemalloc _warnings _weakref _weakrefset "
+            "antigravity asyncio ensurepip enum genericpath idlelib macurl2path "
+            "ntpath nturl2path opcode pathlib pydoc_data pyexpat selectors "
+            "sre_compile sre_constants sre_parse statistics this tracemalloc "
+            "turtledemo xxlimited xxsubtype"
+        ),
+        "",
+    ),
+    (
+        "3.5",
+        (
+            "_compression _frozen_importlib_external _pydecimal _signal "
+            "_testmultiphase typing zipapp"
+        ),
+        "",
+    ),
+    (
+        "3.6",
+        "_asyncio _blake2 _sha3 secrets",
+        "_sysconfigdata",
+    ),
+    (
+        "3.7",
+        "_abc _contextvars _py_abc _queue _uuid _xxtestfuzz contextvars dataclasses",
+        "fpectl macurl2path",
+    ),
+    (
+        "3.8",
+        "_posixshmem _statistics _testinternalcapi _xxsubinterpreters",
+        "macpath",
+    ),
+    (
+        "3.9",
+        (
+            "__phello__ _aix_support _bootsubprocess _peg_parser "
+            "_sysconfigdata_x86_64_conda_cos6_linux_gnu "
+            "_sysconfigdata_x86_64_conda_linux_gnu graphlib lib zoneinfo"
+        ),
+        (
+            "_asyncio _bisect _blake2 _bz2 _codecs_cn _codecs_hk _codecs_iso2022 "
+            "_codecs_jp _codecs_kr _codecs_tw _contextvars _csv _ctypes "
+            "_ctypes_test _curses _curses_panel _datetime _dbm _decimal "
+            "_dummy_thread _elementtree _frozen_importlib "
+            "_frozen_importlib_external _gdbm _heapq _json _lzma _md5 "
+            "_multibytecodec _multiprocessing _opcode _pickle _posixshmem _queue "
+            "_sha1 _sha256 _sha3 _sha512 _sqlite3 _statistics _struct _testbuffer "
+            "_testcapi _testimportmultiple _testinternalcapi _testmultiphase "
+            "_tkinter _xxsubinterpreters _xxtestfuzz dummy_threading pyexpat "
+            "xxlimited"
+        ),
+    ),
+    (
+        "3.10",
+        (
+            "_asyncio _bisect _blake2 _bz2 _codecs_cn _codecs_hk _codecs_iso2022 "
+            "_codecs_jp _codecs_kr _codecs_tw _contextvars _csv _ctypes _curses "
+            "_curses_panel _datetime _dbm _decimal _elementtree _frozen_importlib "
+            "_frozen_importlib_external _gdbm _heapq _json _lzma _md5 _msi "
+            "_multibytecodec _multiprocessing _opcode _overlapped _pickle "
+            "_posixshmem _queue _scproxy _sha1 _sha256 _sha3 _sha512 _sqlite3 "
+            "_statistics _struct _tkinter _winapi _zoneinfo nt pyexpat"
+        ),
+        (
+            "__phello__ _bootlocale _peg_parser "
+            "_sysconfigdata_x86_64_conda_cos6_linux_gnu "
+            "_sysconfigdata_x86_64_conda_linux_gnu formatter lib parser symbol test"
+        ),
+    ),
+    (
+        "3.11",
+        "_tokenize _typing tomllib",
+        "binhex",
+    ),
+    (
+        "3.12",
+        "_pydatetime _pylong _sha2 _wmi",
+        (
+            "_bootsubprocess _sha256 _sha512 asynchat asyncore distutils imp smtpd "
+            "xxsubtype"
+        ),
+    ),
+    (
+        "3.13",
+        (
+            "_android_support _apple_support _colorize _interpchannels "
+            "_interpqueues _interpreters _ios_support _opcode_metadata _pyrepl "
+            "_suggestions _sysconfig"
+        ),
+        (
+            "_crypt _msi aifc audioop cgi cgitb chunk crypt imghdr lib2to3 mailcap "
+            "msilib nis nntplib ossaudiodev pipes sndhdr spwd sunau telnetlib uu "
+            "xdrlib"
+        ),
+    ),
+    (
+        "3.14",
+        (
+            "_ast_unparse _hmac _py_warnings _remote_debugging _types _zstd "
+            "annotationlib compression"
+        ),
+        "_compression",
+    ),
+)
@@ -0,0 +1,232 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+"""
+Discovery of Python files in directory trees.
+
+Directories are listed with ``os.scandir`` by a pool of threads,
+several subtrees at once, while files are handed out in the same
+deterministic order as a sorted top-down ``os.walk`` would.
+"""
+
+import fnmatch
+import logging
+import os
+import re
+from collections.abc import Collection, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+
+_logger = logging.getLogger(__name__)
+
+# A .gitignore file's directory, and its rules as (regex, negated, directory_only)
+_IgnoreRules = tuple[str, list[tuple[re.Pattern, bool, bool]]]
+
+
+def _translate_gitignore_glob(glob: str) -> str:
+    parts = []
+    index = 0
+    while index < len(glob):
+        if glob.startswith("**/", index):
+            parts.append("(?:.*/)?")
+            index += 3
+        elif glob.startswith("**", index):
+            parts.append(".*")
+            index += 2
+        elif glob[index] == "*":
+            parts.append("[^/]*")
+            index += 1
+        elif glob[index] == "?":
+            parts.append("[^/]")
+            index += 1
+        elif glob[index] == "[" and "]" in glob[index + 2 :]:
+            end = glob.index("]", index + 2)
+            content = glob[index + 1 : end].replace("\\", "\\\\")
+            if content.startswith("!"):
+                content = "^" + content[1:]
+            parts.append(f"[{content}]")
+            index = end + 1
+        elif glob[index] == "\\" and index + 1 < len(glob):
+            parts.append(re.escape(glob[index + 1]))
+            index += 2
+        else:
+            parts.append(re.escape(glob[index]))
+            index += 1
+    return "".join(parts)
+
+
+def parse_gitignore(text: str) -> list[tuple[re.Pattern, bool, bool]]:
+    """
+    Turn the lines of a .gitignore file into rules.
+
+    Paths are matched relative to the directory of the .gitignore file,
+    with forward slashes.  Global and per-repository exclude files
+    are not considered.
+    """
+    rules = []
+    for raw_line in text.splitlines():
+        line = raw_line.rstrip(" ")
+        if not line or line.startswith("#"):
+            continue
+
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+
+        anchored = "/" in line
+        line = line.removeprefix("/")
+        regex = _translate_gitignore_glob(line)
+        if not anchored:
+            regex = "(?:.*/)?" + regex
+        rules.append((re.compile(regex, re.DOTALL), negated, directory_only))
+    return rules
+
+
+def _relative_path(abs_path: str, base_dir: str) -> str:
+    relative_path = abs_path[len(base_dir) :].lstrip(os.sep)
+    return relative_path if os.sep == "/" else relative_path.replace(os.sep, "/")
+
+
+def _ignored(
+    abs_path: str,
+    *,
+    is_dir: bool,
+    ignore_rules: Iterable[_IgnoreRules],
+) -> bool:
+    ignored = False
+    for base_dir, rules in ignore_rules:
+        relative_path = _relative_path(abs_path, base_dir)
+        for regex, negated, directory_only in rules:
+            if directory_only and not is_dir:
+                continue
+            if regex.fullmatch(relative_path):
+                ignored = not negated
+    return ignored
+
+
+def _read_ignore_rules(directory: str) -> _IgnoreRules | None:
+    try:
+        with open(os.path.join(directory, ".gitignore"), errors="replace") as f:
+            rules = parse_gitignore(f.read())
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return (directory, rules) if rules else None
+
+
+def _ancestor_ignore_rules(directory: str) -> list[_IgnoreRules]:
+    """Collect .gitignore rules from above a directory up to its repository root."""
+    ancestors = []
+    current = directory
+    while True:
+        if os.path.exists(os.path.join(current, ".git")):
+            break
+        parent = os.path.dirname(current)
+        if parent == current:  # not inside a Git repository
+            return []
+        ancestors.append(parent)
+        current = parent
+
+    found_rules = []
+    for ancestor in reversed(ancestors):
+        rules = _read_ignore_rules(ancestor)
+        if rules is not None:
+            found_rules.append(rules)
+    return found_rules
+
+
+class TreeWalker:
+    """
+    Finds Python files below directories.
+
+    Files and directories are skipped when their name or their path relative
+    to the directory walked matches any of the ``exclude`` globs,
+    or -- with ``respect_gitignore`` -- when ignored by a .gitignore file.
+    """
+
+    def __init__(
+        self,
+        *,
+        exclude: Collection[str] = (),
+        respect_gitignore: bool = False,
+        max_workers: int | None = None,
+    ):
+        self.exclude = list(exclude)
+        self.respect_gitignore = respect_gitignore
+        self._max_workers = max_workers
+
+    def _excluded(self, name: str, relative_path: str) -> bool:
+        return any(
+            fnmatch.fnmatchcase(name, glob) or fnmatch.fnmatchcase(relative_path, glob)
+            for glob in self.exclude
+        )
+
+    def _scan_directory(
+        self,
+        root: str,
+        directory: str,
+        ignore_rules: list[_IgnoreRules],
+    ) -> tuple[list[str], list[str], list[_IgnoreRules]]:
+        """Return sorted .py files and subdirectories to descend into."""
+        if self.respect_gitignore:
+            own_rules = _read_ignore_rules(directory)
+            if own_rules is not None:
+                ignore_rules = [*ignore_rules, own_rules]
+
+        py_files = []
+        subdirectories = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                is_dir = entry.is_dir()
+                if is_dir and entry.is_symlink():  # like os.walk does
+                    continue
+                if not is_dir and not entry.name.endswith(".py"):
+                    continue
+                if self.respect_gitignore and entry.name == ".git":
+                    continue
+                if self.exclude and self._excluded(
+                    entry.name,
+                    _relative_path(entry.path, root),
+                ):
+                    continue
+                if ignore_rules and _ignored(
+                    entry.path,
+                    is_dir=is_dir,
+                    ignore_rules=ignore_rules,
+                ):
+                    continue
+                (subdirectories if is_dir else py_files).append(entry.path)
+
+        return sorted(py_files), sorted(subdirectories), ignore_rules
+
+    def _walk(self, executor: ThreadPoolExecutor, root: str) -> Iterator[str]:
+        ignore_rules = _ancestor_ignore_rules(root) if self.respect_gitignore else []
+        # Directories are listed ahead in the background, while results are
+        # consumed in depth-first order
+        stack: list[Future] = [
+            executor.submit(self._scan_directory, root, root, ignore_rules),
+        ]
+        while stack:
+            try:
+                py_files, subdirectories, ignore_rules = stack.pop().result()
+            except OSError as e:
+                _logger.warning(f"Cannot list directory: {e}")
+                continue
+            yield from py_files
+            stack += [
+                executor.submit(self._scan_directory, root, subdirectory, ignore_rules)
+                for subdirectory in reversed(subdirectories)
+            ]
+
+    def iterate_py_files(self, abs_dir: str) -> Iterator[str]:
+        """Yield the paths of all Python files below a directory."""
+        executor = ThreadPoolExecutor(
+            max_workers=self._max_workers,
+            thread_name_prefix="walk",
+        )
+        try:
+            yield from self._walk(executor, abs_dir)
+        finally:
+            executor.shutdown(cancel_futures=True)
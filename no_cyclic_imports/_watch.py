@@ -0,0 +1,259 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+"""
+Long-running watch mode with incremental updates of the import graph.
+
+Files are watched by polling their modification time and size.
+Clients can query the latest report over a local Unix socket.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import socket
+import stat
+import threading
+import time
+from typing import IO, TYPE_CHECKING
+
+from ._engine import (
+    ToplevelCollector,
+    _collect_py_files,
+    _format_cycle,
+    _render_report,
+    _render_truncation,
+)
+from ._follow_scope import FollowScope
+from ._graph import SearchBudget
+from ._imports import ImportGraph
+from ._source_roots import SourceRoots
+from ._walk import TreeWalker
+
+if TYPE_CHECKING:
+    from ._cache import ImportCache
+
+_logger = logging.getLogger(__name__)
+
+
+class WatchSession:
+    """
+    Keeps an import graph in memory and updates it file by file.
+
+    Cycles are cached per strongly connected component and only
+    recomputed for components containing modules whose imports changed.
+    The ``time_budget`` applies to each report; components not searched
+    completely in time are searched again for the next report.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        abs_paths: list[str],
+        *,
+        follow: bool,
+        cache: "ImportCache | None" = None,
+        jobs: int = 1,
+        source_roots: SourceRoots | None = None,
+        python_version: str | None = None,
+        walker: TreeWalker | None = None,
+        follow_scope: FollowScope | None = None,
+        max_cycle_length: int | None = None,
+        time_budget: float | None = None,
+    ):
+        self._abs_paths = list(abs_paths)
+        self._follow = follow
+        self._cache = cache
+        self._jobs = jobs
+        self._source_roots = SourceRoots() if source_roots is None else source_roots
+        self._python_version = python_version
+        self._walker = walker
+        self._follow_scope = follow_scope
+        self._max_cycle_length = max_cycle_length
+        self._time_budget = time_budget
+        self.components_recomputed = 0
+        self._rebuild()
+
+    def _scan(self) -> tuple[ToplevelCollector, dict[str, tuple[int, int]]]:
+        toplevel_packages = ToplevelCollector(self._source_roots)
+        fingerprints = {}
+        for abs_path in _collect_py_files(
+            self._abs_paths,
+            toplevel_packages,
+            self._walker,
+        ):
+            with contextlib.suppress(FileNotFoundError):
+                stat_result = os.stat(abs_path)
+                fingerprints[abs_path] = stat_result.st_mtime_ns, stat_result.st_size
+        return toplevel_packages, fingerprints
+
+    def _rebuild(self):
+        self._source_roots.clear()
+        self._imports = ImportGraph(
+            cache=self._cache,
+            jobs=self._jobs,
+            source_roots=self._source_roots,
+            python_version=self._python_version,
+            follow_scope=self._follow_scope,
+        )
+        self._toplevel_packages, self._fingerprints = self._scan()
+        self._imports.add_files(list(self._fingerprints), follow=self._follow)
+        if self._cache is not None:
+            self._cache.prune()
+        self._imports.pop_changed_modules()
+        self._cycles_of = {}
+        self._cycles_toplevel_packages = frozenset(self._toplevel_packages)
+
+    def poll(self) -> bool:
+        """Apply all file changes since the last poll, return if there were any."""
+        toplevel_packages, fingerprints = self._scan()
+        added = fingerprints.keys() - self._fingerprints.keys()
+        removed = self._fingerprints.keys() - fingerprints.keys()
+        modified = {
+            abs_path
+            for abs_path in fingerprints.keys() & self._fingerprints.keys()
+            if fingerprints[abs_path] != self._fingerprints[abs_path]
+        }
+        if not (added or removed or modified):
+            return False
+
+        if any(os.path.basename(path) == "__init__.py" for path in added | removed):
+            _logger.info("Package structure changed, rebuilding import graph...")
+            self._rebuild()
+            return True
+
+        self._toplevel_packages = toplevel_packages
+        self._fingerprints = fingerprints
+
+        if added or removed:
+            self._imports.forget_resolutions()
+        for abs_path in sorted(removed):
+            self._imports.remove_file(abs_path)
+        for abs_path in sorted(added | modified):
+            self._imports.update_file(abs_path, follow=self._follow)
+
+        return True
+
+    def report(self) -> tuple[str, int]:
+        """Return the rendered report and the number of cycles."""
+        changed_modules = self._imports.pop_changed_modules()
+
+        if frozenset(self._toplevel_packages) != self._cycles_toplevel_packages:
+            self._cycles_of = {}
+            self._cycles_toplevel_packages = frozenset(self._toplevel_packages)
+
+        budget = SearchBudget(self._time_budget)
+        cycles_of = {}
+        lines = []
+        truncated_components = []
+        for component in self._imports.cyclic_components(self._toplevel_packages):
+            cached = self._cycles_of.get(component)
+            if cached is None or not changed_modules.isdisjoint(component):
+                self.components_recomputed += 1
+                count_truncated_before = len(budget.truncated_components)
+                component_lines = [
+                    _format_cycle(cycle)
+                    for cycle in self._imports.cycles_in(
+                        component,
+                        self._toplevel_packages,
+                        self._max_cycle_length,
+                        budget,
+                    )
+                ]
+                cached = (
+                    component_lines,
+                    budget.truncated_components[count_truncated_before:],
+                )
+                if not budget.exceeded:
+                    cycles_of[component] = cached
+            else:
+                cycles_of[component] = cached
+            lines += cached[0]
+            truncated_components += cached[1]
+        self._cycles_of = cycles_of
+
+        output = _render_report(lines)
+        if truncated_components:
+            output += _render_truncation(sorted(truncated_components))
+        # Truncated components contain cycles, even if none were found in time
+        return output, len(lines) or len(truncated_components)
+
+
+def _remove_stale_socket(socket_path: str):
+    if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except ConnectionRefusedError:
+            _logger.info(f"Removing stale socket {socket_path!r}...")
+            os.unlink(socket_path)
+
+
+def serve(
+    session: WatchSession,
+    socket_path: str,
+    *,
+    poll_interval: float,
+    file_: IO,
+    stop_event: threading.Event | None = None,
+):
+    """
+    Answer queries on a Unix socket while polling for file changes.
+
+    The report is printed to ``file_`` initially and whenever it changes.
+    Queries are answered from the report as of the latest poll, so that
+    they are cheap, while polling happens every ``poll_interval`` seconds
+    no matter how many queries come in.
+    """
+    output, count_cycles = session.report()
+    print(output, end="", file=file_, flush=True)
+
+    def refresh():
+        nonlocal output, count_cycles
+        if session.poll():
+            previous_output = output
+            output, count_cycles = session.report()
+            if output != previous_output:
+                print(output, end="", file=file_, flush=True)
+
+    with contextlib.suppress(FileNotFoundError):
+        _remove_stale_socket(socket_path)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(socket_path)
+        try:
+            server.listen()
+            _logger.info(f"Listening on {socket_path!r}...")
+            next_poll = time.monotonic() + poll_interval
+            while stop_event is None or not stop_event.is_set():
+                server.settimeout(max(next_poll - time.monotonic(), 0.001))
+                try:
+                    connection, _ = server.accept()
+                except TimeoutError:
+                    pass
+                else:
+                    with connection:
+                        response = {
+                            "exit_code": 2 if count_cycles else 0,
+                            "output": output,
+                        }
+                        connection.sendall(json.dumps(response).encode("utf-8"))
+
+                if time.monotonic() >= next_poll:
+                    refresh()
+                    next_poll = time.monotonic() + poll_interval
+        finally:
+            os.unlink(socket_path)
+
+
+def query(socket_path: str) -> tuple[int, str]:
+    """Return the exit code and report of a server listening on ``socket_path``."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        chunks = []
+        while chunk := client.recv(65536):
+            chunks.append(chunk)
+
+    response = json.loads(b"".join(chunks))
+    return response["exit_code"], response["output"]
@@ -0,0 +1,292 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+"""
+Scaling benchmark on synthetic codebases.
+
+Times each phase (walk, parse, record, resolve, follow, cycle enumeration)
+and measures peak memory for codebases of increasing size,
+and writes the results as JSON.  Results of an earlier run can be passed
+via ``--compare`` to detect regressions.  For example:
+
+    python3 -m no_cyclic_imports.tests.benchmark --output before.json
+    python3 -m no_cyclic_imports.tests.benchmark --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from tempfile import TemporaryDirectory
+
+from .._engine import ToplevelCollector, _collect_py_files
+from .._graph import SearchBudget
+from .._imports import ImportGraph
+from .._resolution import ModuleResolver
+from ..version import VERSION
+from .factories import add_fake_site_packages_to, add_synthetic_codebase_to
+
+DEFAULT_MODULE_COUNTS = [1_000, 10_000, 100_000]
+
+
+class _Stopwatch:
+    def __init__(self):
+        self.phases = {}
+
+    def measure(self, phase: str, function, *args, **kwargs):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        result = function(*args, **kwargs)
+        self.phases[phase] = {
+            "wall_seconds": time.perf_counter() - wall_start,
+            "cpu_seconds": time.process_time() - cpu_start,
+        }
+        return result
+
+
+def _count_cycles(cycles) -> int:
+    return sum(1 for _ in cycles)
+
+
+def _analyze(
+    project_dir: str,
+    site_packages_dir: str,
+    *,
+    jobs: int,
+    time_budget: float,
+) -> tuple[dict, dict]:
+    stopwatch = _Stopwatch()
+    imports = ImportGraph(
+        jobs=jobs,
+        resolver=ModuleResolver([project_dir, site_packages_dir]),
+    )
+
+    toplevel_packages = ToplevelCollector()
+    py_files = stopwatch.measure(
+        "walk",
+        lambda: list(_collect_py_files([project_dir], toplevel_packages)),
+    )
+
+    try:
+        analyzed = stopwatch.measure("parse", imports._analyze_many, py_files)
+    finally:
+        imports._shutdown_executor()
+
+    def record() -> set[str]:
+        discovered = set()
+        for abs_path, (source_module, target_modules) in zip(
+            py_files,
+            analyzed,
+            strict=True,
+        ):
+            imports._seen_files.add(abs_path)
+            discovered.update(imports._record(abs_path, source_module, target_modules))
+        return discovered
+
+    discovered = stopwatch.measure("record", record)
+    followed_files = stopwatch.measure("resolve", imports._resolve_many, discovered)
+    stopwatch.measure("follow", imports.add_files, followed_files, follow=True)
+
+    budget = SearchBudget(time_budget)
+    count_cycles = stopwatch.measure(
+        "cycles",
+        _count_cycles,
+        imports.iterate_cycles(toplevel_packages, budget=budget),
+    )
+    count_shortest_cycles = stopwatch.measure(
+        "shortest_cycles",
+        _count_cycles,
+        imports.iterate_shortest_cycles(toplevel_packages),
+    )
+
+    counts = {
+        "files": len(py_files),
+        "nodes": len(imports._graph),
+        "edges": imports._graph.edge_count(),
+        "cycles": count_cycles,
+        "shortest_cycles": count_shortest_cycles,
+        "truncated_components": len(budget.truncated_components),
+    }
+    return stopwatch.phases, counts
+
+
+def run_benchmark(  # noqa: PLR0913
+    modules: int,
+    *,
+    packages: int = 10,
+    depth: int = 2,
+    fan_out: int = 3,
+    cycle_density: float = 0.001,
+    third_party_modules: int = 100,
+    jobs: int = 1,
+    time_budget: float = 10.0,
+    measure_memory: bool = True,
+) -> dict:
+    parameters = {
+        "modules": modules,
+        "packages": packages,
+        "depth": depth,
+        "fan_out": fan_out,
+        "cycle_density": cycle_density,
+        "third_party_modules": third_party_modules,
+        "jobs": jobs,
+        "time_budget": time_budget,
+    }
+
+    with TemporaryDirectory() as tempdir:
+        project_dir = os.path.join(tempdir, "project")
+        site_packages_dir = os.path.join(tempdir, "site-packages")
+        os.mkdir(project_dir)
+        os.mkdir(site_packages_dir)
+        third_party_module_names = add_fake_site_packages_to(
+            site_packages_dir,
+            modules=third_party_modules,
+        )
+        add_synthetic_codebase_to(
+            project_dir,
+            modules=modules,
+            packages=packages,
+            depth=depth,
+            fan_out=fan_out,
+            cycle_density=cycle_density,
+            third_party_modules=third_party_module_names,
+        )
+
+        phases, counts = _analyze(
+            project_dir,
+            site_packages_dir,
+            jobs=jobs,
+            time_budget=time_budget,
+        )
+
+        peak_memory_bytes = None
+        if measure_memory:
+            # A separate run, because tracing slows down all of the above
+            tracemalloc.start()
+            try:
+                _analyze(
+                    project_dir,
+                    site_packages_dir,
+                    jobs=jobs,
+                    time_budget=time_budget,
+                )
+                _, peak_memory_bytes = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+    return {
+        "parameters": parameters,
+        "phases": phases,
+        "counts": counts,
+        "peak_memory_bytes": peak_memory_bytes,
+    }
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    *,
+    tolerance: float,
+    min_seconds: float = 0.05,
+) -> list[str]:
+    """Return a description of each phase that got slower beyond tolerance."""
+    baseline_results = {
+        json.dumps(result["parameters"], sort_keys=True): result
+        for result in baseline["results"]
+    }
+    regressions = []
+    for result in current["results"]:
+        baseline_result = baseline_results.get(
+            json.dumps(result["parameters"], sort_keys=True),
+        )
+        if baseline_result is None:
+            continue
+        for phase, timings in result["phases"].items():
+            baseline_timings = baseline_result["phases"].get(phase, {})
+            baseline_seconds = baseline_timings.get("wall_seconds")
+            seconds = timings["wall_seconds"]
+            if (
+                baseline_seconds is not None
+                and seconds >= min_seconds
+                and seconds > baseline_seconds * (1 + tolerance)
+            ):
+                regressions.append(
+                    f"{result['parameters']['modules']} modules, phase {phase!r}:"
+                    f" {baseline_seconds:.3f}s -> {seconds:.3f}s",
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog=f"python3 -m {__spec__.name}")
+    parser.add_argument(
+        "--modules",
+        metavar="N",
+        type=int,
+        nargs="+",
+        default=DEFAULT_MODULE_COUNTS,
+        help="codebase sizes to benchmark (default: %(default)s)",
+    )
+    parser.add_argument("--packages", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--fan-out", type=int, default=3)
+    parser.add_argument("--cycle-density", type=float, default=0.001)
+    parser.add_argument("--third-party-modules", type=int, default=100)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--time-budget", type=float, default=10.0)
+    parser.add_argument(
+        "--no-memory",
+        dest="memory",
+        action="store_false",
+        help="skip the (slow) second run measuring peak memory",
+    )
+    parser.add_argument("--output", metavar="FILE", help="(default: stdout)")
+    parser.add_argument(
+        "--compare",
+        metavar="FILE",
+        help="report phases that got slower than in earlier results FILE,"
+        " and exit with code 1 if any",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    config = parser.parse_args(argv)
+
+    report = {
+        "version": VERSION,
+        "python": sys.version,
+        "platform": platform.platform(),
+        "results": [
+            run_benchmark(
+                modules,
+                packages=config.packages,
+                depth=config.depth,
+                fan_out=config.fan_out,
+                cycle_density=config.cycle_density,
+                third_party_modules=config.third_party_modules,
+                jobs=config.jobs,
+                time_budget=config.time_budget,
+                measure_memory=config.memory,
+            )
+            for modules in config.modules
+        ],
+    }
+
+    if config.output:
+        with open(config.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if config.compare:
+        with open(config.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, tolerance=config.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
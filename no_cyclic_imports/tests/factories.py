@@ -2,11 +2,21 @@
 # Licensed under Affero GPL v3 or later
 
 import os.path
+import random
 from textwrap import dedent
 
 
-def add_cyclic_import_to(directory: str) -> tuple[str, str, str, str, str, str]:
-    package_name = "package123"
+def write_file(path: str, content: str = ""):
+    """Write a text file, creating missing parent directories."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def add_cyclic_import_to(
+    directory: str,
+    package_name: str = "package123",
+) -> tuple[str, str, str, str, str, str]:
     package_dir = os.path.join(directory, package_name)
     init_py = os.path.join(package_dir, "__init__.py")
     a_py = os.path.join(package_dir, "a.py")
@@ -48,3 +58,91 @@ def add_cyclic_import_to(directory: str) -> tuple[str, str, str, str, str, str]:
     package_b_name = f"{package_name}.b"
 
     return init_py, a_py, b_py, package_name, package_a_name, package_b_name
+
+
+def _write_package_inits(directory: str, package_parts: list[str]):
+    for depth in range(1, len(package_parts) + 1):
+        init_py = os.path.join(directory, *package_parts[:depth], "__init__.py")
+        if not os.path.exists(init_py):
+            os.makedirs(os.path.dirname(init_py), exist_ok=True)
+            open(init_py, "w").close()
+
+
+def add_synthetic_codebase_to(  # noqa: PLR0913
+    directory: str,
+    *,
+    modules: int,
+    packages: int = 10,
+    depth: int = 2,
+    fan_out: int = 3,
+    cycle_density: float = 0.01,
+    toplevel_prefix: str = "pkg",
+    third_party_modules: list[str] | None = None,
+    seed: int = 0,
+) -> list[str]:
+    """
+    Write a synthetic codebase of ``modules`` modules, return their names.
+
+    Modules are spread over ``packages`` top-level packages,
+    in sub-packages nested up to ``depth`` levels deep.
+    Each module imports up to ``fan_out`` other modules, mostly ones
+    created after it (which is acyclic), but with probability
+    ``cycle_density`` one created before it, which introduces cycles.
+    If ``third_party_modules`` are given, each module imports one of these
+    as well, and every module imports a module of the standard library.
+    """
+    rng = random.Random(seed)  # noqa: S311
+    module_names = []
+    module_paths = []
+    for index in range(modules):
+        package_parts = [f"{toplevel_prefix}{index % packages}"]
+        package_parts += [
+            f"sub{level}" for level in range(index // packages % (depth + 1))
+        ]
+        _write_package_inits(directory, package_parts)
+        module_names.append(".".join([*package_parts, f"m{index}"]))
+        module_paths.append(os.path.join(directory, *package_parts, f"m{index}.py"))
+
+    for index, (module_name, module_path) in enumerate(
+        zip(module_names, module_paths, strict=True),
+    ):
+        lines = ["import os"]
+        if third_party_modules:
+            lines.append(f"import {rng.choice(third_party_modules)}")
+        for _ in range(fan_out):
+            if rng.random() < cycle_density and index > 0:
+                target_index = rng.randrange(index)
+            elif index + 1 < modules:
+                target_index = rng.randrange(index + 1, modules)
+            else:
+                continue
+            if rng.random() < 0.5:  # noqa: PLR2004
+                lines.append(f"from {module_names[target_index]} import NAME")
+            else:
+                lines.append(f"import {module_names[target_index]}")
+        lines.append(f"NAME = {module_name!r}")
+
+        with open(module_path, "w") as f:
+            print("\n".join(lines), file=f)
+
+    return module_names
+
+
+def add_fake_site_packages_to(
+    directory: str,
+    *,
+    modules: int,
+    packages: int = 5,
+    seed: int = 0,
+) -> list[str]:
+    """Write an acyclic synthetic third-party codebase, return its module names."""
+    return add_synthetic_codebase_to(
+        directory,
+        modules=modules,
+        packages=packages,
+        depth=1,
+        fan_out=2,
+        cycle_density=0,
+        toplevel_prefix="thirdparty",
+        seed=seed,
+    )
@@ -0,0 +1,104 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+"""
+Cold start benchmark of the command line interface.
+
+Runs ``python3 -X importtime -m no_cyclic_imports`` with the given arguments
+a number of times, and reports median wall time and median time spent
+importing modules, along with the modules imported that are slowest
+to import.  Exits with code 1 if the median wall time exceeds the budget.
+For example:
+
+    python3 -m no_cyclic_imports.tests.startup_benchmark -- --version
+    python3 -m no_cyclic_imports.tests.startup_benchmark --budget-ms 150 -- a.py
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+DEFAULT_BUDGET_MILLISECONDS = 100
+DEFAULT_RUNS = 5
+
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """Return microseconds spent importing each module itself, in import order."""
+    self_microseconds = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():  # noqa: PLR2004
+            continue  # i.e. the table header
+        self_microseconds[fields[2].strip()] = int(fields[0])
+    return self_microseconds
+
+
+def _run_once(args: list[str]) -> tuple[float, dict[str, int]]:
+    wall_start = time.perf_counter()
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-m", "no_cyclic_imports", *args],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    wall_seconds = time.perf_counter() - wall_start
+    return wall_seconds, parse_importtime(result.stderr)
+
+
+def measure_startup(args: list[str], *, runs: int = DEFAULT_RUNS) -> dict:
+    wall_seconds = []
+    import_seconds = []
+    modules = {}
+    for _ in range(runs):
+        wall, self_microseconds = _run_once(args)
+        wall_seconds.append(wall)
+        import_seconds.append(sum(self_microseconds.values()) / 1e6)
+        modules = self_microseconds
+
+    return {
+        "args": args,
+        "runs": runs,
+        "wall_seconds": statistics.median(wall_seconds),
+        "import_seconds": statistics.median(import_seconds),
+        "modules": sorted(modules),
+        "slowest_modules": sorted(modules, key=modules.__getitem__, reverse=True)[:10],
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog=f"python3 -m {__spec__.name}")
+    parser.add_argument("--runs", metavar="N", type=int, default=DEFAULT_RUNS)
+    parser.add_argument(
+        "--budget-ms",
+        metavar="MILLISECONDS",
+        type=float,
+        default=DEFAULT_BUDGET_MILLISECONDS,
+        help="maximum median wall time of a cold start (default: %(default)s)",
+    )
+    parser.add_argument(
+        "args",
+        nargs="*",
+        metavar="ARG",
+        help="arguments to no-cyclic-imports (default: --version)",
+    )
+    config = parser.parse_args(argv)
+
+    report = measure_startup(config.args or ["--version"], runs=config.runs)
+    print(json.dumps(report, indent=2))
+
+    wall_milliseconds = report["wall_seconds"] * 1000
+    if wall_milliseconds > config.budget_ms:
+        print(
+            f"Over budget: {wall_milliseconds:.1f}ms > {config.budget_ms:.1f}ms",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
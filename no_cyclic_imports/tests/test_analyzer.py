@@ -0,0 +1,176 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import os
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+from textwrap import dedent
+from unittest import TestCase
+from unittest.mock import patch
+
+from .. import Analyzer, Cycle, _imports
+from .._cache import MemoryImportCache
+from .factories import add_cyclic_import_to
+
+
+class AnalyzerTest(TestCase):
+    def setUp(self):
+        tempdir = TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self._tempdir = tempdir.name
+
+    def test_structured_cycles(self):
+        add_cyclic_import_to(self._tempdir)
+
+        cycles = Analyzer().analyze([self._tempdir], follow=False)
+
+        self.assertEqual(
+            cycles,
+            [Cycle(("package123", "package123.a", "package123.b"))],
+        )
+        self.assertEqual(
+            str(cycles[0]),
+            "package123 -> package123.a -> package123.b -> package123",
+        )
+
+    def test_truncated_components(self):
+        add_cyclic_import_to(self._tempdir)
+        analyzer = Analyzer()
+
+        cycles = analyzer.analyze([self._tempdir], follow=False, max_cycle_length=2)
+
+        self.assertEqual(cycles, [])
+        self.assertEqual(
+            analyzer.truncated_components,
+            [["package123", "package123.a", "package123.b"]],
+        )
+        analyzer.analyze([self._tempdir], follow=False)
+        self.assertEqual(analyzer.truncated_components, [])
+
+    def test_parsed_files_are_kept_across_calls(self):
+        add_cyclic_import_to(self._tempdir)
+        analyzer = Analyzer()
+
+        with patch.object(
+            _imports,
+            "_analyze_file",
+            wraps=_imports._analyze_file,
+        ) as analyze_file:
+            first_cycles = analyzer.analyze([self._tempdir], follow=False)
+            parsed_files_after_first_call = len(analyze_file.call_args_list)
+            second_cycles = analyzer.analyze([self._tempdir], follow=False)
+
+        self.assertEqual(first_cycles, second_cycles)
+        self.assertEqual(parsed_files_after_first_call, 3)
+        self.assertEqual(
+            [call.args[3] is None for call in analyze_file.call_args_list],
+            [True] * 3 + [False] * 3,
+        )
+
+    def test_iterate_cycles_is_a_generator(self):
+        add_cyclic_import_to(self._tempdir, "package456")
+        add_cyclic_import_to(self._tempdir)
+
+        cycles = Analyzer().iterate_cycles([self._tempdir], follow=False)
+
+        self.assertIsInstance(next(cycles), Cycle)
+        self.assertIsInstance(next(cycles), Cycle)
+        self.assertIsNone(next(cycles, None))
+
+
+class MemoryImportCacheTest(TestCase):
+    def setUp(self):
+        tempdir = TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self._py_paths = []
+        for name in ("a", "b", "c"):
+            py_path = os.path.join(tempdir.name, f"{name}.py")
+            with open(py_path, "w") as f:
+                f.write(f"import {name}\n")
+            self._py_paths.append(py_path)
+
+    def test_modified_file_is_a_miss(self):
+        cache = MemoryImportCache()
+        cache.put(self._py_paths[0], [(None, "a", None, None)])
+        self.assertEqual(cache.get(self._py_paths[0]), [(None, "a", None, None)])
+
+        with open(self._py_paths[0], "a") as f:
+            f.write("import a2\n")
+
+        self.assertIsNone(cache.get(self._py_paths[0]))
+
+    def test_least_recently_used_are_evicted_beyond_max_bytes(self):
+        unbounded_cache = MemoryImportCache()
+        unbounded_cache.put(self._py_paths[0], [(None, "a", None, None)])
+        cache = MemoryImportCache(max_bytes=unbounded_cache.estimated_bytes * 2)
+
+        for py_path in self._py_paths:
+            cache.put(py_path, [(None, os.path.basename(py_path)[0], None, None)])
+
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.estimated_bytes, unbounded_cache.estimated_bytes * 2)
+        self.assertIsNone(cache.get(self._py_paths[0]))
+        self.assertIsNotNone(cache.get(self._py_paths[2]))
+
+
+class PytestPluginTest(TestCase):
+    def test_session_fixture(self):
+        with TemporaryDirectory() as tempdir:
+            add_cyclic_import_to(tempdir)
+            test_py = os.path.join(tempdir, "test_cycles.py")
+            with open(test_py, "w") as f:
+                f.write(
+                    dedent(f"""\
+                        import pytest
+
+                        @pytest.mark.parametrize("_attempt", [1, 2])
+                        def test(no_cyclic_imports_analyzer, _attempt):
+                            cycles = no_cyclic_imports_analyzer.analyze(
+                                [{os.path.join(tempdir, "package123")!r}],
+                                follow=False,
+                            )
+                            assert len(cycles) == 1
+
+                        def test_same_session(no_cyclic_imports_analyzer):
+                            assert no_cyclic_imports_analyzer._parsed_files.hits
+                    """),
+                )
+
+            result = subprocess.run(  # noqa: S603
+                [
+                    sys.executable,
+                    "-m",
+                    "pytest",
+                    "-p",
+                    "no_cyclic_imports._pytest_plugin",
+                    "-p",
+                    "no:cacheprovider",
+                    test_py,
+                ],
+                cwd=tempdir,
+                env={**os.environ, "PYTEST_DISABLE_PLUGIN_AUTOLOAD": "1"},
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertIn("3 passed", result.stdout)
+
+    def test_loading_does_not_import_analyzer(self):
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                (
+                    "import sys, no_cyclic_imports._pytest_plugin;"
+                    " print('no_cyclic_imports._analyzer' in sys.modules)"
+                ),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        self.assertEqual(result.stdout, "False\n")
@@ -0,0 +1,71 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import copy
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from .._engine import run
+from .benchmark import compare, run_benchmark
+from .factories import add_synthetic_codebase_to
+
+
+class SyntheticCodebaseTest(TestCase):
+    @parameterized.expand(
+        [
+            ("acyclic", 0, False),
+            ("cyclic", 0.5, True),
+        ],
+    )
+    def test_cycle_density(self, _label, cycle_density, expecting_cycles):
+        with TemporaryDirectory() as tempdir:
+            module_names = add_synthetic_codebase_to(
+                tempdir,
+                modules=60,
+                packages=3,
+                cycle_density=cycle_density,
+            )
+            count_cycles = run(
+                [tempdir],
+                follow=False,
+                file_=StringIO(),
+                max_cycles=1,
+            )
+
+        self.assertEqual(len(module_names), 60)
+        self.assertEqual(bool(count_cycles), expecting_cycles)
+
+
+class BenchmarkTest(TestCase):
+    def test_run_and_compare(self):
+        result = run_benchmark(
+            50,
+            third_party_modules=10,
+            cycle_density=0.1,
+            measure_memory=False,
+        )
+
+        self.assertEqual(
+            set(result["phases"]),
+            {
+                "walk",
+                "parse",
+                "record",
+                "resolve",
+                "follow",
+                "cycles",
+                "shortest_cycles",
+            },
+        )
+        self.assertEqual(result["counts"]["files"], 50 + 10 * 3)  # incl. __init__.py
+        self.assertGreater(result["counts"]["nodes"], 50)
+
+        baseline = {"results": [result]}
+        slower = copy.deepcopy(baseline)
+        slower["results"][0]["phases"]["parse"]["wall_seconds"] = 1e6
+
+        self.assertEqual(compare(baseline, baseline, tolerance=0.25), [])
+        self.assertEqual(len(compare(baseline, slower, tolerance=0.25)), 1)
@@ -0,0 +1,173 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from .._cache import DistributionIndex, ImportCache, default_cache_dir
+
+_IMPORTS = [(None, "os", None, None), ("package123", "symbol123", None, 0)]
+
+
+class DefaultCacheDirTest(TestCase):
+    def test_xdg_cache_home(self):
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": "/xdg123"}):
+            self.assertEqual(default_cache_dir(), "/xdg123/no-cyclic-imports")
+
+
+class ImportCacheTest(TestCase):
+    def setUp(self):
+        self._tempdir = TemporaryDirectory()
+        self.addCleanup(self._tempdir.cleanup)
+        self._cache_dir = os.path.join(self._tempdir.name, "cache")
+        self._py_file = os.path.join(self._tempdir.name, "module123.py")
+        with open(self._py_file, "w") as f:
+            print("import os", file=f)
+
+    def test_miss_then_hit(self):
+        first_cache = ImportCache(self._cache_dir)
+        self.assertIsNone(first_cache.get(self._py_file))
+        first_cache.put(self._py_file, _IMPORTS)
+
+        second_cache = ImportCache(self._cache_dir)
+        actual = second_cache.get(self._py_file)
+
+        self.assertEqual(actual, _IMPORTS)
+        self.assertEqual((first_cache.hits, first_cache.misses), (0, 1))
+        self.assertEqual((second_cache.hits, second_cache.misses), (1, 0))
+
+    def test_hit_by_content_hash_after_touch(self):
+        ImportCache(self._cache_dir).put(self._py_file, _IMPORTS)
+        os.utime(self._py_file, ns=(0, 0))
+
+        actual = ImportCache(self._cache_dir).get(self._py_file)
+
+        self.assertEqual(actual, _IMPORTS)
+
+    def test_miss_after_content_change(self):
+        ImportCache(self._cache_dir).put(self._py_file, _IMPORTS)
+        with open(self._py_file, "a") as f:
+            print("import sys", file=f)
+
+        self.assertIsNone(ImportCache(self._cache_dir).get(self._py_file))
+
+    def test_miss_after_content_change_while_parsing(self):
+        cache = ImportCache(self._cache_dir)
+        self.assertIsNone(cache.get(self._py_file))
+        with open(self._py_file, "a") as f:
+            print("import sys", file=f)
+        cache.put(self._py_file, _IMPORTS)  # i.e. parsed before the change
+
+        self.assertIsNone(ImportCache(self._cache_dir).get(self._py_file))
+
+    def test_miss_after_version_change(self):
+        ImportCache(self._cache_dir).put(self._py_file, _IMPORTS)
+
+        with patch("no_cyclic_imports._cache.VERSION", "0.0.0"):
+            self.assertIsNone(ImportCache(self._cache_dir).get(self._py_file))
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = ImportCache(self._cache_dir)
+        cache.put(self._py_file, _IMPORTS)
+        with open(cache._entry_path_for(self._py_file), "w") as f:
+            f.write("{not json")
+
+        self.assertIsNone(ImportCache(self._cache_dir).get(self._py_file))
+
+    def test_prune_evicts_least_recently_used(self):
+        other_py_file = os.path.join(self._tempdir.name, "other123.py")
+        with open(other_py_file, "w") as f:
+            print("import sys", file=f)
+        cache = ImportCache(self._cache_dir)
+        cache.put(self._py_file, _IMPORTS)
+        cache.put(other_py_file, _IMPORTS)
+        old_entry_path = cache._entry_path_for(self._py_file)
+        new_entry_path = cache._entry_path_for(other_py_file)
+        os.utime(old_entry_path, ns=(0, 0))
+        cache._max_bytes = os.path.getsize(new_entry_path)
+
+        cache.prune()
+
+        self.assertFalse(os.path.exists(old_entry_path))
+        self.assertTrue(os.path.exists(new_entry_path))
+
+
+def _install_distribution_to(site_dir: str, record_extra: str = "") -> list[str]:
+    """Write a fake installed distribution, return the paths of its files."""
+    files = {"foo/__init__.py": "import os\n", "foo/bar.py": "import foo\n"}
+    record_lines = []
+    for relative_path, content in files.items():
+        os.makedirs(os.path.join(site_dir, "foo"), exist_ok=True)
+        with open(os.path.join(site_dir, relative_path), "w") as f:
+            f.write(content)
+        record_lines.append(f"{relative_path},sha256=123,{len(content)}\n")
+    dist_info_dir = os.path.join(site_dir, "foo-1.0.dist-info")
+    os.makedirs(dist_info_dir, exist_ok=True)
+    with open(os.path.join(dist_info_dir, "RECORD"), "w") as f:
+        f.write("".join(record_lines) + "foo-1.0.dist-info/RECORD,,\n" + record_extra)
+    return [os.path.join(site_dir, relative_path) for relative_path in files]
+
+
+class DistributionIndexTest(TestCase):
+    def setUp(self):
+        tempdir = TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self._tempdir = tempdir.name
+        self._index_dir = os.path.join(tempdir.name, "index")
+        self._site_dirs = [
+            os.path.join(tempdir.name, name) for name in ("site1", "site2")
+        ]
+        self._py_files = _install_distribution_to(self._site_dirs[0])
+
+    def _index(self) -> DistributionIndex:
+        return DistributionIndex(self._index_dir, search_path=self._site_dirs)
+
+    def test_shared_among_installations(self):
+        index = self._index()
+        self.assertIsNone(index.get(self._py_files[0]))
+        self.assertTrue(index.put(self._py_files[0], _IMPORTS))
+        index.flush()
+        other_py_files = _install_distribution_to(self._site_dirs[1])
+
+        actual = self._index().get(other_py_files[0])
+
+        self.assertEqual(actual, _IMPORTS)
+        self.assertEqual(len(os.listdir(self._index_dir)), 1)
+
+    def test_miss_after_record_change(self):
+        index = self._index()
+        index.put(self._py_files[0], _IMPORTS)
+        index.flush()
+        _install_distribution_to(self._site_dirs[0], "foo/baz.py,sha256=456,0\n")
+
+        self.assertIsNone(self._index().get(self._py_files[0]))
+
+    def test_modified_files_are_not_indexed(self):
+        with open(self._py_files[0], "a") as f:
+            f.write("import sys\n")
+
+        index = self._index()
+
+        self.assertFalse(index.indexes(self._py_files[0]))
+        self.assertFalse(index.put(self._py_files[0], _IMPORTS))
+        self.assertTrue(index.indexes(self._py_files[1]))
+
+    def test_import_cache_keeps_installed_files_in_index(self):
+        cache_dir = os.path.join(self._tempdir, "cache")
+        first_party_py_file = os.path.join(self._tempdir, "module123.py")
+        with open(first_party_py_file, "w") as f:
+            f.write("import os\n")
+        cache = ImportCache(cache_dir, distributions=self._index())
+
+        for py_file in (*self._py_files, first_party_py_file):
+            self.assertIsNone(cache.get(py_file))
+            cache.put(py_file, _IMPORTS)
+        cache.prune()
+
+        self.assertEqual(len(os.listdir(self._index_dir)), 1)
+        self.assertEqual(len(list(cache._iterate_entries())), 1)
+        warm_cache = ImportCache(cache_dir, distributions=self._index())
+        for py_file in (*self._py_files, first_party_py_file):
+            self.assertEqual(warm_cache.get(py_file), _IMPORTS)
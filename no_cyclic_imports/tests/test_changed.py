@@ -0,0 +1,140 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import os
+import subprocess
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from .. import _imports
+from .._changed import changed_files_since, run_changed
+from .._walk import TreeWalker
+from .factories import add_cyclic_import_to, write_file
+
+
+class RunChangedTest(TestCase):
+    def setUp(self):
+        tempdir = TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self._project_dir = os.path.join(tempdir.name, "project")
+        self._state_dir = os.path.join(tempdir.name, "state")
+        os.mkdir(self._project_dir)
+        _, self._a_py, self._b_py, *_ = add_cyclic_import_to(self._project_dir)
+
+        package_dir = os.path.join(self._project_dir, "package456")
+        os.mkdir(package_dir)
+        write_file(os.path.join(package_dir, "__init__.py"), "")
+        self._other_a_py = os.path.join(package_dir, "a.py")
+        write_file(self._other_a_py, "from .b import b\n")
+        write_file(os.path.join(package_dir, "b.py"), "from .a import a\n")
+
+    def _run(self, *changed_paths: str, **kwargs) -> tuple[int, str]:
+        output = StringIO()
+        count_cycles = run_changed(
+            self._project_dir,
+            list(changed_paths),
+            follow=False,
+            file_=output,
+            state_dir=self._state_dir,
+            **kwargs,
+        )
+        return count_cycles, output.getvalue()
+
+    def test_only_cycles_involving_changed_files_are_reported(self):
+        count_cycles, output = self._run(self._a_py)
+
+        self.assertEqual(count_cycles, 1)
+        self.assertIn("package123.a", output)
+
+    def test_max_cycle_length(self):
+        count_cycles, output = self._run(self._a_py, max_cycle_length=2)
+
+        self.assertEqual(count_cycles, 1)
+        self.assertTrue(output.startswith("0 cycle(s).\nPartial result"))
+        self.assertIn("package123.a", output)
+        self.assertNotIn("package456", output)
+
+    def test_only_changed_files_are_analyzed(self):
+        self._run()
+        write_file(self._b_py, "b = 'b'  # no more imports\n")
+
+        with patch.object(
+            _imports,
+            "_analyze_file",
+            wraps=_imports._analyze_file,
+        ) as analyze_file:
+            count_cycles, output = self._run(self._b_py)
+
+        self.assertEqual(analyze_file.call_count, 1)
+        self.assertEqual((count_cycles, output), (0, "0 cycle(s).\n"))
+
+    def test_files_modified_behind_our_back_count_as_changed(self):
+        self._run()
+        write_file(self._other_a_py, "from .b import b  # modified\n")
+
+        count_cycles, output = self._run(self._a_py)
+
+        self.assertEqual(count_cycles, 2)
+        self.assertIn("package456.a", output)
+
+    def test_graphs_are_stored_per_walker_settings(self):
+        self._run(walker=TreeWalker(exclude=["package456"]))
+
+        count_cycles, output = self._run(self._other_a_py)
+
+        self.assertEqual(count_cycles, 1)
+        self.assertIn("package456.a", output)
+
+
+class ChangedFilesSinceTest(TestCase):
+    def setUp(self):
+        tempdir = TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self._repository_dir = os.path.realpath(tempdir.name)
+        self._project_dir = os.path.join(self._repository_dir, "project")
+        os.mkdir(self._project_dir)
+        _init_py, self._a_py, *_ = add_cyclic_import_to(self._project_dir)
+        self._outside_py = os.path.join(self._repository_dir, "outside.py")
+        write_file(self._outside_py, "")
+        self._git("init")
+        self._git("add", ".")
+        self._git("commit", "-m", "Initial commit")
+
+    def _git(self, *args: str):
+        subprocess.run(  # noqa: S603
+            [  # noqa: S607
+                "git",
+                "-c",
+                "user.name=Dummy",
+                "-c",
+                "user.email=dummy@example.org",
+                *args,
+            ],
+            cwd=self._repository_dir,
+            check=True,
+            capture_output=True,
+        )
+
+    def test_modified_and_untracked(self):
+        write_file(self._a_py, "a = 'a'\n")
+        c_py = os.path.join(os.path.dirname(self._a_py), "c.py")
+        write_file(c_py, "")
+        write_file(os.path.join(self._project_dir, "README.txt"), "")
+        write_file(self._outside_py, "import os\n")
+
+        self.assertEqual(
+            changed_files_since("HEAD", self._project_dir),
+            [self._a_py, c_py],
+        )
+
+    def test_range_excludes_working_tree(self):
+        write_file(self._a_py, "a = 'a'\n")
+        self._git("commit", "-am", "Change a.py")
+        write_file(os.path.join(os.path.dirname(self._a_py), "c.py"), "")
+
+        self.assertEqual(
+            changed_files_since("HEAD~1..HEAD", self._project_dir),
+            [self._a_py],
+        )
@@ -0,0 +1,29 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+from collections.abc import Iterator
+from unittest import TestCase
+
+from .._engine import _unique_lines
+
+_CYCLES = [["a", "b"], ["b", "a"], ["c", "d"]]
+
+
+def _then_fail(cycles: list[list[str]]) -> Iterator[list[str]]:
+    yield from cycles
+    raise AssertionError  # i.e. enumerated beyond the cycles expected
+
+
+class UniqueLinesTest(TestCase):
+    def test_stops_right_at_max_cycles(self):
+        with self.assertLogs("no_cyclic_imports._engine", "WARNING") as logs:
+            lines = list(_unique_lines(_then_fail(_CYCLES), max_cycles=2))
+
+        self.assertEqual(lines, ["a -> b -> a", "c -> d -> c"])
+        self.assertIn("Stopped after 2 cycle(s)", logs.output[0])
+
+    def test_below_max_cycles(self):
+        with self.assertNoLogs("no_cyclic_imports._engine"):
+            lines = list(_unique_lines(_CYCLES, max_cycles=3))
+
+        self.assertEqual(lines, ["a -> b -> a", "c -> d -> c"])
@@ -0,0 +1,70 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from .._follow_scope import FollowScope, is_installed
+from .._imports import ImportGraph
+from .._resolution import ModuleResolver
+from .factories import write_file
+
+
+class IsInstalledTest(TestCase):
+    @parameterized.expand(
+        [
+            ("/venv/lib/python3.12/site-packages/foo/__init__.py", True),
+            ("/usr/lib/python3/dist-packages/foo.py", True),
+            ("/home/user/src/foo/site_packages.py", False),
+            ("/home/user/src/foo/__init__.py", False),
+        ],
+    )
+    def test(self, abs_path, expected_installed):
+        self.assertEqual(is_installed(abs_path), expected_installed)
+
+
+class FollowScopeTest(TestCase):
+    def setUp(self):
+        tempdir = TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        src_dir = os.path.join(tempdir.name, "src")
+        site_dir = os.path.join(tempdir.name, "lib", "site-packages")
+        self._project_py = os.path.join(src_dir, "project", "__init__.py")
+        write_file(self._project_py, "import sibling\nimport thirdparty\n")
+        write_file(os.path.join(src_dir, "sibling", "__init__.py"), "import project\n")
+        write_file(
+            os.path.join(site_dir, "thirdparty", "__init__.py"),
+            "import project\n",
+        )
+        self._search_path = [src_dir, site_dir]
+
+    @parameterized.expand(
+        [
+            ("all", [], {"project", "sibling", "thirdparty"}),
+            ("local", [], {"project", "sibling"}),
+            ("first-party", [], {"project"}),
+            ("first-party", ["sibling"], {"project", "sibling"}),
+        ],
+    )
+    def test(self, scope_name, allowed_packages, expected_parsed_modules):
+        imports = ImportGraph(
+            resolver=ModuleResolver(self._search_path),
+            follow_scope=FollowScope(scope_name, allowed_packages=allowed_packages),
+        )
+
+        imports.add_files([self._project_py], follow=True)
+
+        graph = imports.module_graph().to_dict()
+        parsed_modules = {
+            source_module for _, source_module, _ in imports.file_records()
+        }
+        self.assertEqual(parsed_modules, expected_parsed_modules)
+        self.assertEqual(graph["project"], {"sibling", "thirdparty"})
+        self.assertEqual(imports.first_party_packages, {"project"})
+
+    def test_unknown_scope(self):
+        with self.assertRaises(ValueError):
+            FollowScope("nearby")
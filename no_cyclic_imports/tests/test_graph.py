@@ -0,0 +1,212 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import random
+from unittest import TestCase
+
+import networkx as nx
+from parameterized import parameterized
+
+from .._graph import ModuleGraph, SearchBudget
+from .._normalization import shortest_first_rotated
+
+
+def _normalized(cycles) -> list[list[str]]:
+    return sorted(shortest_first_rotated(list(cycle)) for cycle in cycles)
+
+
+class ModuleGraphTest(TestCase):
+    def test_interning(self):
+        graph = ModuleGraph()
+
+        first_id = graph.intern("package123.a")
+        second_id = graph.intern("package123.a")
+
+        self.assertEqual(first_id, second_id)
+        self.assertEqual(graph.name_of(first_id), "package123.a")
+        self.assertEqual(len(graph), 1)
+
+    def test_add_edge_reports_novelty(self):
+        graph = ModuleGraph()
+        source_id = graph.add_source("a")
+        target_id = graph.intern("b")
+
+        self.assertTrue(graph.add_edge(source_id, target_id))
+        self.assertFalse(graph.add_edge(source_id, target_id))
+        self.assertEqual(graph.edge_count(), 1)
+
+    def test_exhausted_time_budget_truncates_components(self):
+        graph = ModuleGraph.from_dict({"a": {"b"}, "b": {"a"}, "c": {"c"}})
+        budget = SearchBudget(0)
+
+        self.assertEqual(list(graph.iterate_cycles(budget=budget)), [])
+        self.assertEqual(sorted(budget.truncated_components), [["a", "b"], ["c"]])
+
+    def test_length_bound_truncates_components_without_short_cycles(self):
+        graph = ModuleGraph.from_dict({"a": {"b"}, "b": {"c"}, "c": {"a"}})
+        budget = SearchBudget()
+
+        self.assertEqual(list(graph.iterate_cycles(length_bound=2, budget=budget)), [])
+        self.assertEqual(budget.truncated_components, [["a", "b", "c"]])
+
+    def test_edges_added_after_freezing(self):
+        graph = ModuleGraph.from_dict({"a": {"b"}})
+        self.assertEqual(list(graph.iterate_cycles()), [])
+
+        graph.add_edge(graph.add_source("b"), graph.intern("a"))
+        graph.add_source("c")
+
+        self.assertEqual(_normalized(graph.iterate_cycles()), [["a", "b"]])
+        self.assertEqual(graph.to_dict(), {"a": {"b"}, "b": {"a"}, "c": set()})
+
+    def test_quotient(self):
+        graph = ModuleGraph.from_dict(
+            {
+                "one.a": {"one.b", "two.a"},
+                "one.b": {"two.b"},
+                "two.b": {"one.a"},
+            },
+        )
+
+        quotient, witnesses = graph.quotient(lambda name: name.split(".")[0])
+
+        self.assertEqual(quotient.to_dict(), {"one": {"two"}, "two": {"one"}})
+        self.assertEqual(
+            witnesses,
+            {("one", "two"): ("one.a", "two.a"), ("two", "one"): ("two.b", "one.a")},
+        )
+        self.assertEqual(_normalized(quotient.iterate_cycles()), [["one", "two"]])
+
+    def test_toplevel_packages(self):
+        graph = ModuleGraph.from_dict(
+            {
+                "one.a": {"one.b"},
+                "one.b": {"one.a"},
+                "two.a": {"two.b"},
+                "two.b": {"two.a", "one.a"},
+            },
+        )
+
+        self.assertEqual(
+            _normalized(graph.iterate_cycles({"two", "three"})),
+            [["two.a", "two.b"]],
+        )
+
+    @parameterized.expand([(seed,) for seed in range(20)])
+    def test_same_cycles_as_networkx(self, seed):
+        rng = random.Random(seed)  # noqa: S311
+        node_count = rng.randint(2, 12)
+        edge_probability = rng.uniform(0.1, 0.5)
+        edges = [
+            (f"m{source}", f"m{target}")
+            for source in range(node_count)
+            for target in range(node_count)
+            if rng.random() < edge_probability
+        ]
+        imports_from = {}
+        for source, target in edges:
+            imports_from.setdefault(source, set()).add(target)
+
+        expected = _normalized(nx.chordless_cycles(nx.DiGraph(edges)))
+        actual = _normalized(ModuleGraph.from_dict(imports_from).iterate_cycles())
+
+        self.assertEqual(actual, expected)
+
+    @parameterized.expand([(seed,) for seed in range(20)])
+    def test_shortest_cycle_per_edge(self, seed):
+        rng = random.Random(seed)  # noqa: S311
+        node_count = rng.randint(2, 12)
+        edge_probability = rng.uniform(0.1, 0.5)
+        nx_graph = nx.DiGraph()
+        nx_graph.add_edges_from(
+            (f"m{source}", f"m{target}")
+            for source in range(node_count)
+            for target in range(node_count)
+            if rng.random() < edge_probability
+        )
+        imports_from = {}
+        for source, target in nx_graph.edges:
+            imports_from.setdefault(source, set()).add(target)
+
+        cycles = list(ModuleGraph.from_dict(imports_from).iterate_shortest_cycles())
+
+        cycle_lengths_by_edge = {}
+        for cycle in cycles:
+            for source, target in zip(cycle, [*cycle[1:], cycle[0]], strict=True):
+                self.assertTrue(nx_graph.has_edge(source, target))
+                cycle_lengths_by_edge.setdefault((source, target), []).append(
+                    len(cycle),
+                )
+        expected_edges = {
+            (source, target)
+            for component in nx.strongly_connected_components(nx_graph)
+            for source, target in nx_graph.subgraph(component).edges
+        }
+        self.assertEqual(cycle_lengths_by_edge.keys(), expected_edges)
+        for (source, target), lengths in cycle_lengths_by_edge.items():
+            self.assertEqual(
+                min(lengths),
+                nx.shortest_path_length(nx_graph, target, source) + 1,
+            )
+        self.assertEqual(len(set(map(tuple, _normalized(cycles)))), len(cycles))
+
+    @parameterized.expand([(seed,) for seed in range(20)])
+    def test_rank_edges_in(self, seed):
+        rng = random.Random(seed)  # noqa: S311
+        node_count = rng.randint(2, 12)
+        edge_probability = rng.uniform(0.1, 0.5)
+        nx_graph = nx.DiGraph()
+        nx_graph.add_edges_from(
+            (f"m{source}", f"m{target}")
+            for source in range(node_count)
+            for target in range(node_count)
+            if rng.random() < edge_probability
+        )
+        imports_from = {}
+        for source, target in nx_graph.edges:
+            imports_from.setdefault(source, set()).add(target)
+        graph = ModuleGraph.from_dict(imports_from)
+
+        for component in graph.cyclic_components():
+            ranked_edges = graph.rank_edges_in(component)
+
+            subgraph = nx_graph.subgraph(graph.name_of(node) for node in component)
+            self.assertEqual(
+                {(source, target) for source, target, _, _ in ranked_edges},
+                set(subgraph.edges),
+            )
+
+            # Removing the feedback arc set breaks all cycles
+            acyclic_subgraph = nx.DiGraph(subgraph)
+            acyclic_subgraph.remove_edges_from(
+                (source, target)
+                for source, target, in_feedback_arc_set, _ in ranked_edges
+                if in_feedback_arc_set
+            )
+            self.assertTrue(nx.is_directed_acyclic_graph(acyclic_subgraph))
+
+            # With all edges sampled, scores are exact
+            expected_scores = dict.fromkeys(subgraph.edges, 0.0)
+            for source, target in subgraph.edges:
+                paths = list(nx.all_shortest_paths(subgraph, target, source))
+                for path in paths:
+                    for edge in zip(path, [*path[1:], target], strict=True):
+                        expected_scores[edge] += 1 / len(paths)
+            for source, target, _, score in ranked_edges:
+                self.assertAlmostEqual(score, expected_scores[source, target])
+
+    def test_rank_edges_in__feedback_arc_set_first(self):
+        graph = ModuleGraph.from_dict({"a": {"b"}, "b": {"a", "c"}, "c": {"a"}})
+        (component,) = graph.cyclic_components()
+
+        ranked_edges = graph.rank_edges_in(component)
+
+        self.assertEqual(
+            ranked_edges,
+            [
+                ("a", "b", True, 4.0),
+                ("b", "a", False, 2.0),
+                ("b", "c", False, 2.0),
+                ("c", "a", False, 2.0),
+            ],
+        )
@@ -3,17 +3,17 @@
 
 import os
 import pkgutil
+import sys
 from tempfile import TemporaryDirectory
 from unittest import TestCase
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 from parameterized import parameterized
 
+from .._graph import ModuleGraph
 from .._imports import (
     ImportGraph,
-    _initialize_stdlib_module_names,
-    _stdlib_module_names,
-    determine_path_of,
+    _create_process_pool,
     determine_source_module_name,
     determine_target_module_name,
     in_standard_library,
@@ -21,6 +21,7 @@ from .._imports import (
     without_dot_init,
 )
 from .._normalization import shortest_first_rotated
+from .._resolution import ModuleResolver
 from .factories import add_cyclic_import_to
 
 
@@ -29,14 +30,6 @@ class ToplevelPackageOfTest(TestCase):
         self.assertEqual(toplevel_package_of("one.two.three"), "one")
 
 
-class InitializeStdlibModuleNamesTest(TestCase):
-    def test(self):
-        _stdlib_module_names.clear()
-        self.assertNotIn("cStringIO", _stdlib_module_names)
-        _initialize_stdlib_module_names()
-        self.assertIn("cStringIO", _stdlib_module_names)
-
-
 class InStandardLibraryTest(TestCase):
     @parameterized.expand(
         [
@@ -58,7 +51,7 @@ class DeterminePathOfTest(TestCase):
         ],
     )
     def test(self, module_name, expected_path):
-        actual_path = determine_path_of(module_name)
+        actual_path = ModuleResolver().determine_path_of(module_name)
         self.assertEqual(actual_path, expected_path)
 
 
@@ -155,11 +148,13 @@ class ImportGraphTest(TestCase):
         )
         self.assertEqual(imports._tried_to_follow, set())
         self.assertEqual(
-            imports._imports_from,
+            imports._graph.to_dict(),
             {
                 "no_cyclic_imports.tests.test_imports": {
+                    "no_cyclic_imports._graph",
                     "no_cyclic_imports._imports",
                     "no_cyclic_imports._normalization",
+                    "no_cyclic_imports._resolution",
                     "no_cyclic_imports.tests.factories",
                     "parameterized",
                 },
@@ -174,50 +169,130 @@ class ImportGraphTest(TestCase):
         self.assertIn(__file__, imports._seen_files)
         self.assertIn("no_cyclic_imports._imports", imports._tried_to_follow)
         self.assertEqual(
-            imports._imports_from["no_cyclic_imports.tests.test_imports"],
+            imports._graph.to_dict()["no_cyclic_imports.tests.test_imports"],
             {
+                "no_cyclic_imports._graph",
                 "no_cyclic_imports._imports",
                 "no_cyclic_imports._normalization",
+                "no_cyclic_imports._resolution",
                 "no_cyclic_imports.tests.factories",
                 "parameterized",
             },
         )
         self.assertEqual(
-            imports._imports_from["no_cyclic_imports._imports"],
+            imports._graph.to_dict()["no_cyclic_imports._imports"],
             {
-                "import_deps",
-                "networkx",
-                "stdlib_list.base",
+                "no_cyclic_imports._cache",
+                "no_cyclic_imports._follow_scope",
+                "no_cyclic_imports._graph",
+                "no_cyclic_imports._resolution",
+                "no_cyclic_imports._scanner",
+                "no_cyclic_imports._source_roots",
+                "no_cyclic_imports._stats",
+                "no_cyclic_imports._stdlib",
             },
         )
 
-    def test_add_module__follow_false(self):
+    @parameterized.expand(
+        [
+            ("serial", 1),
+            ("parallel", 2),
+        ],
+    )
+    def test_add_files__same_as_add_file(self, _label, jobs):
+        expected_imports = ImportGraph()
+        expected_imports.add_file(__file__, follow=True)
+        actual_imports = ImportGraph(jobs=jobs)
+
+        with patch("no_cyclic_imports._imports._MIN_FILES_FOR_PROCESS_POOL", 1):
+            actual_imports.add_files([__file__], follow=True)
+
+        self.assertEqual(actual_imports._seen_files, expected_imports._seen_files)
+        self.assertEqual(
+            actual_imports._graph.to_dict(),
+            expected_imports._graph.to_dict(),
+        )
+        self.assertIsNone(actual_imports._executor)
+
+    @parameterized.expand(
+        [
+            ("serial", 1),
+            ("parallel", 2),
+        ],
+    )
+    def test_add_files__vanished_file(self, _label, jobs):
+        with TemporaryDirectory() as tempdir:
+            init_py, a_py, b_py, *_ = add_cyclic_import_to(tempdir)
+            os.remove(b_py)
+            imports = ImportGraph(jobs=jobs)
+
+            with patch("no_cyclic_imports._imports._MIN_FILES_FOR_PROCESS_POOL", 1):
+                imports.add_files([init_py, a_py, b_py], follow=False)
+
+        self.assertEqual(imports._seen_files, {init_py, a_py})
+        self.assertEqual(set(imports.targets_of_file()), {init_py, a_py})
+
+    def test_process_pool_is_not_forked(self):
+        # Forking would be unsafe with the threads of a directory walk running
+        executor = _create_process_pool(1)
+        self.addCleanup(executor.shutdown)
+
+        self.assertNotEqual(executor._mp_context.get_start_method(), "fork")
+
+    @parameterized.expand(
+        [
+            ("depth 0", 0, {"a.py"}),
+            ("depth 1", 1, {"a.py", "b.py"}),
+            ("depth 2", 2, {"a.py", "b.py", "__init__.py"}),
+        ],
+    )
+    def test_add_files__follow_depth(self, _label, follow_depth, expected_basenames):
+        with TemporaryDirectory() as tempdir:
+            _, a_py, *_ = add_cyclic_import_to(tempdir)
+            imports = ImportGraph(resolver=ModuleResolver([tempdir]))
+
+            imports.add_files([a_py], follow=True, follow_depth=follow_depth)
+
+        self.assertEqual(
+            {os.path.basename(abs_path) for abs_path in imports._seen_files},
+            expected_basenames,
+        )
+
+    def test_add_file__follow_long_chain_without_recursion(self):
+        chain_length = sys.getrecursionlimit() + 100
+        with TemporaryDirectory() as tempdir:
+            for i in range(chain_length):
+                with open(os.path.join(tempdir, f"chain{i}.py"), "w") as f:
+                    print(f"import chain{i + 1}", file=f)
+            imports = ImportGraph(resolver=ModuleResolver([tempdir]))
+
+            imports.add_file(os.path.join(tempdir, "chain0.py"), follow=True)
+
+        self.assertEqual(len(imports._seen_files), chain_length)
+
+    def test_add_files__follow_false(self):
         imports = ImportGraph()
-        module_name = determine_source_module_name(__file__)
-        imports.add_file = Mock(side_effect=imports.add_file)
+        imports._resolve_many = Mock(side_effect=imports._resolve_many)
 
-        imports._add_module(module_name, follow=False)
+        imports.add_files([__file__], follow=False)
 
-        self.assertEqual(imports.add_file.call_count, 1)
+        self.assertEqual(imports._resolve_many.call_count, 0)
         self.assertEqual(
             imports._seen_files,
             {
                 __file__,
             },
         )
-        self.assertEqual(
-            imports._tried_to_follow,
-            {
-                "no_cyclic_imports.tests.test_imports",
-            },
-        )
+        self.assertEqual(imports._tried_to_follow, set())
 
         self.assertEqual(
-            imports._imports_from,
+            imports._graph.to_dict(),
             {
                 "no_cyclic_imports.tests.test_imports": {
+                    "no_cyclic_imports._graph",
                     "no_cyclic_imports._imports",
                     "no_cyclic_imports._normalization",
+                    "no_cyclic_imports._resolution",
                     "no_cyclic_imports.tests.factories",
                     "parameterized",
                 },
@@ -241,3 +316,75 @@ class ImportGraphTest(TestCase):
         ]
 
         self.assertEqual(actual_cycles, expected_cycles)
+
+    @parameterized.expand(
+        [
+            ("package", None, {"p": {"p.sub"}, "p.sub": {"p"}}),
+            ("depth", 1, {"p": set()}),
+            ("toplevel", None, {"p": set()}),
+        ],
+    )
+    def test_condensed(self, granularity, depth, expected_graph):
+        files = {
+            "p/__init__.py": "",
+            "p/a.py": "import p.sub.b\n",
+            "p/sub/__init__.py": "",
+            "p/sub/b.py": "import p.c\n",
+            "p/c.py": "",
+        }
+        imports = ImportGraph()
+
+        with TemporaryDirectory() as tempdir:
+            for relative_path, content in files.items():
+                path = os.path.join(tempdir, relative_path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w") as f:
+                    f.write(content)
+            imports.add_files(
+                [os.path.join(tempdir, relative_path) for relative_path in files],
+                follow=False,
+            )
+
+        quotient, witnesses = imports.condensed(
+            "toplevel" if granularity == "toplevel" else "package",
+            depth,
+        )
+
+        self.assertEqual(quotient.to_dict(), expected_graph)
+        if granularity == "package":
+            self.assertEqual(
+                witnesses,
+                {
+                    ("p", "p.sub"): ("p.a", "p.sub.b"),
+                    ("p.sub", "p"): ("p.sub.b", "p.c"),
+                },
+            )
+
+    @parameterized.expand(
+        [
+            ("no filter", None, [["a", "b"], ["c"]]),
+            ("filter", {"c"}, [["c"]]),
+        ],
+    )
+    def test_iterate_cycles__strongly_connected_components(
+        self,
+        _label,
+        toplevel_packages,
+        expected_cycles,
+    ):
+        imports = ImportGraph()
+        imports._graph = ModuleGraph.from_dict(
+            {
+                "a": {"b", "d"},
+                "b": {"a"},
+                "c": {"c", "d"},
+                "d": {"e"},
+            },
+        )
+
+        actual_cycles = sorted(
+            shortest_first_rotated(cycle)
+            for cycle in imports.iterate_cycles(toplevel_packages)
+        )
+
+        self.assertEqual(actual_cycles, expected_cycles)
@@ -17,6 +17,14 @@ from .factories import add_cyclic_import_to
 
 
 class MainTest(TestCase):
+    def setUp(self):
+        # Keep the import cache of the user running the tests out of reach
+        cache_home = TemporaryDirectory()
+        self.addCleanup(cache_home.cleanup)
+        environ_patch = patch.dict(os.environ, {"XDG_CACHE_HOME": cache_home.name})
+        environ_patch.start()
+        self.addCleanup(environ_patch.stop)
+
     def _invoke(self, *argv_one_plus: list[str]) -> tuple[int, str, str]:
         with (
             patch("sys.stdout", new_callable=StringIO) as stdout,
@@ -35,6 +43,34 @@ class MainTest(TestCase):
     def test_version(self):
         self.assertEqual(self._invoke("--version"), (0, f"{VERSION}\n", ""))
 
+    @parameterized.expand(
+        [
+            ("cache max size", ["--cache-max-size", "-1"], "is negative"),
+            ("jobs", ["--jobs", "0"], "is not positive"),
+            (
+                "package depth without package granularity",
+                ["--package-depth", "2"],
+                "argument --package-depth: only allowed with --granularity package",
+            ),
+            (
+                "follow package without first-party follow scope",
+                ["--follow-package", "foo"],
+                "--follow-package: only allowed with --follow-scope first-party",
+            ),
+            (
+                "max edges without rank edges",
+                ["--max-edges", "3"],
+                "argument --max-edges: only allowed with --rank-edges",
+            ),
+        ],
+    )
+    def test_invalid_argument(self, _label, argv, expected_error):
+        exit_code, stdout, stderr = self._invoke(*argv)
+
+        self.assertEqual(exit_code, 2)
+        self.assertEqual(stdout, "")
+        self.assertIn(expected_error, stderr)
+
     def test_help(self):
         exit_code, stdout, stderr = self._invoke("--help")
 
@@ -123,3 +159,395 @@ class MainTest(TestCase):
             self.assertEqual(stdout, "0 cycle(s).\n")
 
         self.assertEqual("/coverage/" in stderr, expecting_follow)
+
+    def test_follow_scope__first_party(self):
+        with TemporaryDirectory() as tempdir:
+            _, a_py, _, package_name, package_a_name, package_b_name = (
+                add_cyclic_import_to(tempdir)
+            )
+            with patch("sys.path", [*sys.path, tempdir]):
+                exit_code, stdout, stderr = self._invoke(
+                    "--verbose",
+                    "--no-cache",
+                    "--follow-scope",
+                    "first-party",
+                    a_py,
+                )
+
+        self.assertEqual(exit_code, 2)
+        self.assertEqual(
+            stdout,
+            f"{package_name} -> {package_a_name} -> {package_b_name}"
+            f" -> {package_name}\n\n1 cycle(s).\n",
+        )
+        self.assertNotIn("/coverage/", stderr)
+
+    def test_cache_dir__warm_run_same_output(self):
+        with TemporaryDirectory() as tempdir:
+            cache_dir = os.path.join(tempdir, "cache")
+            project_dir = os.path.join(tempdir, "project")
+            os.mkdir(project_dir)
+            add_cyclic_import_to(project_dir)
+            argv = ["--no-follow", "--cache-dir", cache_dir, project_dir]
+
+            cold = self._invoke(*argv)
+            warm = self._invoke(*argv)
+
+            self.assertTrue(os.listdir(cache_dir))
+
+        self.assertEqual(cold[:2], warm[:2])
+        self.assertEqual(cold[0], 2)
+
+    def test_jobs__same_output_as_serial(self):
+        with TemporaryDirectory() as tempdir:
+            add_cyclic_import_to(tempdir)
+            serial = self._invoke("--no-cache", "--no-follow", "--jobs", "1", tempdir)
+            with patch("no_cyclic_imports._imports._MIN_FILES_FOR_PROCESS_POOL", 1):
+                parallel = self._invoke(
+                    "--no-cache",
+                    "--no-follow",
+                    "--jobs",
+                    "2",
+                    tempdir,
+                )
+
+        self.assertEqual(parallel[:2], serial[:2])
+        self.assertEqual(parallel[0], 2)
+
+    def test_source_root(self):
+        with TemporaryDirectory() as tempdir:
+            add_cyclic_import_to(tempdir)
+            package_dir = os.path.join(tempdir, "package123")
+            exit_code, stdout, _ = self._invoke(
+                "--no-cache",
+                "--no-follow",
+                "--source-root",
+                f"{package_dir}=renamed123",
+                tempdir,
+            )
+
+        self.assertEqual(exit_code, 2)
+        self.assertEqual(
+            stdout,
+            "renamed123 -> renamed123.a -> renamed123.b -> renamed123\n\n1 cycle(s).\n",
+        )
+
+    def test_exclude(self):
+        with TemporaryDirectory() as tempdir:
+            add_cyclic_import_to(tempdir, "package456")
+            add_cyclic_import_to(tempdir)
+            exit_code, stdout, _ = self._invoke(
+                "--no-cache",
+                "--no-follow",
+                "--exclude",
+                "package456",
+                tempdir,
+            )
+
+        self.assertEqual(exit_code, 2)
+        self.assertNotIn("package456", stdout)
+        self.assertTrue(stdout.endswith("\n1 cycle(s).\n"))
+
+    def test_multi_root(self):
+        with TemporaryDirectory() as tempdir:
+            project_dirs = [os.path.join(tempdir, name) for name in ("one", "two")]
+            for project_dir in project_dirs:
+                os.mkdir(project_dir)
+            add_cyclic_import_to(project_dirs[0])
+            exit_code, stdout, _ = self._invoke(
+                "--no-cache",
+                "--no-follow",
+                "--multi-root",
+                *project_dirs,
+            )
+
+        self.assertEqual(exit_code, 2)
+        self.assertTrue(stdout.startswith("[one]\n"))
+        self.assertTrue(stdout.endswith("\n\n1 cycle(s).\n\n[two]\n0 cycle(s).\n\n"))
+
+    @parameterized.expand(
+        [
+            ("stream", ["--stream"], "--stream"),
+            ("granularity", ["--granularity", "toplevel"], "--granularity"),
+            ("two options", ["--rank-edges", "--max-cycles", "1"], "--max-cycles"),
+        ],
+    )
+    def test_multi_root__unsupported_options(self, _label, extra_argv, option):
+        with TemporaryDirectory() as tempdir:
+            exit_code, stdout, stderr = self._invoke(
+                "--no-cache",
+                "--multi-root",
+                *(*extra_argv, tempdir),
+            )
+
+        self.assertEqual(exit_code, 2)
+        self.assertEqual(stdout, "")
+        self.assertIn(f"argument --multi-root: not allowed with {option}", stderr)
+
+    @parameterized.expand(
+        [
+            ("changed only", ["--changed-only", "--multi-root"], "--changed-only"),
+            ("since", ["--since", "HEAD", "--watch", "socket"], "--since"),
+            (
+                "two options",
+                ["--changed-only", "--mode", "shortest", "--rank-edges"],
+                "--changed-only",
+            ),
+        ],
+    )
+    def test_changed_only__unsupported_options(self, _label, argv, option):
+        exit_code, stdout, stderr = self._invoke("--no-cache", *argv)
+
+        self.assertEqual(exit_code, 2)
+        self.assertEqual(stdout, "")
+        self.assertIn(f"argument {option}: not allowed with ", stderr)
+
+    @parameterized.expand(
+        [
+            ("multi root", ["--multi-root"], "--multi-root"),
+            ("mode", ["--mode", "shortest"], "--mode"),
+            ("follow depth", ["--follow-depth", "1"], "--follow-depth"),
+            ("two options", ["--stream", "--granularity", "package"], "--stream"),
+        ],
+    )
+    def test_watch__unsupported_options(self, _label, extra_argv, option):
+        with TemporaryDirectory() as tempdir:
+            exit_code, stdout, stderr = self._invoke(
+                "--no-cache",
+                "--watch",
+                os.path.join(tempdir, "socket"),
+                *(*extra_argv, tempdir),
+            )
+
+        self.assertEqual(exit_code, 2)
+        self.assertEqual(stdout, "")
+        self.assertIn(f"argument --watch: not allowed with {option}", stderr)
+
+    @parameterized.expand(
+        [
+            ("module", [], "0 cycle(s).\n"),
+            (
+                "toplevel",
+                ["--granularity", "toplevel"],
+                (
+                    "one -> two -> one\n"
+                    "  one.a -> two.b\n"
+                    "  two.c -> one.d\n"
+                    "\n"
+                    "1 cycle(s).\n"
+                ),
+            ),
+        ],
+    )
+    def test_granularity(self, _label, extra_argv, expected_stdout):
+        files = {
+            "one/__init__.py": "",
+            "one/a.py": "import two.b\n",
+            "one/d.py": "",
+            "two/__init__.py": "",
+            "two/b.py": "",
+            "two/c.py": "import one.d\n",
+        }
+        with TemporaryDirectory() as tempdir:
+            for relative_path, content in files.items():
+                path = os.path.join(tempdir, relative_path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w") as f:
+                    f.write(content)
+            _, stdout, _ = self._invoke(
+                "--no-cache",
+                "--no-follow",
+                *extra_argv,
+                tempdir,
+            )
+
+        self.assertEqual(stdout, expected_stdout)
+
+    def test_rank_edges(self):
+        files = {
+            "p/__init__.py": "",
+            "p/a.py": "import p.b\n",
+            "p/b.py": "import p.a\nimport p.c\n",
+            "p/c.py": "import p.a\n",
+        }
+        with TemporaryDirectory() as unresolved_tempdir:
+            tempdir = os.path.realpath(unresolved_tempdir)
+            for relative_path, content in files.items():
+                path = os.path.join(tempdir, relative_path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w") as f:
+                    f.write(content)
+            exit_code, stdout, _ = self._invoke(
+                "--no-cache",
+                "--no-follow",
+                "--rank-edges",
+                "--max-edges",
+                "2",
+                tempdir,
+            )
+
+        self.assertEqual(exit_code, 2)
+        self.assertEqual(
+            stdout,
+            "[3 module(s), 4 import(s), 1 in feedback arc set]\n"
+            f"p.a -> p.b  [score 4.0, feedback arc]  {tempdir}/p/a.py\n"
+            f"p.b -> p.a  [score 2.0]  {tempdir}/p/b.py\n"
+            "... (2 more)\n"
+            "\n"
+            "1 cyclic component(s).\n",
+        )
+
+    def test_stream__same_cycles_as_sorted(self):
+        with TemporaryDirectory() as tempdir:
+            add_cyclic_import_to(tempdir, "package456")
+            add_cyclic_import_to(tempdir)
+            sorted_ = self._invoke("--no-cache", "--no-follow", tempdir)
+            streamed = self._invoke("--no-cache", "--no-follow", "--stream", tempdir)
+
+        self.assertEqual(streamed[0], 2)
+        self.assertEqual(
+            sorted(streamed[1].splitlines()),
+            sorted(sorted_[1].splitlines()),
+        )
+        self.assertTrue(streamed[1].endswith("\n\n2 cycle(s).\n"))
+
+    @parameterized.expand(
+        [
+            ("sorted", []),
+            ("stream", ["--stream"]),
+        ],
+    )
+    def test_max_cycles(self, _label, extra_argv):
+        with TemporaryDirectory() as tempdir:
+            add_cyclic_import_to(tempdir, "package456")
+            add_cyclic_import_to(tempdir)
+            exit_code, stdout, stderr = self._invoke(
+                "--no-cache",
+                "--no-follow",
+                "--max-cycles",
+                "1",
+                *(*extra_argv, tempdir),
+            )
+
+        self.assertEqual(exit_code, 2)
+        self.assertTrue(stdout.endswith("\n\n1 cycle(s).\n"))
+        self.assertEqual(len(stdout.splitlines()), 3)
+        self.assertIn("Stopped after 1 cycle(s)", stderr)
+
+    @parameterized.expand(
+        [
+            ("max cycle length", ["--max-cycle-length", "2"]),
+            ("time budget", ["--time-budget", "0"]),
+        ],
+    )
+    def test_partial_result(self, _label, extra_argv):
+        with TemporaryDirectory() as tempdir:
+            add_cyclic_import_to(tempdir)
+            exit_code, stdout, _ = self._invoke(
+                "--no-cache",
+                "--no-follow",
+                *(*extra_argv, tempdir),
+            )
+
+        self.assertEqual(exit_code, 2)
+        self.assertEqual(
+            stdout,
+            dedent("""\
+                0 cycle(s).
+                Partial result, cycle search was cut short in 1 strongly connected component(s):
+                  package123, package123.a, package123.b
+            """),  # noqa: E501
+        )
+
+    def test_mode_shortest(self):
+        with TemporaryDirectory() as tempdir:
+            add_cyclic_import_to(tempdir)
+            all_ = self._invoke("--no-cache", "--no-follow", tempdir)
+            shortest = self._invoke(
+                "--no-cache",
+                "--no-follow",
+                "--mode",
+                "shortest",
+                tempdir,
+            )
+
+        self.assertEqual(shortest, all_)
+
+    def test_save_and_load_graph__same_output(self):
+        with TemporaryDirectory() as tempdir:
+            project_dir = os.path.join(tempdir, "project")
+            os.mkdir(project_dir)
+            add_cyclic_import_to(project_dir)
+            snapshot_path = os.path.join(tempdir, "graph.bin")
+            saved = self._invoke(
+                "--no-cache",
+                "--no-follow",
+                "--save-graph",
+                snapshot_path,
+                project_dir,
+            )
+            other_snapshot_path = os.path.join(tempdir, "other.bin")
+            loaded = self._invoke(
+                "--no-cache",
+                "--load-graph",
+                snapshot_path,
+                "--save-graph",
+                other_snapshot_path,
+            )
+            reloaded = self._invoke("--no-cache", "--load-graph", other_snapshot_path)
+
+        self.assertEqual(saved[0], 2)
+        self.assertEqual(loaded, saved)
+        self.assertEqual(reloaded, saved)
+
+    def test_stats_and_profile(self):
+        with TemporaryDirectory() as tempdir:
+            add_cyclic_import_to(tempdir)
+            profile_path = os.path.join(tempdir, "profile.out")
+            exit_code, stdout, stderr = self._invoke(
+                "--no-cache",
+                "--no-follow",
+                "--stats",
+                "--profile",
+                profile_path,
+                tempdir,
+            )
+
+            self.assertGreater(os.path.getsize(profile_path), 0)
+
+        self.assertEqual(exit_code, 2)
+        self.assertTrue(stdout.endswith("\n1 cycle(s).\n"))
+        for expected_line_start in ("walk ", "parse ", "cycles ", "files parsed "):
+            with self.subTest(expected_line_start=expected_line_start):
+                self.assertIn(f"\n{expected_line_start}", stderr)
+
+    @parameterized.expand(
+        [
+            ("cycles", [], True),
+            ("toplevel cycles", ["--granularity", "toplevel"], True),
+            ("ranked edges", ["--rank-edges"], False),
+        ],
+    )
+    def test_stats_counters(self, _label, extra_argv, expecting_cycles_counter):
+        with TemporaryDirectory() as tempdir:
+            for package_name, other_package_name in (("foo", "bar"), ("bar", "foo")):
+                os.mkdir(os.path.join(tempdir, package_name))
+                with open(os.path.join(tempdir, package_name, "__init__.py"), "w") as f:
+                    print(f"import {other_package_name}", file=f)
+            exit_code, _, stderr = self._invoke(
+                "--no-cache",
+                "--no-follow",
+                "--stats",
+                *(*extra_argv, tempdir),
+            )
+
+        counters = {
+            name.strip(): int(value)
+            for name, _, value in (line.rpartition(" ") for line in stderr.splitlines())
+            if value.isdigit()
+        }
+        self.assertEqual(exit_code, 2)
+        self.assertEqual(counters["cyclic components"], 1)
+        self.assertGreater(counters["stat calls"], 0)
+        self.assertGreater(counters["nodes"], 0)
+        self.assertEqual("cycles" in counters, expecting_cycles_counter)
@@ -0,0 +1,101 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import json
+import os
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from .. import _imports
+from .._multi_root import run_multi_root
+from .factories import add_cyclic_import_to, write_file
+
+
+class RunMultiRootTest(TestCase):
+    def setUp(self):
+        tempdir = TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self._tempdir = tempdir.name
+        self._project_dirs = [
+            os.path.join(self._tempdir, name) for name in ("alpha", "beta", "gamma")
+        ]
+        alpha_dir, beta_dir, gamma_dir = self._project_dirs
+
+        # A cycle within project alpha
+        os.mkdir(alpha_dir)
+        add_cyclic_import_to(alpha_dir)
+
+        # A cycle across projects alpha and beta
+        write_file(os.path.join(alpha_dir, "apple", "__init__.py"), "import banana\n")
+        write_file(os.path.join(beta_dir, "banana", "__init__.py"), "import apple\n")
+
+        # No cycles in project gamma
+        write_file(os.path.join(gamma_dir, "cherry", "__init__.py"), "import banana\n")
+
+    def _run(self, **kwargs) -> tuple[int, str]:
+        output = StringIO()
+        projects_with_cycles = run_multi_root(
+            self._project_dirs,
+            follow=False,
+            file_=output,
+            **kwargs,
+        )
+        return projects_with_cycles, output.getvalue()
+
+    def test_cycles_are_reported_per_project(self):
+        projects_with_cycles, output = self._run()
+
+        self.assertEqual(projects_with_cycles, 2)
+        self.assertEqual(
+            output,
+            "[alpha]\n"
+            "apple -> banana -> apple\n"
+            "package123 -> package123.a -> package123.b -> package123\n"
+            "\n"
+            "2 cycle(s).\n"
+            "\n"
+            "[beta]\n"
+            "apple -> banana -> apple\n"
+            "\n"
+            "1 cycle(s).\n"
+            "\n"
+            "[gamma]\n"
+            "0 cycle(s).\n"
+            "\n",
+        )
+
+    def test_each_file_is_parsed_once(self):
+        with patch.object(
+            _imports,
+            "_analyze_file",
+            wraps=_imports._analyze_file,
+        ) as analyze_file:
+            self._run()
+
+        analyzed_paths = [call.args[0] for call in analyze_file.call_args_list]
+        self.assertEqual(len(analyzed_paths), 6)
+        self.assertEqual(len(set(analyzed_paths)), 6)
+
+    def test_report_dir(self):
+        report_dir = os.path.join(self._tempdir, "reports")
+
+        projects_with_cycles, output = self._run(report_dir=report_dir)
+
+        self.assertEqual(projects_with_cycles, 2)
+        self.assertEqual(
+            output,
+            "alpha: 2 cycle(s).\nbeta: 1 cycle(s).\ngamma: 0 cycle(s).\n",
+        )
+        with open(os.path.join(report_dir, "summary.json")) as f:
+            summary = json.load(f)
+        self.assertEqual(
+            [
+                (project["name"], project["exit_code"])
+                for project in summary["projects"]
+            ],
+            [("alpha", 2), ("beta", 2), ("gamma", 0)],
+        )
+        with open(os.path.join(report_dir, "gamma.txt")) as f:
+            self.assertEqual(f.read(), "0 cycle(s).\n")
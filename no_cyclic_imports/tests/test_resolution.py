@@ -0,0 +1,67 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from .._resolution import ModuleResolver, PythonSourceNotFoundError
+from .factories import add_cyclic_import_to
+
+
+class ModuleResolverTest(TestCase):
+    def setUp(self):
+        tempdir = TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self._empty_dir = os.path.join(tempdir.name, "empty")
+        self._project_dir = os.path.join(tempdir.name, "project")
+        os.mkdir(self._empty_dir)
+        os.mkdir(self._project_dir)
+        self._init_py, self._a_py, *_ = add_cyclic_import_to(self._project_dir)
+        self._resolver = ModuleResolver([self._empty_dir, self._project_dir])
+
+    @parameterized.expand(
+        [
+            ("module", "package123.a", "_a_py"),
+            ("package", "package123", "_init_py"),
+        ],
+    )
+    def test_found(self, _label, module_name, expected_path_attribute):
+        actual_path = self._resolver.determine_path_of(module_name)
+        self.assertEqual(actual_path, getattr(self, expected_path_attribute))
+
+    @parameterized.expand(
+        [
+            ("toplevel missing", "missing123", ["missing123"]),
+            (
+                "parent missing",
+                "missing123.a.b",
+                ["missing123.a.b", "missing123.a", "missing123"],
+            ),
+            (
+                "parent found",
+                "package123.missing123",
+                ["package123.missing123", "package123"],
+            ),
+        ],
+    )
+    def test_not_found(self, _label, module_name, expected_breadcrumbs):
+        with self.assertRaises(PythonSourceNotFoundError) as catcher:
+            self._resolver.determine_path_of(module_name)
+
+        self.assertEqual(catcher.exception.module_names, expected_breadcrumbs)
+
+    def test_lookups_are_answered_from_memory(self):
+        self._resolver.determine_path_of("package123.a")
+        scandir_calls_before = self._resolver.scandir_calls
+
+        self._resolver.determine_path_of("package123.b")
+        self._resolver.determine_path_of("package123.a")
+        for _ in range(2):
+            with self.assertRaises(PythonSourceNotFoundError):
+                self._resolver.determine_path_of("missing123")
+
+        self.assertEqual(self._resolver.scandir_calls, scandir_calls_before)
+        self.assertGreater(self._resolver.filesystem_calls_saved, 0)
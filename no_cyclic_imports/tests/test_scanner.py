@@ -0,0 +1,108 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import os
+from tempfile import TemporaryDirectory
+from textwrap import dedent
+from unittest import TestCase
+
+from import_deps import ast_imports
+from parameterized import parameterized
+
+from .._scanner import scan_file, scan_imports
+
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_TRICKY_SOURCE = dedent('''\
+    #!/usr/bin/env python3
+    """
+    import not_imported_docstring
+    """
+    from __future__ import annotations
+
+    import a, b.c as d ; import e
+    from . import f
+    from .. g import (  # comment (with parentheses)
+        h as i,
+        j,  # import not_imported_comment
+    )
+    from .k import *
+    from \\
+        l import m
+    import n, \\
+        o
+
+    if TYPE_CHECKING: import p
+    try:
+        import q
+    except ImportError:
+        q = None
+
+    x = "import not_imported_string"; from r import s
+    y = f"{'import not_imported_fstring'}"
+    z = r"\\\\" + 'from not_imported import raw_string'
+
+
+    def function():
+        yield from generator()
+        import t
+
+
+    class Class: import u
+    important = from_ = 1  # import not_imported_comment
+''')
+
+
+class ScanImportsTest(TestCase):
+    @parameterized.expand(
+        [
+            ("plain", b"import a.b", [(None, "a.b", None, None)]),
+            ("as", b"import a as b", [(None, "a", "b", None)]),
+            ("absolute from", b"from a import b", [("a", "b", None, 0)]),
+            ("relative from", b"from . import b", [(None, "b", None, 1)]),
+            ("relative from module", b"from ..a import b", [("a", "b", None, 2)]),
+            ("star", b"from a import *", [("a", "*", None, 0)]),
+            ("no import token", b"x = 1\n", []),
+            ("not at statement start", b"x = yield from y\nprint(import_)\n", []),
+        ],
+    )
+    def test(self, _label, source, expected_imports):
+        self.assertEqual(scan_imports(source), expected_imports)
+
+    def test_tricky_source__same_as_ast(self):
+        with TemporaryDirectory() as tempdir:
+            py_path = os.path.join(tempdir, "tricky.py")
+            with open(py_path, "w") as f:
+                f.write(_TRICKY_SOURCE)
+
+            self.assertEqual(scan_file(py_path), ast_imports(py_path))
+
+    def test_own_codebase__same_as_ast(self):
+        for root, _dirs, files in os.walk(_PACKAGE_DIR):
+            for filename in files:
+                if not filename.endswith(".py"):
+                    continue
+                py_path = os.path.join(root, filename)
+                with self.subTest(py_path=py_path):
+                    self.assertEqual(scan_file(py_path), ast_imports(py_path))
+
+    @parameterized.expand(
+        [
+            ("utf-8 bom", b"\xef\xbb\xbfimport caf\xc3\xa9\n"),
+            ("latin-1 cookie", b"# -*- coding: latin-1 -*-\nimport caf\xe9\n"),
+            (
+                "cookie on line 2",
+                b"#!/usr/bin/python\n# coding=cp1252\nimport caf\xe9\n",
+            ),
+        ],
+    )
+    def test_encoding(self, _label, source):
+        self.assertEqual(scan_imports(source), [(None, "café", None, None)])
+
+    def test_cookie_after_code_is_ignored(self):
+        with self.assertRaises(UnicodeDecodeError):
+            scan_imports(b"x = 1\n# coding: latin-1\nimport caf\xe9\n")
+
+    def test_unknown_encoding(self):
+        with self.assertRaises(LookupError):
+            scan_imports(b"# coding: no-such-encoding\nimport a\n")
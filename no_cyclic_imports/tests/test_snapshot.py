@@ -0,0 +1,178 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import os
+import struct
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from parameterized import parameterized
+
+from .. import _imports
+from .._imports import ImportGraph
+from .._snapshot import (
+    _HEADER,
+    SnapshotError,
+    load_snapshot,
+    save_snapshot,
+    stale_files,
+)
+from .factories import add_cyclic_import_to
+
+
+class SnapshotTest(TestCase):
+    def setUp(self):
+        tempdir = TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self._tempdir = tempdir.name
+        self._snapshot_path = os.path.join(self._tempdir, "graph.bin")
+
+    def test_round_trip(self):
+        init_py, a_py, b_py, *_ = add_cyclic_import_to(self._tempdir)
+        imports = ImportGraph(record_fingerprints=True)
+        imports.add_files([init_py, a_py, b_py], follow=False)
+        save_snapshot(self._snapshot_path, imports, ["package123"])
+
+        loaded = ImportGraph()
+        toplevel_packages, fingerprints = load_snapshot(self._snapshot_path, loaded)
+
+        self.assertEqual(toplevel_packages, ["package123"])
+        self.assertEqual(
+            loaded.module_graph().to_dict(),
+            imports.module_graph().to_dict(),
+        )
+        self.assertEqual(
+            sorted(loaded.file_records()),
+            sorted(imports.file_records()),
+        )
+        self.assertEqual(
+            list(loaded.iterate_cycles(toplevel_packages)),
+            list(imports.iterate_cycles(toplevel_packages)),
+        )
+        self.assertEqual(set(fingerprints), {init_py, a_py, b_py})
+        self.assertEqual(stale_files(fingerprints), [])
+
+        with open(a_py, "a") as f:
+            f.write("# modified\n")
+        os.remove(b_py)
+
+        self.assertEqual(sorted(stale_files(fingerprints)), sorted([a_py, b_py]))
+
+    def test_fingerprints_are_taken_before_parsing(self):
+        _, a_py, *_ = add_cyclic_import_to(self._tempdir)
+        imports = ImportGraph(record_fingerprints=True)
+
+        def modify_then_scan(abs_path):
+            with open(abs_path, "a") as f:
+                f.write("# modified while parsing\n")
+            return scan_file(abs_path)
+
+        scan_file = _imports.scan_file
+        with patch.object(_imports, "scan_file", side_effect=modify_then_scan):
+            imports.add_files([a_py], follow=False)
+        save_snapshot(self._snapshot_path, imports, ["package123"])
+
+        _, fingerprints = load_snapshot(self._snapshot_path, ImportGraph())
+
+        self.assertEqual(stale_files(fingerprints), [a_py])
+
+    def test_resaving_keeps_fingerprints(self):
+        init_py, a_py, b_py, *_ = add_cyclic_import_to(self._tempdir)
+        imports = ImportGraph(record_fingerprints=True)
+        imports.add_files([init_py, a_py, b_py], follow=False)
+        save_snapshot(self._snapshot_path, imports, ["package123"])
+        with open(a_py, "a") as f:
+            f.write("# modified\n")
+        other_snapshot_path = os.path.join(self._tempdir, "other.bin")
+
+        loaded = ImportGraph(record_fingerprints=True)
+        load_snapshot(self._snapshot_path, loaded)
+        save_snapshot(other_snapshot_path, loaded, ["package123"])
+        _, fingerprints = load_snapshot(other_snapshot_path, ImportGraph())
+
+        self.assertEqual(stale_files(fingerprints), [a_py])
+
+    @parameterized.expand(
+        [
+            ("empty", b"", "file is empty"),
+            ("too short", b"NCIGRAPH", "file is too short"),
+            ("magic number", b"\0" * 100, "magic number mismatch"),
+        ],
+    )
+    def test_broken_snapshot(self, _label, content, expected_reason):
+        with open(self._snapshot_path, "wb") as f:
+            f.write(content)
+
+        with self.assertRaises(SnapshotError) as catcher:
+            load_snapshot(self._snapshot_path, ImportGraph())
+
+        self.assertEqual(catcher.exception.reason, expected_reason)
+
+    def test_truncated_snapshot(self):
+        add_cyclic_import_to(self._tempdir)
+        imports = ImportGraph(record_fingerprints=True)
+        imports.add_files(
+            [os.path.join(self._tempdir, "package123", "a.py")],
+            follow=False,
+        )
+        save_snapshot(self._snapshot_path, imports, ["package123"])
+        os.truncate(self._snapshot_path, os.path.getsize(self._snapshot_path) - 1)
+
+        with self.assertRaises(SnapshotError) as catcher:
+            load_snapshot(self._snapshot_path, ImportGraph())
+
+        self.assertEqual(catcher.exception.reason, "file size mismatch")
+
+    def _save_and_patch(self, patch_sections):
+        add_cyclic_import_to(self._tempdir)
+        imports = ImportGraph(record_fingerprints=True)
+        imports.add_files(
+            [os.path.join(self._tempdir, "package123", "a.py")],
+            follow=False,
+        )
+        save_snapshot(self._snapshot_path, imports, ["package123"])
+
+        with open(self._snapshot_path, "rb") as f:
+            content = f.read()
+        magic, format_version, *section_lengths = _HEADER.unpack_from(content)
+        sections = []
+        offset = _HEADER.size
+        for section_length in section_lengths:
+            sections.append(bytearray(content[offset : offset + section_length]))
+            offset += section_length
+        section_lengths = patch_sections(sections, section_lengths)
+        with open(self._snapshot_path, "wb") as f:
+            f.write(_HEADER.pack(magic, format_version, *section_lengths))
+            f.write(b"".join(sections))
+
+    @staticmethod
+    def _move_one_byte(_sections, section_lengths):
+        section_lengths[2] -= 1
+        section_lengths[3] += 1
+        return section_lengths
+
+    @staticmethod
+    def _break_offsets(sections, section_lengths):
+        struct.pack_into("<I", sections[2], len(sections[2]) - 4, 0)
+        return section_lengths
+
+    @staticmethod
+    def _break_target(sections, section_lengths):
+        struct.pack_into("<I", sections[9], 0, 0xFFFFFFFF)
+        return section_lengths
+
+    @parameterized.expand(
+        [
+            ("section length", "_move_one_byte", "section length mismatch"),
+            ("offsets", "_break_offsets", "offsets mismatch"),
+            ("target ID", "_break_target", "ID out of range"),
+        ],
+    )
+    def test_corrupt_snapshot(self, _label, patch_name, expected_reason):
+        self._save_and_patch(getattr(self, patch_name))
+
+        with self.assertRaises(SnapshotError) as catcher:
+            load_snapshot(self._snapshot_path, ImportGraph())
+
+        self.assertEqual(catcher.exception.reason, expected_reason)
@@ -0,0 +1,58 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from parameterized import parameterized
+
+from .._source_roots import SourceRoots
+from .factories import add_cyclic_import_to
+
+
+class SourceRootsTest(TestCase):
+    def setUp(self):
+        tempdir = TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self._tempdir = tempdir.name
+        add_cyclic_import_to(self._tempdir)
+        self._package_dir = os.path.join(self._tempdir, "package123")
+        self._sub_dir = os.path.join(self._package_dir, "sub")
+        os.mkdir(self._sub_dir)
+
+    def test_probing(self):
+        source_roots = SourceRoots()
+
+        self.assertEqual(source_roots.package_parts_of(self._tempdir), ())
+        self.assertEqual(
+            source_roots.package_parts_of(self._package_dir),
+            ("package123",),
+        )
+        self.assertEqual(source_roots.package_parts_of(self._sub_dir), ())
+
+    def test_each_directory_is_probed_once(self):
+        source_roots = SourceRoots()
+
+        with patch("os.path.exists", side_effect=os.path.exists) as exists:
+            for _ in range(3):
+                source_roots.package_parts_of(self._package_dir)
+
+        self.assertEqual(exists.call_count, 2)  # package123/ and its parent
+
+    @parameterized.expand(
+        [
+            ("named root", "renamed123", ("renamed123", "sub")),
+            ("dotted named root", "one.two", ("one", "two", "sub")),
+            ("plain root", "", ("sub",)),
+        ],
+    )
+    def test_explicit_root(self, _label, package_name, expected_parts):
+        source_roots = SourceRoots({self._package_dir: package_name})
+
+        with patch("os.path.exists") as exists:
+            actual_parts = source_roots.package_parts_of(self._sub_dir)
+
+        self.assertEqual(actual_parts, expected_parts)
+        exists.assert_not_called()
@@ -0,0 +1,73 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import os
+from tempfile import TemporaryDirectory
+from textwrap import dedent
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from .startup_benchmark import measure_startup, parse_importtime
+
+# Modules that only some modes of operation (or larger inputs) need
+_ON_DEMAND_MODULES = {
+    "concurrent.futures.process",
+    "multiprocessing",
+    "no_cyclic_imports._analyzer",
+    "no_cyclic_imports._changed",
+    "no_cyclic_imports._multi_root",
+    "no_cyclic_imports._snapshot",
+    "no_cyclic_imports._watch",
+    "socket",
+    "subprocess",
+}
+
+
+class ParseImporttimeTest(TestCase):
+    def test(self):
+        stderr = dedent("""\
+            import time: self [us] | cumulative | imported package
+            import time:       120 |        120 |   _io
+            import time:      1500 |       1620 | no_cyclic_imports
+            unrelated output
+        """)
+
+        self.assertEqual(
+            parse_importtime(stderr),
+            {"_io": 120, "no_cyclic_imports": 1500},
+        )
+
+
+class StartupTest(TestCase):
+    @parameterized.expand(
+        [
+            (
+                "version",
+                ["--version"],
+                {"no_cyclic_imports._cache", "no_cyclic_imports._engine"},
+            ),
+            (
+                "single file",
+                ["--no-cache", "--no-follow"],
+                {"cProfile", "no_cyclic_imports._cache"},
+            ),
+        ],
+    )
+    def test_heavy_modules_are_not_imported(
+        self,
+        _label,
+        args,
+        more_unexpected_modules,
+    ):
+        with TemporaryDirectory() as tempdir:
+            py_path = os.path.join(tempdir, "a.py")
+            with open(py_path, "w") as f:
+                f.write("import os\n")
+            report = measure_startup([*args, py_path], runs=1)
+
+        self.assertEqual(
+            set(report["modules"]) & (_ON_DEMAND_MODULES | more_unexpected_modules),
+            set(),
+        )
+        self.assertIn("no_cyclic_imports", report["modules"])
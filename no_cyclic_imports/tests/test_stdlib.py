@@ -0,0 +1,67 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import os
+import sys
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from .._stdlib import (
+    in_standard_library,
+    render_index_module,
+    stdlib_module_names,
+    supported_python_versions,
+)
+
+
+class StdlibModuleNamesTest(TestCase):
+    @parameterized.expand(
+        [
+            ("all versions", None, {"cStringIO", "asyncio", "tomllib"}, set()),
+            ("python 2.7", "2.7", {"cStringIO", "urllib2"}, {"asyncio"}),
+            ("python 3.11", "3.11", {"asyncio", "tomllib"}, {"cStringIO"}),
+        ],
+    )
+    def test(self, _label, python_version, expected_names, unexpected_names):
+        names = stdlib_module_names(python_version)
+
+        self.assertIsInstance(names, frozenset)
+        self.assertLessEqual(expected_names, names)
+        self.assertFalse(unexpected_names & names)
+        self.assertFalse(any("." in name for name in names))
+
+    def test_running_version(self):
+        running_version = f"{sys.version_info.major}.{sys.version_info.minor}"
+        self.assertIn(running_version, supported_python_versions())
+        self.assertIn("os", stdlib_module_names(running_version))
+
+    def test_unsupported_version(self):
+        with self.assertRaises(ValueError):
+            stdlib_module_names("1.5")
+
+
+class InStandardLibraryTest(TestCase):
+    @parameterized.expand(
+        [
+            ("distutils.core", None, True),
+            ("distutils.core", "3.12", False),
+            ("requests", None, False),
+        ],
+    )
+    def test(self, module_name, python_version, expected_result):
+        actual_result = in_standard_library(module_name, python_version)
+        self.assertEqual(actual_result, expected_result)
+
+
+class IndexModuleTest(TestCase):
+    def test_up_to_date(self):
+        index_path = os.path.join(os.path.dirname(__file__), "..", "_stdlib_index.py")
+        with open(index_path) as f:
+            shipped_index = f.read()
+
+        self.assertEqual(
+            render_index_module(),
+            shipped_index,
+            "Please regenerate _stdlib_index.py, see _stdlib.py for how.",
+        )
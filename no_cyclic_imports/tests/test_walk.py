@@ -0,0 +1,120 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from .._walk import TreeWalker, parse_gitignore
+from .factories import add_synthetic_codebase_to, write_file
+
+
+def _os_walk_py_files(directory: str) -> list[str]:
+    py_files = []
+    for root, folders, files in os.walk(directory):
+        folders[:] = sorted(folders)
+        py_files += sorted(os.path.join(root, f) for f in files if f.endswith(".py"))
+    return py_files
+
+
+class ParseGitignoreTest(TestCase):
+    @parameterized.expand(
+        [
+            ("name anywhere", "build", "src/build", True, True),
+            ("name at top", "build", "build", True, True),
+            ("anchored", "/build", "src/build", True, False),
+            ("path anchored", "src/build", "src/build", True, True),
+            ("directory only, on directory", "build/", "build", True, True),
+            ("directory only, on file", "build/", "build", False, False),
+            ("star", "*.pyc", "a/b.pyc", False, True),
+            ("star does not cross slash", "a/*.py", "a/b/c.py", False, False),
+            ("double star", "a/**/c.py", "a/b/b/c.py", False, True),
+            ("double star, zero directories", "a/**/c.py", "a/c.py", False, True),
+            ("character class", "[!x]y.py", "zy.py", False, True),
+            ("comment", "# build", "build", True, False),
+        ],
+    )
+    def test(self, _label, gitignore, relative_path, is_dir, expected_ignored):
+        ignored = False
+        for regex, negated, directory_only in parse_gitignore(gitignore):
+            if directory_only and not is_dir:
+                continue
+            if regex.fullmatch(relative_path):
+                ignored = not negated
+
+        self.assertEqual(ignored, expected_ignored)
+
+
+class TreeWalkerTest(TestCase):
+    def setUp(self):
+        tempdir = TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self._tempdir = os.path.realpath(tempdir.name)
+
+    def _walk(self, **kwargs) -> list[str]:
+        return [
+            os.path.relpath(path, self._tempdir)
+            for path in TreeWalker(**kwargs).iterate_py_files(self._tempdir)
+        ]
+
+    def test_same_order_as_sorted_os_walk(self):
+        add_synthetic_codebase_to(self._tempdir, modules=200, packages=4, depth=3)
+
+        self.assertEqual(
+            list(TreeWalker(max_workers=4).iterate_py_files(self._tempdir)),
+            _os_walk_py_files(self._tempdir),
+        )
+
+    def test_exclude(self):
+        for relative_path in ("a.py", ".venv/b.py", "src/build/c.py", "src/d.py"):
+            write_file(os.path.join(self._tempdir, relative_path))
+
+        self.assertEqual(
+            self._walk(exclude=[".venv", "src/build"]),
+            ["a.py", "src/d.py"],
+        )
+
+    def test_gitignore_is_opt_in(self):
+        write_file(os.path.join(self._tempdir, ".gitignore"), "*.py\n")
+        write_file(os.path.join(self._tempdir, "a.py"))
+
+        self.assertEqual(self._walk(), ["a.py"])
+        self.assertEqual(self._walk(respect_gitignore=True), [])
+
+    def test_gitignore(self):
+        os.mkdir(os.path.join(self._tempdir, ".git"))
+        write_file(os.path.join(self._tempdir, ".git", "hooks", "hook.py"))
+        write_file(
+            os.path.join(self._tempdir, ".gitignore"),
+            "build/\n/generated_*.py\n",
+        )
+        write_file(os.path.join(self._tempdir, "src", ".gitignore"), "*.py\n!keep.py\n")
+        for relative_path in (
+            "build/a.py",
+            "generated_b.py",
+            "src/build/c.py",
+            "src/d.py",
+            "src/keep.py",
+            "src/generated_e.py",
+            "f.py",
+        ):
+            write_file(os.path.join(self._tempdir, relative_path))
+
+        self.assertEqual(
+            self._walk(respect_gitignore=True),
+            ["f.py", "src/keep.py"],
+        )
+
+    def test_gitignore_above_directory_walked(self):
+        os.mkdir(os.path.join(self._tempdir, ".git"))
+        write_file(os.path.join(self._tempdir, ".gitignore"), "vendor/\n")
+        write_file(os.path.join(self._tempdir, "src", "vendor", "a.py"))
+        write_file(os.path.join(self._tempdir, "src", "b.py"))
+
+        src_dir = os.path.join(self._tempdir, "src")
+        self.assertEqual(
+            list(TreeWalker(respect_gitignore=True).iterate_py_files(src_dir)),
+            [os.path.join(src_dir, "b.py")],
+        )
@@ -0,0 +1,178 @@
+# Copyright (c) 2024 Sebastian Pipping <sebastian@pipping.org>
+# Licensed under Affero GPL v3 or later
+
+import contextlib
+import os
+import threading
+import time
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from .. import _imports
+from .._watch import WatchSession, query, serve
+from .factories import add_cyclic_import_to, write_file
+
+
+class WatchSessionTest(TestCase):
+    def setUp(self):
+        tempdir = TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self._project_dir = tempdir.name
+        _, self._a_py, self._b_py, *_ = add_cyclic_import_to(self._project_dir)
+        self._session = WatchSession([self._project_dir], follow=False)
+
+    def test_unchanged(self):
+        self.assertEqual(self._session.report()[1], 1)
+        self.assertFalse(self._session.poll())
+
+    def test_modified_file(self):
+        write_file(self._b_py, "b = 'b'  # no more imports\n")
+
+        self.assertTrue(self._session.poll())
+        self.assertEqual(self._session.report(), ("0 cycle(s).\n", 0))
+
+    def test_removed_file(self):
+        os.remove(self._b_py)
+
+        self.assertTrue(self._session.poll())
+        self.assertEqual(self._session.report()[1], 0)
+
+    def test_file_removed_while_updating(self):
+        write_file(self._b_py, "b = 'b'  # no more imports\n")
+
+        def remove_then_scan(abs_path):
+            os.remove(abs_path)
+            return scan_file(abs_path)
+
+        scan_file = _imports.scan_file
+        with patch.object(_imports, "scan_file", side_effect=remove_then_scan):
+            self.assertTrue(self._session.poll())
+        self.assertEqual(self._session.report()[1], 0)
+
+        self.assertTrue(self._session.poll())
+        self.assertEqual(self._session.report()[1], 0)
+
+        write_file(self._b_py, "from .a import a\n")
+        self.assertTrue(self._session.poll())
+        self.assertEqual(self._session.report()[1], 1)
+
+    def test_time_budget(self):
+        session = WatchSession([self._project_dir], follow=False, time_budget=0)
+
+        output, count_cycles = session.report()
+
+        self.assertEqual(count_cycles, 1)
+        self.assertIn("Partial result", output)
+        recomputed_before = session.components_recomputed
+        session.report()
+        self.assertEqual(session.components_recomputed, recomputed_before + 1)
+
+    def test_max_cycle_length(self):
+        session = WatchSession([self._project_dir], follow=False, max_cycle_length=2)
+
+        output, count_cycles = session.report()
+
+        self.assertEqual(count_cycles, 1)
+        self.assertTrue(output.startswith("0 cycle(s).\nPartial result"))
+        recomputed_before = session.components_recomputed
+        self.assertEqual(session.report(), (output, count_cycles))
+        self.assertEqual(session.components_recomputed, recomputed_before)
+
+    def test_added_file(self):
+        write_file(self._b_py, "b = 'b'  # no more imports\n")
+        self._session.poll()
+        self.assertEqual(self._session.report()[1], 0)
+
+        c_py = os.path.join(os.path.dirname(self._b_py), "c.py")
+        write_file(c_py, "from .a import a\n")
+        write_file(self._b_py, "from .c import c\n")
+
+        self.assertTrue(self._session.poll())
+        output, count_cycles = self._session.report()
+        self.assertEqual(count_cycles, 1)
+        self.assertIn("package123.c", output)
+
+    def test_unaffected_components_are_not_recomputed(self):
+        package_dir = os.path.join(self._project_dir, "package456")
+        os.mkdir(package_dir)
+        write_file(os.path.join(package_dir, "__init__.py"), "")
+        write_file(os.path.join(package_dir, "a.py"), "from .b import b\n")
+        write_file(os.path.join(package_dir, "b.py"), "from .a import a\n")
+        self._session.poll()
+        self._session.report()
+        recomputed_before = self._session.components_recomputed
+
+        write_file(os.path.join(package_dir, "a.py"), "from .b import b  # again\n")
+        self._session.poll()
+        _, count_cycles = self._session.report()
+
+        self.assertEqual(count_cycles, 2)
+        self.assertEqual(self._session.components_recomputed, recomputed_before + 1)
+
+
+def _query_once_listening(socket_path: str) -> tuple[int, str]:
+    while True:
+        try:
+            return query(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):  # noqa: PERF203
+            time.sleep(0.01)
+
+
+class ServeTest(TestCase):
+    def test_query(self):
+        with TemporaryDirectory() as tempdir:
+            add_cyclic_import_to(tempdir)
+            socket_path = os.path.join(tempdir, "socket")
+            session = WatchSession([tempdir], follow=False)
+            stop_event = threading.Event()
+            output = StringIO()
+            server = threading.Thread(
+                target=serve,
+                args=(session, socket_path),
+                kwargs={
+                    "poll_interval": 0.05,
+                    "file_": output,
+                    "stop_event": stop_event,
+                },
+            )
+            server.start()
+            try:
+                exit_code, report = _query_once_listening(socket_path)
+            finally:
+                stop_event.set()
+                server.join()
+
+            self.assertEqual(exit_code, 2)
+            self.assertTrue(report.endswith("\n1 cycle(s).\n"))
+            self.assertEqual(output.getvalue(), report)
+            self.assertFalse(os.path.exists(socket_path))
+
+    def test_queries_do_not_poll(self):
+        with TemporaryDirectory() as tempdir:
+            add_cyclic_import_to(tempdir)
+            socket_path = os.path.join(tempdir, "socket")
+            session = WatchSession([tempdir], follow=False)
+            session.poll = Mock(side_effect=session.poll)
+            stop_event = threading.Event()
+            server = threading.Thread(
+                target=serve,
+                args=(session, socket_path),
+                kwargs={
+                    "poll_interval": 60.0,
+                    "file_": StringIO(),
+                    "stop_event": stop_event,
+                },
+            )
+            server.start()
+            try:
+                reports = [_query_once_listening(socket_path) for _ in range(3)]
+            finally:
+                stop_event.set()
+                with contextlib.suppress(OSError):  # unless stopped already
+                    query(socket_path)  # to wake the server up
+                server.join()
+
+            self.assertEqual(session.poll.call_count, 0)
+            self.assertEqual(len(set(reports)), 1)